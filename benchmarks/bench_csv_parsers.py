@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Benchmark the column-wise CSV parsers against the old iterrows implementation
+
+Usage:
+    python -m benchmarks.bench_csv_parsers [num_rows]
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from geda.parsers.adapters.rbc_parser import RBCParser
+from geda.parsers.adapters.cibc_parser import CIBCParser
+from geda.parsers.adapters.generic_csv_parser import GenericCSVParser
+
+MERCHANTS = [
+    "STARBUCKS COFFEE", "UBER EATS", "AMAZON MARKETPLACE", "NETFLIX SUBSCRIPTION",
+    "SHELL GAS STATION", "LOBLAWS GROCERY", "PAYROLL DEPOSIT", "E-TRANSFER SENT",
+]
+
+# Row-by-row reference implementations (the pre-vectorization parsers)
+
+def rbc_credit_card_rows(parser, df):
+    transactions = []
+    for _, row in df.iterrows():
+        date = datetime.strptime(row["Transaction Date"], "%m/%d/%Y")
+        amount = 0.0
+        if pd.notna(row.get("Debit", None)) and row["Debit"]:
+            amount = -float(row["Debit"].replace("$", "").replace(",", ""))
+        elif pd.notna(row.get("Credit", None)) and row["Credit"]:
+            amount = float(row["Credit"].replace("$", "").replace(",", ""))
+        transactions.append({
+            "date": date,
+            "amount": amount,
+            "description": row["Description"],
+            "original_description": row["Description"],
+            "source_id": f"{row['Card Number']}_{row['Transaction Date']}_{row['Description']}"
+        })
+    return parser.process_transactions(transactions)
+
+def rbc_bank_account_rows(parser, df):
+    transactions = []
+    for _, row in df.iterrows():
+        date = datetime.strptime(row["Date"], "%m/%d/%Y")
+        amount = float(str(row["Amount"]).replace("$", "").replace(",", ""))
+        description = row["Name"]
+        if pd.notna(row.get("Memo", None)) and row["Memo"]:
+            description += f" - {row['Memo']}"
+        transactions.append({
+            "date": date,
+            "amount": amount,
+            "description": description,
+            "original_description": description,
+            "source_id": f"{row['Date']}_{row['Transaction']}_{row['Name']}"
+        })
+    return parser.process_transactions(transactions)
+
+def cibc_credit_card_rows(parser, df):
+    transactions = []
+    for _, row in df.iterrows():
+        date = datetime.strptime(row["Date"], "%Y/%m/%d")
+        amount = float(str(row["Amount"]).replace("$", "").replace(",", ""))
+        card_number = row.get("Card Number", "")
+        transactions.append({
+            "date": date,
+            "amount": amount,
+            "description": row["Description"],
+            "original_description": row["Description"],
+            "source_id": f"{card_number}_{row['Date']}_{row['Description']}"
+        })
+    return parser.process_transactions(transactions)
+
+def cibc_bank_account_rows(parser, df):
+    transactions = []
+    for _, row in df.iterrows():
+        date = datetime.strptime(row["Date"], "%Y/%m/%d")
+        amount = 0.0
+        if pd.notna(row.get("Withdrawal", None)) and row["Withdrawal"]:
+            amount = -float(str(row["Withdrawal"]).replace("$", "").replace(",", ""))
+        elif pd.notna(row.get("Deposit", None)) and row["Deposit"]:
+            amount = float(str(row["Deposit"]).replace("$", "").replace(",", ""))
+        transactions.append({
+            "date": date,
+            "amount": amount,
+            "description": row["Description"],
+            "original_description": row["Description"],
+            "source_id": f"{row['Date']}_{row['Description']}"
+        })
+    return parser.process_transactions(transactions)
+
+def generic_rows(parser, df):
+    transactions = []
+    for _, row in df.iterrows():
+        try:
+            date = datetime.strptime(row["Date"], "%Y-%m-%d")
+        except ValueError:
+            date = datetime.strptime(row["Date"], "%m/%d/%Y")
+        amount = float(str(row["Amount"]).replace("$", "").replace(",", ""))
+        transactions.append({
+            "date": date,
+            "amount": amount,
+            "description": row["Description"],
+            "original_description": row["Description"],
+            "source_id": f"{row['Date']}_{row['Description']}_{row['Amount']}"
+        })
+    return parser.process_transactions(transactions)
+
+# Synthetic exports
+
+def make_frames(num_rows):
+    """Build one DataFrame per supported CSV layout, as read_csv would return them"""
+    rng = np.random.default_rng(42)
+    start = datetime(2018, 1, 1)
+    days = [start + timedelta(days=int(d)) for d in rng.integers(0, 365 * 5, num_rows)]
+    values = rng.uniform(1, 5000, num_rows).round(2)
+    money = [f"${v:,.2f}" for v in values]
+    names = [MERCHANTS[i] for i in rng.integers(0, len(MERCHANTS), num_rows)]
+    is_debit = rng.random(num_rows) < 0.8
+    debit = [m if d else np.nan for m, d in zip(money, is_debit)]
+    credit = [np.nan if d else m for m, d in zip(money, is_debit)]
+    signed = [f"-{m}" if d else m for m, d in zip(money, is_debit)]
+    memo = [f"REF {i}" if i % 3 else np.nan for i in range(num_rows)]
+
+    us_dates = [d.strftime("%m/%d/%Y") for d in days]
+    slash_dates = [d.strftime("%Y/%m/%d") for d in days]
+    iso_dates = [d.strftime("%Y-%m-%d") for d in days]
+
+    return {
+        "RBC credit card": (RBCParser(), rbc_credit_card_rows, pd.DataFrame({
+            "Account Type": "Visa", "Card Number": "4500123412341234",
+            "Transaction Date": us_dates, "Description": names,
+            "Debit": debit, "Credit": credit,
+        })),
+        "RBC bank account": (RBCParser(), rbc_bank_account_rows, pd.DataFrame({
+            "Date": us_dates, "Transaction": "POS", "Name": names,
+            "Memo": memo, "Amount": signed,
+        })),
+        "CIBC credit card": (CIBCParser(), cibc_credit_card_rows, pd.DataFrame({
+            "Date": slash_dates, "Card Number": "4500********1234",
+            "Description": names, "Amount": signed,
+        })),
+        "CIBC bank account": (CIBCParser(), cibc_bank_account_rows, pd.DataFrame({
+            "Date": slash_dates, "Description": names,
+            "Withdrawal": debit, "Deposit": credit,
+        })),
+        "Generic CSV": (GenericCSVParser(), generic_rows, pd.DataFrame({
+            "Date": [iso if i % 2 else us for i, (iso, us) in enumerate(zip(iso_dates, us_dates))],
+            "Description": names, "Amount": signed,
+        })),
+    }
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def run_benchmark(num_rows):
+    """Time both implementations on every layout and check their output matches"""
+    print(f"Parsing {num_rows} rows per layout\n")
+    print(f"{'Layout':<20} {'iterrows':>10} {'columnar':>10} {'speedup':>8}")
+
+    for name, (parser, row_parser, df) in make_frames(num_rows).items():
+        expected, row_time = timed(row_parser, parser, df)
+        actual, column_time = timed(parser.parse_frame, df)
+
+        assert actual == expected, f"{name}: columnar output differs from iterrows output"
+
+        print(f"{name:<20} {row_time:>9.3f}s {column_time:>9.3f}s {row_time / column_time:>7.1f}x")
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,117 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional, Tuple
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from geda.db.data_version import read_data_version
+
+class ResponseCache:
+    """
+    Cache of serialized JSON responses for read-only endpoints.
+    
+    Entries are keyed by path and query string and stamped with the data
+    version they were computed at. The ETag is derived from the same stamp,
+    so a client revalidating an unchanged resource gets a 304 after a
+    single-row version lookup instead of the endpoint's queries. Any
+    committed write, from any process, bumps the version stored in the
+    database, which invalidates every entry at once.
+    """
+    
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+    
+    def respond(self,
+                request: Request,
+                db: Session,
+                response_model: Any,
+                compute: Callable[[], Any]) -> Response:
+        """
+        Answer a GET request from the cache, computing the body on a miss.
+        
+        Args:
+            request: The incoming request; its URL is the cache key
+            db: Session the data version is read with
+            response_model: Type the result of compute is serialized as
+            compute: Produces the response data, typically via a service
+        
+        Returns:
+            200 with the JSON body, or 304 if If-None-Match has the current ETag
+        """
+        key, etag, cached = self._lookup(request, read_data_version(db.connection()))
+        if cached is not None:
+            return cached
+        return self._store(key, etag, response_model, compute())
+    
+    async def respond_async(self,
+                            request: Request,
+                            db: AsyncSession,
+                            response_model: Any,
+                            compute: Callable[[], Awaitable[Any]]) -> Response:
+        """Like respond(), for async routes whose compute is a coroutine function"""
+        version = await db.run_sync(lambda session: read_data_version(session.connection()))
+        key, etag, cached = self._lookup(request, version)
+        if cached is not None:
+            return cached
+        return self._store(key, etag, response_model, await compute())
+    
+    def _lookup(self, request: Request, version: Tuple[str, int]) -> Tuple[str, str, Optional[Response]]:
+        """
+        The cache key and ETag for a request at a data version, and the
+        response if it can be answered without computing anything.
+        """
+        key = f"{request.url.path}?{request.url.query}"
+        etag = self._etag(key, version)
+        headers = self._headers(etag)
+        
+        if etag in self._parse_if_none_match(request.headers.get("if-none-match")):
+            return key, etag, Response(status_code=304, headers=headers)
+        
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == etag:
+                self._entries.move_to_end(key)
+                return key, etag, Response(content=cached[1], media_type="application/json", headers=headers)
+        
+        return key, etag, None
+    
+    def _store(self, key: str, etag: str, response_model: Any, data: Any) -> Response:
+        """Serialize freshly computed data, cache it and respond with it"""
+        adapter = TypeAdapter(response_model)
+        body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+        
+        with self._lock:
+            self._entries[key] = (etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        
+        return Response(content=body, media_type="application/json", headers=self._headers(etag))
+    
+    @staticmethod
+    def _headers(etag: str) -> dict:
+        return {"ETag": etag, "Cache-Control": "no-cache"}
+    
+    @staticmethod
+    def _etag(key: str, version: Tuple[str, int]) -> str:
+        """Strong ETag for key at a data version"""
+        # Defaults such as "the last 30 days" move with the date
+        token, number = version
+        stamp = f"{token}:{number}:{datetime.utcnow().date()}:{key}"
+        return '"' + hashlib.sha1(stamp.encode()).hexdigest() + '"'
+    
+    @staticmethod
+    def _parse_if_none_match(header: Optional[str]) -> set:
+        if not header:
+            return set()
+        return {tag.strip() for tag in header.split(",")}
+
+# Shared by all cached endpoints
+response_cache = ResponseCache(max_entries=int(os.environ.get("RESPONSE_CACHE_SIZE", "256")))
@@ -0,0 +1,38 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def ndjson_chunks(columns: Sequence[str], batches: Iterable[List[Tuple]]) -> Iterator[str]:
+    """One JSON object per line, each batch of rows encoded as one chunk"""
+    encode = json.JSONEncoder(default=_json_default).encode
+    for batch in batches:
+        yield "".join(encode(dict(zip(columns, row))) + "\n" for row in batch)
+
+def csv_chunks(columns: Sequence[str], batches: Iterable[List[Tuple]]) -> Iterator[str]:
+    """A header line, then each batch of rows encoded as one chunk"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    
+    # An empty export is still a valid file
+    if buffer.tell():
+        yield buffer.getvalue()
+
+# Media type and encoder of each export format
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", ndjson_chunks),
+    "csv": ("text/csv", csv_chunks),
+}
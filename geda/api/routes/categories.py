@@ -1,79 +1,87 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from geda.api.cache import response_cache
 from geda.api.schemas import Category, CategoryCreate
-from geda.core import CategoryService
-from geda.db import get_db
+from geda.core import CategoryService, AsyncCategoryService
+from geda.db import get_async_db, get_writer
+from geda.db.writer import DatabaseWriter
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Category])
-def list_categories(db: Session = Depends(get_db)):
+async def list_categories(request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Get a list of all categories.
     """
-    service = CategoryService(db)
-    return service.get_categories()
+    service = AsyncCategoryService(db)
+    return await response_cache.respond_async(request, db, List[Category], service.get_categories)
 
 @router.get("/{category_id}", response_model=Category)
-def get_category(category_id: int, db: Session = Depends(get_db)):
+async def get_category(category_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Get a specific category by ID.
     """
-    service = CategoryService(db)
-    category = service.get_category(category_id)
+    service = AsyncCategoryService(db)
+    category = await service.get_category(category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     return category
 
 @router.post("/", response_model=Category)
-def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
+async def create_category(category: CategoryCreate, writer: DatabaseWriter = Depends(get_writer)):
     """
     Create a new category.
     """
-    service = CategoryService(db)
-    
-    # Check if category with this name already exists
-    existing = service.get_category_by_name(category.name)
-    if existing:
-        raise HTTPException(status_code=400, detail="Category with this name already exists")
+    def create(db: Session):
+        service = CategoryService(db)
+        
+        # Check if category with this name already exists
+        existing = service.get_category_by_name(category.name)
+        if existing:
+            raise HTTPException(status_code=400, detail="Category with this name already exists")
+        
+        return service.create_category(category.dict())
     
-    return service.create_category(category.dict())
+    return await writer.run_async(create)
 
 @router.put("/{category_id}", response_model=Category)
-def update_category(
+async def update_category(
     category_id: int, 
     category: CategoryCreate, 
-    db: Session = Depends(get_db)
+    writer: DatabaseWriter = Depends(get_writer)
 ):
     """
     Update an existing category.
     """
-    service = CategoryService(db)
-    
-    # Check if new name already exists for another category
-    if category.name:
-        existing = service.get_category_by_name(category.name)
-        if existing and existing.id != category_id:
-            raise HTTPException(status_code=400, detail="Category with this name already exists")
+    def update(db: Session):
+        service = CategoryService(db)
+        
+        # Check if new name already exists for another category
+        if category.name:
+            existing = service.get_category_by_name(category.name)
+            if existing and existing.id != category_id:
+                raise HTTPException(status_code=400, detail="Category with this name already exists")
+        
+        return service.update_category(category_id, category.dict())
     
-    updated = service.update_category(category_id, category.dict())
+    updated = await writer.run_async(update)
     if not updated:
         raise HTTPException(status_code=404, detail="Category not found")
     return updated
 
 @router.delete("/{category_id}")
-def delete_category(
+async def delete_category(
     category_id: int, 
     reassign_to_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    writer: DatabaseWriter = Depends(get_writer)
 ):
     """
     Delete a category and optionally reassign its transactions.
     """
-    service = CategoryService(db)
-    success = service.delete_category(category_id, reassign_to_id)
+    success = await writer.run_async(lambda db: CategoryService(db).delete_category(category_id, reassign_to_id))
     if not success:
         raise HTTPException(
             status_code=404, 
@@ -82,10 +90,8 @@ def delete_category(
     return {"success": True}
 
 @router.post("/create-defaults", response_model=List[Category])
-def create_default_categories(db: Session = Depends(get_db)):
+async def create_default_categories(writer: DatabaseWriter = Depends(get_writer)):
     """
     Create default categories if they don't exist.
     """
-    service = CategoryService(db)
-    created = service.create_default_categories()
-    return created
\ No newline at end of file
+    return await writer.run_async(lambda db: CategoryService(db).create_default_categories())
\ No newline at end of file
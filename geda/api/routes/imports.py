@@ -3,18 +3,28 @@ import tempfile
 import uuid
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from geda.api.schemas import ImportPreviewResponse, ImportRequest, Transaction
+from geda.api.uploads import save_upload
+from geda.api.schemas import (
+    ImportPreviewResponse, ImportRequest, ImportSummary, BatchImportSummary, ImportJobStatus, Transaction
+)
 from geda.core import ImportService
-from geda.db import get_db
+from geda.core.batch_import import collect_statement_files, parse_file, parse_files
+from geda.core.import_jobs import import_job_manager
+from geda.db import get_db, get_async_db, get_writer
+from geda.db.writer import DatabaseWriter
+from geda.parsers.pdf_tables import file_digest
 
 router = APIRouter()
 
 @router.post("/preview", response_model=ImportPreviewResponse)
 async def preview_import(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    writer: DatabaseWriter = Depends(get_writer)
 ):
     """
     Preview transactions from a file before importing.
@@ -23,18 +33,32 @@ async def preview_import(
     1. Uploads the file
     2. Parses the transactions
     3. Detects potential duplicates
-    4. Returns a preview of the transactions to be imported
+    4. Stages the transactions so /confirm can import them without the file
+    5. Returns a preview of the transactions to be imported
+    
+    A file imported before isn't parsed again: the response names the
+    earlier import in already_imported and has no transactions.
     """
-    # Save uploaded file to a temporary file
-    with tempfile.NamedTemporaryFile(delete=False) as temp:
-        temp_path = temp.name
-        content = await file.read()
-        temp.write(content)
+    # Stream the upload to a temporary file, off the event loop
+    upload = await run_in_threadpool(save_upload, file)
+    temp_path = upload.path
     
     try:
-        # Parse and check for duplicates
-        service = ImportService(db)
-        transactions, duplicates, import_id = service.preview_import(temp_path)
+        previous = await db.run_sync(lambda s: ImportService(s).find_imported_file(upload.sha256))
+        if previous is not None:
+            return {
+                "transactions": [],
+                "total_count": 0,
+                "import_id": previous.import_id,
+                "already_imported": previous
+            }
+        
+        # Parse off the event loop, check for duplicates, then stage the rows for /confirm
+        parsed = await run_in_threadpool(parse_file, temp_path)
+        transactions, duplicates, import_id = await db.run_sync(
+            lambda s: ImportService(s).build_preview(parsed)
+        )
+        await writer.run_async(lambda w: ImportService(w).stage_preview(import_id, transactions, upload.sha256))
         
         # Return preview response
         return {
@@ -48,28 +72,31 @@ async def preview_import(
         os.unlink(temp_path)
 
 @router.post("/confirm", response_model=List[Transaction])
-def confirm_import(
+async def confirm_import(
     import_request: ImportRequest,
     auto_categorize: bool = True,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    writer: DatabaseWriter = Depends(get_writer)
 ):
     """
     Confirm and import previewed transactions.
     
     This endpoint:
     1. Takes the import_id from the preview
-    2. Imports the transactions (optionally filtered by IDs)
+    2. Imports the staged transactions (optionally filtered by position)
     3. Auto-categorizes them if requested
     4. Returns the imported transactions
-    """
-    service = ImportService(db)
     
-    # TODO: Implement the retrieval of previewed transactions by import_id
-    # For now, this is a simplified version that just imports all
-    transactions = service.import_transactions(
-        [], # This would be the list of transaction dicts to import
+    Only the insert is queued on the writer; categorization runs first.
+    """
+    transactions = await run_in_threadpool(
+        ImportService(db, writer).confirm_import,
+        import_request.import_id,
+        import_request.transaction_ids,
         auto_categorize
     )
+    if transactions is None:
+        raise HTTPException(status_code=404, detail="Import preview not found or expired")
     
     return transactions
 
@@ -77,7 +104,8 @@ def confirm_import(
 async def import_file(
     file: UploadFile = File(...),
     auto_categorize: bool = True,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    writer: DatabaseWriter = Depends(get_writer)
 ):
     """
     Import transactions directly from a file.
@@ -87,22 +115,118 @@ async def import_file(
     2. Parses and imports the transactions
     3. Auto-categorizes them if requested
     4. Returns the imported transactions
-    """
-    # Get file extension from original filename
-    _, ext = os.path.splitext(file.filename)
     
-    # Save uploaded file to a temporary file with original extension
-    with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as temp:
-        temp_path = temp.name
-        content = await file.read()
-        temp.write(content)
+    Parsing and categorization run in a worker thread; only the insert is
+    queued on the writer, so other writes aren't held up by them.
+    """
+    # Stream the upload to a temporary file, off the event loop
+    upload = await run_in_threadpool(save_upload, file)
+    temp_path = upload.path
     
     try:
         # Import transactions
-        service = ImportService(db)
-        transactions = service.import_from_file(temp_path, auto_categorize)
-        
-        return transactions
+        return await run_in_threadpool(
+            ImportService(db, writer).import_from_file, temp_path, auto_categorize, upload.sha256
+        )
+    finally:
+        # Cleanup temporary file
+        os.unlink(temp_path)
+
+@router.post("/file/chunked", response_model=ImportSummary)
+async def import_file_chunked(
+    file: UploadFile = File(...),
+    auto_categorize: bool = True,
+    db: Session = Depends(get_db),
+    writer: DatabaseWriter = Depends(get_writer)
+):
+    """
+    Import a large file chunk by chunk.
+    
+    Unlike /file, the file is parsed, deduplicated and committed one chunk
+    at a time and only a summary is returned, so memory use stays bounded
+    however large the file is. Each chunk's insert is its own writer job,
+    so other writes go through between chunks.
+    """
+    # Stream the upload to a temporary file, off the event loop
+    upload = await run_in_threadpool(save_upload, file)
+    temp_path = upload.path
+    
+    try:
+        return await run_in_threadpool(
+            ImportService(db, writer).import_from_file_in_chunks, temp_path, auto_categorize, digest=upload.sha256
+        )
     finally:
         # Cleanup temporary file
-        os.unlink(temp_path)
\ No newline at end of file
+        os.unlink(temp_path)
+
+@router.post("/batch", response_model=BatchImportSummary)
+async def import_batch(
+    files: List[UploadFile] = File(...),
+    auto_categorize: bool = True,
+    db: Session = Depends(get_db),
+    writer: DatabaseWriter = Depends(get_writer)
+):
+    """
+    Import several statement files, or zip archives of them, at once.
+    
+    The files are parsed in parallel, deduplicated across files and
+    against existing transactions, and imported in one transaction.
+    Files imported before are skipped without parsing. Parsing and
+    categorization happen in a worker thread before the insert is queued,
+    so they neither block the event loop nor hold up other writes.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = []
+        for index, file in enumerate(files):
+            # Keep the original name (and extension) unique within the batch
+            temp_path = os.path.join(temp_dir, f"{index}_{os.path.basename(file.filename)}")
+            await run_in_threadpool(save_upload, file, temp_path)
+            paths.append(temp_path)
+        
+        try:
+            statement_files = await run_in_threadpool(collect_statement_files, paths, temp_dir)
+            # Hash off the event loop, then leave out files imported before
+            all_digests = await run_in_threadpool(lambda: [file_digest(path) for path in statement_files])
+            service = ImportService(db, writer)
+            new_files, digests, skipped = await run_in_threadpool(
+                service.split_imported_files, statement_files, all_digests
+            )
+            parsed = await run_in_threadpool(parse_files, new_files) if new_files else []
+            return await run_in_threadpool(service.import_parsed_files, parsed, auto_categorize, digests, skipped)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/jobs", response_model=ImportJobStatus, status_code=202)
+async def create_import_job(file: UploadFile = File(...), auto_categorize: bool = True):
+    """
+    Import a file in the background.
+    
+    Returns as soon as the upload is saved; poll /jobs/{job_id} for the
+    job's progress and result.
+    """
+    # Stream the upload to a temporary file; the job takes ownership of it
+    temp_path = (await run_in_threadpool(save_upload, file)).path
+    
+    # Moving and counting the file happen off the event loop and outside the writer
+    return await run_in_threadpool(import_job_manager.submit, temp_path, file.filename, auto_categorize)
+
+@router.get("/jobs/{job_id}", response_model=ImportJobStatus)
+async def get_import_job(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Get the status and progress of an import job"""
+    job = await db.run_sync(lambda s: import_job_manager.get(s, job_id))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+@router.post("/jobs/{job_id}/cancel", response_model=ImportJobStatus)
+async def cancel_import_job(job_id: str, writer: DatabaseWriter = Depends(get_writer)):
+    """
+    Cancel an import job.
+    
+    A running job stops after the chunk it is importing; rows committed
+    before that stay imported.
+    """
+    job = await writer.run_async(lambda db: import_job_manager.cancel(db, job_id))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
@@ -4,7 +4,8 @@ from sqlalchemy.orm import Session
 
 from geda.api.schemas import MappingRule, MappingRuleCreate
 from geda.core import RuleService
-from geda.db import get_db
+from geda.db import get_db, get_writer
+from geda.db.writer import DatabaseWriter
 
 router = APIRouter()
 
@@ -31,28 +32,26 @@ def get_rule(rule_id: int, db: Session = Depends(get_db)):
     return rule
 
 @router.post("/", response_model=MappingRule)
-def create_rule(rule: MappingRuleCreate, db: Session = Depends(get_db)):
+async def create_rule(rule: MappingRuleCreate, writer: DatabaseWriter = Depends(get_writer)):
     """
     Create a new mapping rule.
     """
-    service = RuleService(db)
     try:
-        return service.create_rule(rule.dict())
+        return await writer.run_async(lambda db: RuleService(db).create_rule(rule.dict()))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.put("/{rule_id}", response_model=MappingRule)
-def update_rule(
+async def update_rule(
     rule_id: int, 
     rule: MappingRuleCreate, 
-    db: Session = Depends(get_db)
+    writer: DatabaseWriter = Depends(get_writer)
 ):
     """
     Update an existing mapping rule.
     """
-    service = RuleService(db)
     try:
-        updated = service.update_rule(rule_id, rule.dict())
+        updated = await writer.run_async(lambda db: RuleService(db).update_rule(rule_id, rule.dict()))
         if not updated:
             raise HTTPException(status_code=404, detail="Rule not found")
         return updated
@@ -60,21 +59,18 @@ def update_rule(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/{rule_id}")
-def delete_rule(rule_id: int, db: Session = Depends(get_db)):
+async def delete_rule(rule_id: int, writer: DatabaseWriter = Depends(get_writer)):
     """
     Delete a mapping rule.
     """
-    service = RuleService(db)
-    success = service.delete_rule(rule_id)
+    success = await writer.run_async(lambda db: RuleService(db).delete_rule(rule_id))
     if not success:
         raise HTTPException(status_code=404, detail="Rule not found")
     return {"success": True}
 
 @router.post("/create-defaults", response_model=List[MappingRule])
-def create_default_rules(db: Session = Depends(get_db)):
+async def create_default_rules(writer: DatabaseWriter = Depends(get_writer)):
     """
     Create default mapping rules if they don't exist.
     """
-    service = RuleService(db)
-    created = service.create_default_rules()
-    return created
\ No newline at end of file
+    return await writer.run_async(lambda db: RuleService(db).create_default_rules())
\ No newline at end of file
@@ -1,94 +1,189 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, date
 
+from geda.api.cache import response_cache
+from geda.api.export import EXPORT_FORMATS
 from geda.api.schemas import Transaction, TransactionCreate, TransactionWithCategory
-from geda.core import TransactionService
-from geda.db import get_db
+from geda.core import TransactionService, AsyncTransactionService
+from geda.core.transaction_service import EXPORT_COLUMNS
+from geda.db import get_db, get_async_db, get_writer
+from geda.db.writer import DatabaseWriter
 
 router = APIRouter()
 
 @router.get("/", response_model=List[TransactionWithCategory])
-def list_transactions(
+async def list_transactions(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     category_id: Optional[int] = None,
     search: Optional[str] = None,
     is_expense: Optional[bool] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get a list of transactions with optional filtering.
+    
+    Without skip, the response carries an X-Next-Cursor header while more
+    rows exist; pass it back as cursor to fetch the next page. skip/limit
+    offset pagination is still supported but can't be combined with cursor.
     """
+    if cursor and skip:
+        raise HTTPException(status_code=400, detail="cursor can't be combined with skip")
+    
     # Convert date to datetime if provided
     start_datetime = datetime(start_date.year, start_date.month, start_date.day) if start_date else None
     end_datetime = datetime(end_date.year, end_date.month, end_date.day, 23, 59, 59) if end_date else None
     
-    service = TransactionService(db)
-    transactions = service.get_transactions(
-        skip=skip,
-        limit=limit,
+    service = AsyncTransactionService(db)
+    if skip:
+        return await service.get_transactions(
+            skip=skip,
+            limit=limit,
+            start_date=start_datetime,
+            end_date=end_datetime,
+            category_id=category_id,
+            search=search,
+            is_expense=is_expense
+        )
+    
+    try:
+        transactions, next_cursor = await service.get_transactions_page(
+            limit=limit,
+            cursor=cursor,
+            start_date=start_datetime,
+            end_date=end_datetime,
+            category_id=category_id,
+            search=search,
+            is_expense=is_expense
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return transactions
+
+@router.get("/search", response_model=List[TransactionWithCategory])
+async def search_transactions(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(50, gt=0, le=500),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Search transaction descriptions, best matches first.
+    """
+    service = AsyncTransactionService(db)
+    return await service.search_transactions(q, limit=limit)
+
+@router.get("/export")
+def export_transactions(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    category_id: Optional[int] = None,
+    search: Optional[str] = None,
+    is_expense: Optional[bool] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Stream every transaction matching the listing filters as NDJSON or CSV.
+    
+    Rows are read through a server-side cursor and written out a batch at
+    a time, so the export never holds the whole ledger in memory. The
+    session stays open until the last batch has been sent.
+    """
+    # Convert date to datetime if provided
+    start_datetime = datetime(start_date.year, start_date.month, start_date.day) if start_date else None
+    end_datetime = datetime(end_date.year, end_date.month, end_date.day, 23, 59, 59) if end_date else None
+    
+    batches = TransactionService(db).export_transactions(
         start_date=start_datetime,
         end_date=end_datetime,
         category_id=category_id,
         search=search,
         is_expense=is_expense
     )
-    return transactions
+    media_type, encode = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        encode(EXPORT_COLUMNS, batches),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="transactions.{format}"'}
+    )
 
 @router.get("/{transaction_id}", response_model=TransactionWithCategory)
-def get_transaction(transaction_id: int, db: Session = Depends(get_db)):
+async def get_transaction(transaction_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Get a specific transaction by ID.
     """
-    service = TransactionService(db)
-    transaction = service.get_transaction(transaction_id)
+    service = AsyncTransactionService(db)
+    transaction = await service.get_transaction(transaction_id)
     if not transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
     return transaction
 
 @router.post("/", response_model=Transaction)
-def create_transaction(transaction: TransactionCreate, db: Session = Depends(get_db)):
+async def create_transaction(
+    transaction: TransactionCreate,
+    db: Session = Depends(get_db),
+    writer: DatabaseWriter = Depends(get_writer)
+):
     """
     Create a new transaction.
+    
+    A transaction without a category is categorized before the write is
+    queued, so a slow LLM call never holds up the writer.
     """
+    data = transaction.dict()
     service = TransactionService(db)
-    return service.create_transaction(transaction.dict())
+    suggested_category_id = None
+    if not data.get("category_id"):
+        suggested_category_id = await run_in_threadpool(service.suggest_category, data)
+    
+    def create(writer_db):
+        service.categorizer.store_llm_answers(writer_db)
+        return TransactionService(writer_db).create_transaction(data, suggested_category_id)
+    
+    return await writer.run_async(create)
 
 @router.put("/{transaction_id}", response_model=Transaction)
-def update_transaction(
+async def update_transaction(
     transaction_id: int, 
     transaction: TransactionCreate, 
-    db: Session = Depends(get_db)
+    writer: DatabaseWriter = Depends(get_writer)
 ):
     """
     Update an existing transaction.
     """
-    service = TransactionService(db)
-    updated = service.update_transaction(transaction_id, transaction.dict())
+    updated = await writer.run_async(lambda db: TransactionService(db).update_transaction(transaction_id, transaction.dict()))
     if not updated:
         raise HTTPException(status_code=404, detail="Transaction not found")
     return updated
 
 @router.delete("/{transaction_id}", response_model=bool)
-def delete_transaction(transaction_id: int, db: Session = Depends(get_db)):
+async def delete_transaction(transaction_id: int, writer: DatabaseWriter = Depends(get_writer)):
     """
     Delete a transaction.
     """
-    service = TransactionService(db)
-    success = service.delete_transaction(transaction_id)
+    success = await writer.run_async(lambda db: TransactionService(db).delete_transaction(transaction_id))
     if not success:
         raise HTTPException(status_code=404, detail="Transaction not found")
     return True
 
 @router.get("/stats/by-category", response_model=List[dict])
-def get_spending_by_category(
+async def get_spending_by_category(
+    request: Request,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get aggregated spending by category.
@@ -97,17 +192,18 @@ def get_spending_by_category(
     start_datetime = datetime(start_date.year, start_date.month, start_date.day) if start_date else None
     end_datetime = datetime(end_date.year, end_date.month, end_date.day, 23, 59, 59) if end_date else None
     
-    service = TransactionService(db)
-    return service.get_spending_by_category(
+    service = AsyncTransactionService(db)
+    return await response_cache.respond_async(request, db, List[dict], lambda: service.get_spending_by_category(
         start_date=start_datetime,
         end_date=end_datetime
-    )
+    ))
 
 @router.get("/stats/income-by-category", response_model=List[dict])
-def get_income_by_category(
+async def get_income_by_category(
+    request: Request,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get aggregated income by category.
@@ -116,23 +212,24 @@ def get_income_by_category(
     start_datetime = datetime(start_date.year, start_date.month, start_date.day) if start_date else None
     end_datetime = datetime(end_date.year, end_date.month, end_date.day, 23, 59, 59) if end_date else None
     
-    service = TransactionService(db)
-    return service.get_income_by_category(
+    service = AsyncTransactionService(db)
+    return await response_cache.respond_async(request, db, List[dict], lambda: service.get_income_by_category(
         start_date=start_datetime,
         end_date=end_datetime
-    )
+    ))
 
 @router.get("/stats/trends", response_model=dict)
-def get_spending_trends(
+async def get_spending_trends(
+    request: Request,
     num_periods: int = Query(6, gt=0, le=12),
     period_days: int = Query(30, gt=0, le=365),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get spending trends over time periods.
     """
-    service = TransactionService(db)
-    return service.get_spending_trends(
+    service = AsyncTransactionService(db)
+    return await response_cache.respond_async(request, db, dict, lambda: service.get_spending_trends(
         num_periods=num_periods,
         period_days=period_days
-    )
\ No newline at end of file
+    ))
\ No newline at end of file
@@ -67,11 +67,55 @@ class MappingRule(MappingRuleBase):
         from_attributes = True
 
 # Import schemas
+class PreviewTransaction(TransactionCreate):
+    position: int  # Identifies the transaction in ImportRequest.transaction_ids
+
+class ImportedFile(BaseModel):
+    sha256: str
+    source: Optional[str] = None
+    row_count: int
+    first_date: Optional[datetime] = None
+    last_date: Optional[datetime] = None
+    import_id: str
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
 class ImportPreviewResponse(BaseModel):
-    transactions: List[TransactionCreate]
+    transactions: List[PreviewTransaction]
     total_count: int
-    possible_duplicates: List[TransactionCreate] = []
+    possible_duplicates: List[PreviewTransaction] = []
+    import_id: str
+    already_imported: Optional[ImportedFile] = None  # Set, with nothing staged, if the file was imported before
     
+class ImportSummary(BaseModel):
+    import_id: str
+    imported_count: int
+    duplicate_count: int
+
+class BatchImportSummary(ImportSummary):
+    file_count: int
+
 class ImportRequest(BaseModel):
     import_id: str
-    transaction_ids: List[int] = []  # Empty means import all from preview
\ No newline at end of file
+    transaction_ids: List[int] = []  # Positions from the preview; empty means import all
+
+class ImportJobStatus(BaseModel):
+    id: str
+    filename: str
+    status: str
+    stage: str
+    rows_total: Optional[int] = None
+    rows_processed: int
+    imported_count: int
+    duplicate_count: int
+    import_id: Optional[str] = None
+    error: Optional[str] = None
+    eta_seconds: Optional[float] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
\ No newline at end of file
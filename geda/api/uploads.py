@@ -0,0 +1,82 @@
+import hashlib
+import os
+import tempfile
+from typing import Awaitable, Callable, NamedTuple, Optional
+from fastapi import HTTPException, Request, Response, UploadFile
+from fastapi.responses import JSONResponse
+
+# Bytes copied from an upload at a time; the most of it held in memory
+UPLOAD_CHUNK_BYTES = 1 << 20
+
+# Largest upload request accepted
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(100 << 20)))
+
+class SavedUpload(NamedTuple):
+    """An upload written to disk"""
+    path: str
+    sha256: str  # Hex digest of the content
+    size: int
+
+def upload_too_large(max_bytes: int = MAX_UPLOAD_BYTES) -> HTTPException:
+    """The error returned for an upload over the size limit"""
+    return HTTPException(status_code=413, detail=f"Upload exceeds the {max_bytes} byte limit")
+
+def save_upload(file: UploadFile, path: Optional[str] = None, max_bytes: int = MAX_UPLOAD_BYTES) -> SavedUpload:
+    """
+    Stream an upload to disk one chunk at a time, hashing it on the way.
+    
+    Blocks on file I/O, so async routes call it via run_in_threadpool.
+    
+    Args:
+        file: The uploaded file
+        path: Where to write it; by default a temporary file with the
+            upload's extension, which the caller must delete
+        max_bytes: Largest upload accepted
+    
+    Returns:
+        Where the upload was written, with its SHA-256 and size
+    
+    Raises:
+        HTTPException: 413 once the upload is found to exceed max_bytes;
+            nothing is left on disk
+    """
+    # The multipart parser already knows the size, so refuse before copying
+    if file.size is not None and file.size > max_bytes:
+        raise upload_too_large(max_bytes)
+    
+    if path is None:
+        _, ext = os.path.splitext(file.filename or "")
+        fd, path = tempfile.mkstemp(suffix=ext)
+        out = os.fdopen(fd, "wb")
+    else:
+        out = open(path, "wb")
+    
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with out:
+            for chunk in iter(lambda: file.file.read(UPLOAD_CHUNK_BYTES), b""):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise upload_too_large(max_bytes)
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    
+    return SavedUpload(path, digest.hexdigest(), size)
+
+
+async def reject_oversized_requests(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    """
+    HTTP middleware refusing a request whose declared body is over the upload limit.
+    
+    The multipart parser spools a whole upload before the route runs, so
+    this is what stops an oversized one before it is read at all.
+    """
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+        error = upload_too_large()
+        return JSONResponse(status_code=error.status_code, content={"detail": error.detail})
+    return await call_next(request)
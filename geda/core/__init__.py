@@ -1,13 +1,15 @@
 from geda.core.categorizer import TransactionCategorizer
 from geda.core.import_service import ImportService
-from geda.core.transaction_service import TransactionService
-from geda.core.category_service import CategoryService
+from geda.core.transaction_service import TransactionService, AsyncTransactionService
+from geda.core.category_service import CategoryService, AsyncCategoryService
 from geda.core.rule_service import RuleService
 
 __all__ = [
     "TransactionCategorizer",
     "ImportService",
     "TransactionService",
+    "AsyncTransactionService",
     "CategoryService",
+    "AsyncCategoryService",
     "RuleService"
 ]
\ No newline at end of file
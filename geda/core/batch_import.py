@@ -0,0 +1,110 @@
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Iterable
+
+from geda.parsers import ParserFactory
+
+# Statement formats ParserFactory can parse
+STATEMENT_EXTENSIONS = (".csv", ".pdf")
+
+# Most bytes extracted from the zip archives of one batch
+MAX_EXTRACTED_BYTES = int(os.environ.get("MAX_EXTRACTED_BYTES", str(500 << 20)))
+
+# Most files extracted from the zip archives of one batch
+MAX_ARCHIVE_MEMBERS = int(os.environ.get("MAX_ARCHIVE_MEMBERS", "1000"))
+
+def collect_statement_files(paths: Iterable[str], extract_dir: str) -> List[str]:
+    """
+    Expand a mix of statement files, zip archives and directories into statement files.
+    
+    Directories are searched recursively and zip archives are extracted into
+    extract_dir. Files that aren't statements are skipped, unless they were
+    named explicitly.
+    
+    Args:
+        paths: Files, zip archives and directories
+        extract_dir: Directory zip archives are extracted into
+    
+    Returns:
+        Paths of the statement files, in a stable order
+    
+    Raises:
+        ValueError: If an archive has a member outside its own directory, or
+            the archives hold more than MAX_ARCHIVE_MEMBERS files or
+            MAX_EXTRACTED_BYTES bytes
+    """
+    files = []
+    budget = [MAX_ARCHIVE_MEMBERS, MAX_EXTRACTED_BYTES]  # Members and bytes left to extract
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(_statements_in_directory(path))
+        elif zipfile.is_zipfile(path):
+            target = os.path.join(extract_dir, f"{len(files)}_{os.path.basename(path)}")
+            _extract_archive(path, target, budget)
+            files.extend(_statements_in_directory(target))
+        else:
+            files.append(path)
+    return files
+
+def _extract_archive(path: str, target: str, budget: List[int]) -> None:
+    """
+    Extract a zip archive, refusing unsafe paths and anything over the budget.
+    
+    Everything is checked before anything is written. zipfile never reads
+    more than a member's declared size, so the declared sizes are a bound
+    on what extraction writes.
+    """
+    with zipfile.ZipFile(path) as archive:
+        members = [member for member in archive.infolist() if not member.is_dir()]
+        for member in members:
+            name = member.filename.replace("\\", "/")
+            if name.startswith("/") or os.path.isabs(name) or ".." in name.split("/"):
+                raise ValueError(f"Unsafe path in archive {os.path.basename(path)}: {member.filename}")
+        
+        budget[0] -= len(members)
+        if budget[0] < 0:
+            raise ValueError(f"Archives hold more than {MAX_ARCHIVE_MEMBERS} files")
+        budget[1] -= sum(member.file_size for member in members)
+        if budget[1] < 0:
+            raise ValueError(f"Archives extract to more than {MAX_EXTRACTED_BYTES} bytes")
+        
+        archive.extractall(target, members)
+
+def _statements_in_directory(directory: str) -> List[str]:
+    """Statement files anywhere below a directory, sorted by path"""
+    files = []
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if name.lower().endswith(STATEMENT_EXTENSIONS) and not name.startswith("."):
+                files.append(os.path.join(root, name))
+    return sorted(files)
+
+def parse_file(file_path: str) -> List[Dict[str, Any]]:
+    """Parse one statement file; runs inside a worker process"""
+    return ParserFactory.get_parser(file_path).parse(file_path)
+
+def parse_files(file_paths: List[str], max_workers: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+    """
+    Parse statement files in a process pool, one file per task.
+    
+    Parsing is CPU-bound (pandas, tabula), so processes rather than threads
+    let files from different banks parse at the same time. A single file,
+    or max_workers=1, is parsed in this process.
+    
+    Args:
+        file_paths: Statement files to parse
+        max_workers: Maximum number of worker processes (default: CPU count)
+    
+    Returns:
+        The transactions of each file, in the order of file_paths
+    
+    Raises:
+        ValueError: If a file type is not supported
+    """
+    if len(file_paths) <= 1 or max_workers == 1:
+        return [parse_file(path) for path in file_paths]
+    
+    workers = min(len(file_paths), max_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(parse_file, file_paths))
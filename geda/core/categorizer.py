@@ -1,17 +1,31 @@
-import re
-from typing import Optional, List, Dict, Any
-from sqlalchemy.orm import Session
-import openai
+import json
 import os
-from geda.models import Transaction, Category, MappingRule
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Tuple
+from sqlalchemy.orm import Session
+from geda.models import Transaction, Category
+from geda.core.rule_cache import categorization_cache, CategorizationSnapshot, CategoryInfo
+from geda.core.llm_cache import llm_cache, normalize_description
+from geda.core.llm_client import get_completion_backend
+from geda.core.neighbour_model import neighbour_models, NeighbourModel
+from geda.db.writer import READ_ONLY, after_batch_commit
 
 class TransactionCategorizer:
     """Service for auto-categorizing transactions"""
     
     def __init__(self, db: Session):
         self.db = db
-        self.openai_api_key = os.environ.get("OPENAI_API_KEY")
-        self.cache = {}  # Simple in-memory cache for this session
+        self.backend = get_completion_backend()
+        self.model = self.backend.model
+        # Descriptions per LLM request, and how many requests run at once
+        self.llm_batch_size = int(os.environ.get("LLM_BATCH_SIZE", "50"))
+        self.llm_max_concurrency = int(os.environ.get("LLM_MAX_CONCURRENCY", "4"))
+        # Retries per request, waiting llm_retry_backoff * 2^attempt seconds between them
+        self.llm_max_retries = int(os.environ.get("LLM_MAX_RETRIES", "3"))
+        self.llm_retry_backoff = float(os.environ.get("LLM_RETRY_BACKOFF", "1.0"))
+        # LLM answers got through a read-only session, waiting for store_llm_answers()
+        self.unsaved_llm_answers: List[Tuple[str, int]] = []
     
     def categorize_transaction(self, transaction: Transaction) -> Optional[Category]:
         """
@@ -20,8 +34,9 @@ class TransactionCategorizer:
         The categorization process follows this order:
         1. Check if there is a user override (transaction already has category_id)
         2. Check if there are matching rules in the database
-        3. Check the cache for similar descriptions
-        4. Call the LLM to categorize
+        3. Check the LLM cache for similar descriptions
+        4. Ask the nearest-neighbour model trained on categorized transactions
+        5. Call the LLM to categorize
         
         Args:
             transaction: The transaction to categorize
@@ -33,111 +48,251 @@ class TransactionCategorizer:
         if transaction.category_id is not None:
             return transaction.category
         
-        # Check for rule-based matches
-        category = self._apply_rules(transaction)
-        if category:
-            return category
-        
-        # Check cache
-        if transaction.description in self.cache:
-            category_id = self.cache[transaction.description]
-            return self.db.query(Category).filter(Category.id == category_id).first()
-        
-        # Call LLM
-        if self.openai_api_key:
-            category = self._categorize_with_llm(transaction)
-            if category:
-                # Update cache
-                self.cache[transaction.description] = category.id
-                return category
+        category_id = self.suggest_category_id(
+            transaction.description, transaction.source, transaction.amount
+        )
+        if category_id is None:
+            return None
+        return self.db.get(Category, category_id)
+    
+    def suggest_category_id(self, description: str, source: str, amount: float) -> Optional[int]:
+        """
+        Suggest a category for a transaction that isn't in the database yet.
+        
+        Follows the same order as categorize_transaction, but works on plain
+        values so callers can categorize rows before inserting them.
+        
+        Args:
+            description: Transaction description
+            source: Transaction source (e.g. "RBC")
+            amount: Transaction amount
+            
+        Returns:
+            The ID of the suggested category, or None if no category can be determined
+        """
+        return self.suggest_category_ids([(description, source, amount)])[0]
+    
+    def suggest_category_ids(self, items: List[Tuple[str, str, float]]) -> List[Optional[int]]:
+        """
+        Suggest categories for many transactions at once.
+        
+        Rules, the LLM cache and the nearest-neighbour model are checked per
+        transaction. The remaining descriptions are deduplicated (after
+        normalization) and sent to the LLM in batches, so an import needs one
+        request per batch of unique merchants rather than one per row.
+        
+        Args:
+            items: (description, source, amount) for each transaction
+            
+        Returns:
+            Category IDs aligned with items; None where no category can be determined
+        """
+        snapshot = self.snapshot
+        neighbours = self.neighbours
+        category_ids = {c.id for c in snapshot.categories}
+        results: List[Optional[int]] = [None] * len(items)
+        
+        # Rows still needing an answer, grouped by normalized description
+        pending: Dict[str, List[int]] = {}
+        for i, (description, source, amount) in enumerate(items):
+            # Check for rule-based matches
+            category_id = snapshot.rule_index.match(description, source)
+            if category_id:
+                results[i] = category_id
+                continue
+            
+            key = normalize_description(description)
+            if key in pending:
+                pending[key].append(i)
+                continue
+            
+            # Check the LLM cache, ignoring answers whose category was deleted
+            category_id = llm_cache.get(self.db, description, self.model)
+            if category_id is not None and category_id in category_ids:
+                results[i] = category_id
+                continue
+            
+            # Check similar descriptions we have already categorized
+            prediction = neighbours.predict(description)
+            if prediction is not None and prediction[0] in category_ids:
+                results[i] = prediction[0]
+                continue
+            
+            pending[key] = [i]
+        
+        # Call LLM once per batch of unique descriptions
+        if pending and self.backend.is_configured():
+            groups = list(pending.values())
+            requests = [(items[group[0]][0], items[group[0]][2]) for group in groups]
+            
+            for group, category in zip(groups, self._categorize_with_llm(requests)):
+                if category:
+                    # Update cache
+                    self._cache_llm_answer(items[group[0]][0], category.id)
+                    neighbours.learn(items[group[0]][0], category.id)
+                    for i in group:
+                        results[i] = category.id
+            neighbours.schedule_save()
         
         # Default to Uncategorized if we have it
-        uncategorized = self.db.query(Category).filter(Category.name == "Uncategorized").first()
-        return uncategorized
+        return [
+            category_id if category_id is not None else snapshot.uncategorized_id
+            for category_id in results
+        ]
+    
+    @property
+    def snapshot(self) -> CategorizationSnapshot:
+        """Compiled rules and categories from the process-wide cache"""
+        return categorization_cache.get(self.db)
     
-    def _apply_rules(self, transaction: Transaction) -> Optional[Category]:
-        """Apply rules to categorize transaction"""
-        # Get all rules, ordered by priority
-        rules = self.db.query(MappingRule).order_by(MappingRule.priority.desc()).all()
-        
-        # First, try source-specific rules
-        source_rules = [r for r in rules if r.source == transaction.source]
-        for rule in source_rules:
-            if self._rule_matches(rule, transaction):
-                return rule.category
-        
-        # Then try generic rules
-        generic_rules = [r for r in rules if r.source is None]
-        for rule in generic_rules:
-            if self._rule_matches(rule, transaction):
-                return rule.category
+    @property
+    def neighbours(self) -> NeighbourModel:
+        """Nearest-neighbour model for this database"""
+        return neighbour_models.get(self.db)
+    
+    def learn(self,
+              description: Optional[str],
+              category_id: Optional[int],
+              previous: Optional[Tuple[str, Optional[int]]] = None) -> None:
+        """
+        Teach the nearest-neighbour model a category the user assigned.
         
-        return None
+        Call after session.commit(); the model changes once the commit is
+        really in the database. Uncategorized is never learned.
+        
+        Args:
+            description: Transaction description, or None if the transaction was deleted
+            category_id: Category now assigned to the transaction
+            previous: (description, category_id) the transaction had before, if it changed
+        """
+        uncategorized_id = self.snapshot.uncategorized_id
+        neighbours = self.neighbours
+        
+        def update():
+            if previous is not None and previous[1] is not None and previous[1] != uncategorized_id:
+                neighbours.unlearn(*previous)
+            if description is not None and category_id is not None and category_id != uncategorized_id:
+                neighbours.learn(description, category_id)
+            neighbours.schedule_save()
+        
+        after_batch_commit(self.db, update)
     
-    def _rule_matches(self, rule: MappingRule, transaction: Transaction) -> bool:
-        """Check if a rule matches a transaction"""
-        if rule.is_regex:
-            try:
-                pattern = re.compile(rule.pattern, re.IGNORECASE)
-                return bool(pattern.search(transaction.description))
-            except re.error:
-                # Invalid regex, skip this rule
-                return False
+    def store_llm_answers(self, db: Session) -> None:
+        """
+        Persist the LLM answers this categorizer got through a read-only session.
+        
+        Args:
+            db: Session that can write, typically a DatabaseWriter's; its
+                commit stores the answers
+        """
+        for description, category_id in self.unsaved_llm_answers:
+            llm_cache.set(db, description, self.model, category_id)
+        self.unsaved_llm_answers = []
+    
+    def _cache_llm_answer(self, description: str, category_id: int) -> None:
+        """Cache an LLM answer, holding it for store_llm_answers() if the session can't write"""
+        if self.db.info.get(READ_ONLY):
+            llm_cache.remember(self.db, description, self.model, category_id)
+            self.unsaved_llm_answers.append((description, category_id))
         else:
-            # Simple case-insensitive substring match
-            return rule.pattern.lower() in transaction.description.lower()
+            llm_cache.set(self.db, description, self.model, category_id)
     
-    def _categorize_with_llm(self, transaction: Transaction) -> Optional[Category]:
-        """Use LLM to categorize transaction"""
-        if not self.openai_api_key:
-            return None
+    def _categorize_with_llm(self, requests: List[Tuple[str, float]]) -> List[Optional[CategoryInfo]]:
+        """
+        Use LLM to categorize transaction descriptions.
         
+        Requests are split into batches of llm_batch_size, and up to
+        llm_max_concurrency batches are in flight at once.
+        
+        Args:
+            requests: (description, amount) pairs
+            
+        Returns:
+            The category for each request, or None where the LLM gave no usable answer
+        """
         # Get all categories
-        categories = self.db.query(Category).all()
+        categories = self.snapshot.categories
+        
+        batches = [
+            requests[start:start + self.llm_batch_size]
+            for start in range(0, len(requests), self.llm_batch_size)
+        ]
+        workers = max(1, min(self.llm_max_concurrency, len(batches)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            answers = executor.map(lambda batch: self._categorize_batch(batch, categories), batches)
+            return [category for batch_answers in answers for category in batch_answers]
+    
+    def _categorize_batch(self,
+                          batch: List[Tuple[str, float]],
+                          categories: List[CategoryInfo]) -> List[Optional[CategoryInfo]]:
+        """Ask the LLM for the categories of one batch with a single JSON request"""
         category_names = [c.name for c in categories]
+        lines = [
+            f"{number}. '{description}' (${abs(amount):.2f})"
+            for number, (description, amount) in enumerate(batch, start=1)
+        ]
+        messages = [
+            {"role": "system", "content": (
+                "You are a financial transaction categorizer. "
+                "Your task is to categorize each transaction into one of the predefined categories. "
+                "Respond with ONLY a JSON object mapping each transaction number to its category name."
+            )},
+            {"role": "user", "content": (
+                f"Categories: {', '.join(category_names)}\n\n"
+                "Transactions:\n" + "\n".join(lines)
+            )}
+        ]
         
         try:
-            # Call OpenAI API
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": (
-                        "You are a financial transaction categorizer. "
-                        "Your task is to categorize a transaction into one of the predefined categories. "
-                        "Respond with ONLY the category name."
-                    )},
-                    {"role": "user", "content": (
-                        f"Categorize this transaction: '{transaction.description}' (${abs(transaction.amount):.2f}) "
-                        f"into one of these categories: {', '.join(category_names)}. "
-                        "Respond with ONLY the category name."
-                    )}
-                ],
-                max_tokens=20,
-                temperature=0.3
-            )
-            
-            # Extract prediction
-            prediction = response.choices[0].message.content.strip()
-            
-            # Find closest category match
-            for category in categories:
-                if category.name.lower() == prediction.lower():
-                    return category
-            
-            # If exact match not found, try fuzzy match
-            for category in categories:
-                if category.name.lower() in prediction.lower() or prediction.lower() in category.name.lower():
-                    return category
+            reply = self._complete_with_retry(messages, max_tokens=20 * len(batch) + 20)
             
+            # Extract predictions, ignoring any text around the JSON object
+            predictions = json.loads(reply[reply.index("{"):reply.rindex("}") + 1])
         except Exception as e:
             # Log error and continue
             print(f"Error calling LLM: {e}")
+            return [None] * len(batch)
+        
+        return [
+            self._match_category(str(predictions.get(str(number), "")), categories)
+            for number in range(1, len(batch) + 1)
+        ]
+    
+    def _complete_with_retry(self, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        """Call the completion backend, retrying with exponential backoff"""
+        for attempt in range(self.llm_max_retries + 1):
+            try:
+                return self.backend.complete(messages, max_tokens)
+            except Exception:
+                if attempt == self.llm_max_retries:
+                    raise
+                time.sleep(self.llm_retry_backoff * 2 ** attempt)
+    
+    @staticmethod
+    def _match_category(prediction: str, categories: List[CategoryInfo]) -> Optional[CategoryInfo]:
+        """Map an LLM answer to a category"""
+        prediction = prediction.strip()
+        if not prediction:
+            return None
+        
+        # Find closest category match
+        for category in categories:
+            if category.name.lower() == prediction.lower():
+                return category
+        
+        # If exact match not found, try fuzzy match
+        for category in categories:
+            if category.name.lower() in prediction.lower() or prediction.lower() in category.name.lower():
+                return category
         
         return None
     
     def batch_categorize(self, transactions: List[Transaction]) -> None:
-        """Categorize a batch of transactions"""
-        for transaction in transactions:
-            category = self.categorize_transaction(transaction)
-            if category:
-                transaction.category_id = category.id
\ No newline at end of file
+        """Categorize a batch of transactions, sharing LLM requests between them"""
+        uncategorized = [t for t in transactions if t.category_id is None]
+        category_ids = self.suggest_category_ids(
+            [(t.description, t.source, t.amount) for t in uncategorized]
+        )
+        for transaction, category_id in zip(uncategorized, category_ids):
+            if category_id:
+                transaction.category_id = category_id
\ No newline at end of file
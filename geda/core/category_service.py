@@ -1,8 +1,10 @@
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 
 from geda.models import Category, Transaction
+from geda.core.daily_totals import DailyTotalsService
 
 class CategoryService:
     """Service for managing categories"""
@@ -109,6 +111,11 @@ class CategoryService:
             ).update(
                 {"category_id": reassign_to_id}
             )
+            DailyTotalsService(self.db).move_category(category_id, reassign_to_id)
+        else:
+            # Deleting nulls the transactions' category; their totals become
+            # Uncategorized rather than waiting for the id to be reused
+            DailyTotalsService(self.db).move_category(category_id, None)
         
         # Delete the category
         self.db.delete(category)
@@ -149,4 +156,22 @@ class CategoryService:
                 cat["is_default"] = True
                 created.append(self.create_category(cat))
         
-        return created
\ No newline at end of file
+        return created
+
+class AsyncCategoryService:
+    """The read paths of CategoryService for async routes, run through AsyncSession.run_sync"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_categories(self) -> List[Category]:
+        """See CategoryService.get_categories"""
+        return await self.db.run_sync(lambda db: CategoryService(db).get_categories())
+    
+    async def get_category(self, category_id: int) -> Optional[Category]:
+        """See CategoryService.get_category"""
+        return await self.db.run_sync(lambda db: CategoryService(db).get_category(category_id))
+    
+    async def get_category_by_name(self, name: str) -> Optional[Category]:
+        """See CategoryService.get_category_by_name"""
+        return await self.db.run_sync(lambda db: CategoryService(db).get_category_by_name(name))
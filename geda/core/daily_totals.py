@@ -0,0 +1,162 @@
+from datetime import date, datetime
+from typing import Dict, Any, Optional, Tuple, List, Union
+from sqlalchemy import func, cast, Date, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from geda.models import Transaction, DailyCategoryTotal, UNCATEGORIZED_ID
+
+# (day, category_id, is_expense)
+TotalsKey = Tuple[date, int, bool]
+
+# Rollup keys per IN (...) lookup, kept below SQLite's bound-parameter limit
+KEY_LOOKUP_BATCH_SIZE = 300
+
+class DailyTotalsDelta:
+    """
+    Changes to daily_category_totals collected from added and removed transactions.
+    
+    Services add every transaction they insert and remove every one they
+    delete (an update is a removal of the old values plus an addition of
+    the new ones), then apply the delta in the same transaction.
+    """
+    
+    def __init__(self):
+        self._changes: Dict[TotalsKey, List[Union[float, int]]] = {}
+    
+    def __bool__(self) -> bool:
+        return bool(self._changes)
+    
+    def add(self, transaction: Union[Transaction, Dict[str, Any]], sign: int = 1) -> None:
+        """
+        Count a transaction in (sign=1) or out of (sign=-1) the totals.
+        
+        Args:
+            transaction: Transaction object or dict with date, amount, category_id and is_expense
+        """
+        if isinstance(transaction, dict):
+            when, amount = transaction["date"], transaction["amount"]
+            category_id, is_expense = transaction.get("category_id"), transaction["is_expense"]
+        else:
+            when, amount = transaction.date, transaction.amount
+            category_id, is_expense = transaction.category_id, transaction.is_expense
+        
+        day = when.date() if isinstance(when, datetime) else when
+        self.change(day, category_id, bool(is_expense), sign * amount, sign)
+    
+    def change(self, day: date, category_id: Optional[int], is_expense: bool, total: float, count: int) -> None:
+        """Add total and count to one rollup row"""
+        key = (day, category_id or UNCATEGORIZED_ID, is_expense)
+        change = self._changes.setdefault(key, [0.0, 0])
+        change[0] += total
+        change[1] += count
+    
+    def remove(self, transaction: Union[Transaction, Dict[str, Any]]) -> None:
+        """Count a transaction out of the totals"""
+        self.add(transaction, sign=-1)
+    
+    def rows(self) -> List[Dict[str, Any]]:
+        """Non-empty changes as daily_category_totals rows"""
+        return [
+            {"day": key[0], "category_id": key[1], "is_expense": key[2], "total": total, "count": count}
+            for key, (total, count) in self._changes.items()
+            if count or total
+        ]
+
+class DailyTotalsService:
+    """Service for maintaining the daily_category_totals rollup"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def apply(self, delta: DailyTotalsDelta) -> None:
+        """
+        Add a delta to the rollup. The caller commits.
+        
+        Rows whose count drops to zero are deleted, so the rollup never
+        lists days or categories without transactions. Only rows the delta
+        took transactions out of are checked.
+        """
+        rows = delta.rows()
+        if not rows:
+            return
+        
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            statement = insert(DailyCategoryTotal)
+            statement = statement.on_conflict_do_update(
+                index_elements=["day", "category_id", "is_expense"],
+                set_={
+                    "total": DailyCategoryTotal.total + statement.excluded.total,
+                    "count": DailyCategoryTotal.count + statement.excluded.count,
+                }
+            )
+            self.db.execute(statement, rows)
+        else:
+            for row in rows:
+                total = self.db.get(DailyCategoryTotal, (row["day"], row["category_id"], row["is_expense"]))
+                if total is None:
+                    self.db.add(DailyCategoryTotal(**row))
+                else:
+                    total.total += row["total"]
+                    total.count += row["count"]
+            self.db.flush()
+        
+        emptied = [(row["day"], row["category_id"], row["is_expense"]) for row in rows if row["count"] < 0]
+        key = tuple_(DailyCategoryTotal.day, DailyCategoryTotal.category_id, DailyCategoryTotal.is_expense)
+        for start in range(0, len(emptied), KEY_LOOKUP_BATCH_SIZE):
+            self.db.query(DailyCategoryTotal).filter(
+                key.in_(emptied[start:start + KEY_LOOKUP_BATCH_SIZE]),
+                DailyCategoryTotal.count <= 0
+            ).delete(synchronize_session=False)
+    
+    def move_category(self, from_category_id: Optional[int], to_category_id: Optional[int]) -> None:
+        """
+        Move the totals of one category to another, e.g. when its
+        transactions are reassigned. The caller commits.
+        """
+        delta = DailyTotalsDelta()
+        moved = self.db.query(DailyCategoryTotal).filter(
+            DailyCategoryTotal.category_id == (from_category_id or UNCATEGORIZED_ID)
+        ).all()
+        for row in moved:
+            delta.change(row.day, from_category_id, row.is_expense, -row.total, -row.count)
+            delta.change(row.day, to_category_id, row.is_expense, row.total, row.count)
+        self.apply(delta)
+    
+    def rebuild(self) -> int:
+        """
+        Recompute the whole rollup from the transactions table and commit.
+        
+        Returns:
+            Number of rollup rows
+        """
+        if self.db.get_bind().dialect.name == "sqlite":
+            day = func.date(Transaction.date)
+        else:
+            day = cast(Transaction.date, Date)
+        category_id = func.coalesce(Transaction.category_id, UNCATEGORIZED_ID)
+        
+        totals = self.db.query(
+            day,
+            category_id,
+            Transaction.is_expense,
+            func.sum(Transaction.amount),
+            func.count(Transaction.id)
+        ).group_by(
+            day,
+            category_id,
+            Transaction.is_expense
+        )
+        
+        self.db.query(DailyCategoryTotal).delete(synchronize_session=False)
+        self.db.execute(
+            DailyCategoryTotal.__table__.insert().from_select(
+                ["day", "category_id", "is_expense", "total", "count"],
+                totals.statement
+            )
+        )
+        self.db.commit()
+        
+        return self.db.query(func.count()).select_from(DailyCategoryTotal).scalar()
@@ -0,0 +1,274 @@
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, Future
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Callable
+from sqlalchemy.orm import Session
+
+from geda.db import SessionLocal, db_writer
+from geda.db.writer import DatabaseWriter, READ_ONLY, after_batch_commit
+from geda.models import ImportJob
+from geda.core.import_service import ImportService
+
+# Statuses of jobs that haven't finished
+ACTIVE_STATUSES = ("queued", "running")
+
+class ImportCancelled(Exception):
+    """Raised inside a running job when its cancellation is noticed"""
+
+class ImportJobManager:
+    """
+    Runs file imports in the background on a bounded thread pool.
+    
+    Jobs are rows in the import_jobs table, so their progress can be read
+    from any session and unfinished jobs are picked up again by
+    resume_pending() after a restart. Every write, from a chunk's rows to
+    a progress update, goes through the DatabaseWriter; the job threads
+    only read. Uploads are kept in upload_dir until the commit ending their
+    job. A running job is cancelled between chunks; chunks it already
+    committed stay imported.
+    """
+    
+    def __init__(self,
+                 session_factory: Callable[..., Session],
+                 writer: DatabaseWriter,
+                 max_workers: int = 2,
+                 upload_dir: str = "./uploads"):
+        """
+        Args:
+            session_factory: Creates the sessions jobs read through (e.g. SessionLocal)
+            writer: Writer the jobs' writes are sent to
+            max_workers: Maximum number of imports running at once
+            upload_dir: Directory uploads are kept in while their jobs run
+        """
+        self.session_factory = session_factory
+        self.writer = writer
+        self.max_workers = max_workers
+        self.upload_dir = upload_dir
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: Dict[str, Future] = {}
+    
+    def submit(self, file_path: str, filename: str, auto_categorize: bool = True) -> ImportJob:
+        """
+        Queue a file for import.
+        
+        The file is moved into upload_dir and its rows counted on the
+        calling thread; only the job row is written through the writer.
+        The caller must not delete the file. Not for code already running
+        on the writer thread.
+        
+        Args:
+            file_path: Path of the uploaded file
+            filename: Original file name; its extension selects the parser
+            auto_categorize: Whether to automatically categorize transactions
+        
+        Returns:
+            The queued job
+        """
+        job_id = str(uuid.uuid4())
+        _, ext = os.path.splitext(filename)
+        
+        os.makedirs(self.upload_dir, exist_ok=True)
+        stored_path = os.path.join(self.upload_dir, f"{job_id}{ext.lower()}")
+        shutil.move(file_path, stored_path)
+        
+        def create(db: Session) -> ImportJob:
+            job = ImportJob(
+                id=job_id,
+                filename=filename,
+                file_path=stored_path,
+                auto_categorize=auto_categorize,
+                rows_total=rows_total,
+            )
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            return job
+        
+        try:
+            rows_total = self._estimate_rows(stored_path)
+            job = self.writer.run(create)
+        except BaseException:
+            # No job owns the upload
+            os.unlink(stored_path)
+            raise
+        
+        self._schedule(job_id)
+        return job
+    
+    def get(self, db: Session, job_id: str) -> Optional[ImportJob]:
+        """Get a job by ID"""
+        return db.get(ImportJob, job_id)
+    
+    def cancel(self, db: Session, job_id: str) -> Optional[ImportJob]:
+        """
+        Cancel a job.
+        
+        Queued jobs are cancelled immediately; running jobs stop after their
+        current chunk. Finished jobs are left as they are.
+        
+        Returns:
+            The job, or None if not found
+        """
+        job = db.get(ImportJob, job_id)
+        if job is None:
+            return None
+        
+        cancelled = job.status == "queued"
+        if cancelled:
+            self._finish(job, "cancelled")
+        elif job.status == "running":
+            job.cancel_requested = True
+        db.commit()
+        db.refresh(job)
+        
+        if cancelled:
+            self._remove_upload_after_commit(db, job.file_path)
+        return job
+    
+    def resume_pending(self) -> List[str]:
+        """
+        Requeue jobs that were queued or running when the process stopped.
+        
+        Interrupted jobs start over; rows they already committed are
+        recognized as duplicates.
+        
+        Returns:
+            IDs of the requeued jobs
+        """
+        def requeue(db: Session) -> List[str]:
+            jobs = db.query(ImportJob).filter(ImportJob.status.in_(ACTIVE_STATUSES)).all()
+            for job in jobs:
+                if job.cancel_requested:
+                    self._finish(job, "cancelled")
+                    self._remove_upload_after_commit(db, job.file_path)
+                else:
+                    job.status = "queued"
+                    job.stage = "queued"
+            db.commit()
+            return [job.id for job in jobs if job.status == "queued"]
+        
+        job_ids = self.writer.run(requeue)
+        for job_id in job_ids:
+            self._schedule(job_id)
+        return job_ids
+    
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> None:
+        """Block until a job scheduled by this manager has finished"""
+        future = self._futures.get(job_id)
+        if future is not None:
+            future.result(timeout)
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads; unfinished jobs resume on the next start"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+    
+    def _schedule(self, job_id: str) -> None:
+        """Hand a job to the thread pool, starting the pool if needed"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="import-job"
+                )
+            # Forget finished jobs; wait() returns at once for them
+            self._futures = {k: f for k, f in self._futures.items() if not f.done()}
+            self._futures[job_id] = self._executor.submit(self._run, job_id)
+    
+    def _run(self, job_id: str) -> None:
+        """Import a job's file, recording progress after every chunk"""
+        def start(db: Session) -> Optional[ImportJob]:
+            job = db.get(ImportJob, job_id)
+            if job is None or job.status != "queued":
+                return None
+            job.status = "running"
+            job.stage = "parsing"
+            job.started_at = datetime.utcnow()
+            job.rows_processed = 0
+            db.commit()
+            return job
+        
+        job = self.writer.run(start)
+        if job is None:
+            return
+        
+        def on_chunk(summary: Dict[str, Any]) -> None:
+            def record_progress(db: Session) -> bool:
+                job = db.get(ImportJob, job_id)
+                job.stage = "importing"
+                job.import_id = summary["import_id"]
+                job.rows_processed = summary["rows_processed"]
+                job.imported_count = summary["imported_count"]
+                job.duplicate_count = summary["duplicate_count"]
+                if job.rows_total is not None and job.rows_processed > job.rows_total:
+                    job.rows_total = job.rows_processed
+                db.commit()
+                # Read in the writer's transaction, so a cancel() is never missed
+                return job.cancel_requested
+            
+            if self.writer.run(record_progress):
+                raise ImportCancelled()
+        
+        status, error = "completed", None
+        db = self.session_factory(info={READ_ONLY: True})
+        try:
+            ImportService(db, self.writer).import_from_file_in_chunks(
+                job.file_path, job.auto_categorize, on_chunk=on_chunk
+            )
+        except ImportCancelled:
+            status = "cancelled"
+        except Exception as e:
+            status, error = "failed", str(e)
+        finally:
+            db.close()
+        
+        def finish(db: Session) -> None:
+            job = db.get(ImportJob, job_id)
+            if status == "completed":
+                job.rows_total = job.rows_processed
+            job.error = error
+            self._finish(job, status)
+            db.commit()
+            self._remove_upload_after_commit(db, job.file_path)
+        
+        self.writer.run(finish)
+    
+    def _finish(self, job: ImportJob, status: str) -> None:
+        """Mark a job as ended; its upload is removed by _remove_upload_after_commit()"""
+        job.status = status
+        job.stage = "done"
+        job.finished_at = datetime.utcnow()
+    
+    @staticmethod
+    def _remove_upload_after_commit(db: Session, file_path: str) -> None:
+        """
+        Delete a finished job's upload once db's commit is in the database.
+        
+        Call after db.commit(). If the commit is rolled back instead, the
+        job still looks unfinished and resume_pending() needs the file.
+        """
+        def remove() -> None:
+            if os.path.exists(file_path):
+                os.unlink(file_path)
+        after_batch_commit(db, remove)
+    
+    @staticmethod
+    def _estimate_rows(file_path: str) -> Optional[int]:
+        """Rows in a CSV file (lines after the header); unknown for other formats"""
+        if not file_path.lower().endswith(".csv"):
+            return None
+        with open(file_path, "rb") as f:
+            return max(sum(1 for _ in f) - 1, 0)
+
+# Shared by the API; its threads start with the first job
+import_job_manager = ImportJobManager(
+    SessionLocal,
+    db_writer,
+    max_workers=int(os.environ.get("IMPORT_WORKERS", "2")),
+    upload_dir=os.environ.get("IMPORT_UPLOAD_DIR", "./uploads"),
+)
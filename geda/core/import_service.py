@@ -1,63 +1,234 @@
 import os
 import uuid
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Set, Iterable, Callable, TypeVar
+from sqlalchemy import insert, delete
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from geda.models import Transaction
+from geda.models import Transaction, StagedTransaction, ImportedFile
 from geda.parsers import ParserFactory
+from geda.parsers.base_parser import DEFAULT_CHUNK_SIZE
+from geda.parsers.pdf_tables import file_digest
 from geda.core.categorizer import TransactionCategorizer
+from geda.core.daily_totals import DailyTotalsDelta, DailyTotalsService
+from geda.core.batch_import import parse_files
+from geda.db.writer import DatabaseWriter
+
+T = TypeVar("T")
+
+# Hashes per IN (...) lookup, kept below SQLite's bound-parameter limit
+HASH_LOOKUP_BATCH_SIZE = 500
+
+# How long a preview can be confirmed before its staged rows are discarded
+STAGED_PREVIEW_TTL = timedelta(hours=24)
+
+# Staged rows per multi-row INSERT, kept below SQLite's bound-parameter limit
+STAGING_INSERT_BATCH_SIZE = 500
+
+# Columns copied between staged_transactions and transactions
+STAGED_COLUMNS = (
+    "date", "amount", "description", "original_description",
+    "is_expense", "source", "source_id", "hash_id",
+)
+
+class FileStats:
+    """Row count, source and date range of a file, gathered as its rows are imported"""
+    
+    def __init__(self):
+        self.source: Optional[str] = None
+        self.row_count = 0
+        self.first_date: Optional[datetime] = None
+        self.last_date: Optional[datetime] = None
+    
+    def add(self, transactions: List[Dict[str, Any]]) -> None:
+        """Count a batch of the file's parsed transactions"""
+        for transaction in transactions:
+            self.source = self.source or transaction["source"]
+            date = transaction["date"]
+            self.first_date = date if self.first_date is None else min(self.first_date, date)
+            self.last_date = date if self.last_date is None else max(self.last_date, date)
+        self.row_count += len(transactions)
 
 class ImportService:
     """Service for importing transactions from files"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, writer: Optional[DatabaseWriter] = None):
+        """
+        Args:
+            db: Session to read through, and to write through without a writer
+            writer: Writer the imports' inserts are sent to, one job per
+                commit. Parsing, duplicate checks and categorization (which
+                may call the LLM) then run on the caller's thread, and db is
+                only read. Not for code already running on the writer thread.
+        """
         self.db = db
+        self.writer = writer
         self.categorizer = TransactionCategorizer(db)
     
-    def preview_import(self, file_path: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    def preview_import(self, file_path: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], str]:
         """
         Parse a file and return the transactions for preview, along with potential duplicates.
         
+        The parsed rows are staged under the returned import_id, so
+        confirm_import() can import them later without parsing the file again.
+        Each transaction's position identifies it within the preview.
+        Callers wanting to skip files imported before check
+        find_imported_file() first.
+        
         Args:
             file_path: Path to the file to import
             
         Returns:
-            Tuple of (transactions, duplicates)
+            Tuple of (transactions, duplicates, import_id)
+        """
+        transactions, duplicates, import_id = self.parse_preview(file_path)
+        self.stage_preview(import_id, transactions, file_digest(file_path))
+        return transactions, duplicates, import_id
+    
+    def parse_preview(self, file_path: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], str]:
+        """
+        The read-only half of preview_import(): parse and check for duplicates.
+        
+        Returns:
+            Tuple of (transactions, duplicates, import_id)
         """
         # Get parser based on file type
         parser = ParserFactory.get_parser(file_path)
         
         # Parse the file
-        transactions = parser.parse(file_path)
+        return self.build_preview(parser.parse(file_path))
+    
+    def build_preview(self, transactions: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], str]:
+        """
+        Turn parsed transactions into a preview, for callers that parsed the file themselves.
         
+        Returns:
+            Tuple of (transactions, duplicates, import_id)
+        """
         # Check for potential duplicates
-        duplicates = []
-        for transaction in transactions:
-            # Check if this hash already exists in the database
-            existing = self.db.query(Transaction).filter(
-                Transaction.hash_id == transaction["hash_id"]
-            ).first()
-            
-            if existing:
-                # Add to duplicates list
-                duplicates.append(transaction)
+        existing = self.find_existing_hashes(t["hash_id"] for t in transactions)
+        duplicates = [t for t in transactions if t["hash_id"] in existing]
         
         # Generate import_id
         import_id = str(uuid.uuid4())
         
-        # Add import_id to each transaction
-        for transaction in transactions:
+        # Add import_id and position to each transaction
+        for position, transaction in enumerate(transactions):
             transaction["import_id"] = import_id
+            transaction["position"] = position
         
         return transactions, duplicates, import_id
     
+    def stage_preview(self, import_id: str, transactions: List[Dict[str, Any]], digest: Optional[str] = None) -> None:
+        """
+        The writing half of preview_import(): store the parsed rows for confirm_import().
+        
+        With the file's digest, confirming the whole preview records the
+        file as imported.
+        """
+        self.purge_expired_previews()
+        self._stage(import_id, transactions, digest)
+    
+    def confirm_import(self,
+                       import_id: str,
+                       positions: Optional[List[int]] = None,
+                       auto_categorize: bool = True) -> Optional[List[Transaction]]:
+        """
+        Import transactions staged by preview_import().
+        
+        The staged rows are deduplicated and bulk inserted, then the preview
+        is discarded, so it can only be confirmed once. Confirming every row
+        of a preview staged with its file's digest records the file as
+        imported.
+        
+        Args:
+            import_id: The preview's import_id
+            positions: Positions of the previewed transactions to import;
+                empty or None imports all of them
+            auto_categorize: Whether to automatically categorize transactions
+            
+        Returns:
+            List of imported Transaction objects, or None if the preview
+            doesn't exist or has expired
+        """
+        cutoff = datetime.utcnow() - STAGED_PREVIEW_TTL
+        query = self.db.query(StagedTransaction).filter(
+            StagedTransaction.import_id == import_id,
+            StagedTransaction.created_at >= cutoff,
+        )
+        if query.first() is None:
+            return None
+        
+        if positions:
+            query = query.filter(StagedTransaction.position.in_(set(positions)))
+        
+        transactions = []
+        digest = None
+        for staged in query.order_by(StagedTransaction.position):
+            transaction = {column: getattr(staged, column) for column in STAGED_COLUMNS}
+            transaction["import_id"] = import_id
+            transactions.append(transaction)
+            digest = staged.file_sha256
+        
+        non_duplicates, _ = self._split_duplicates(transactions)
+        if auto_categorize:
+            self._assign_categories(non_duplicates)
+        
+        stats = None
+        if digest and not positions:
+            stats = FileStats()
+            stats.add(transactions)
+        
+        # Inserted, recorded and discarded in one commit
+        def write(service: "ImportService") -> List[int]:
+            inserted_ids = service._bulk_insert(non_duplicates)
+            if stats is not None:
+                service._record_file(digest, import_id, stats)
+            service.db.execute(delete(StagedTransaction).where(StagedTransaction.import_id == import_id))
+            return inserted_ids
+        
+        return self._load_transactions(self._write(write))
+    
+    def purge_expired_previews(self) -> int:
+        """
+        Delete staged previews older than STAGED_PREVIEW_TTL.
+        
+        Returns:
+            Number of staged rows deleted
+        """
+        cutoff = datetime.utcnow() - STAGED_PREVIEW_TTL
+        result = self.db.execute(
+            delete(StagedTransaction).where(StagedTransaction.created_at < cutoff)
+        )
+        self.db.commit()
+        return result.rowcount
+    
+    def _stage(self, import_id: str, transactions: List[Dict[str, Any]], digest: Optional[str]) -> None:
+        """Store a preview's parsed rows with multi-row INSERTs"""
+        created_at = datetime.utcnow()
+        rows = []
+        for transaction in transactions:
+            row = {column: transaction.get(column) for column in STAGED_COLUMNS}
+            row["import_id"] = import_id
+            row["position"] = transaction["position"]
+            row["file_sha256"] = digest
+            row["created_at"] = created_at
+            rows.append(row)
+        
+        for start in range(0, len(rows), STAGING_INSERT_BATCH_SIZE):
+            self.db.execute(insert(StagedTransaction), rows[start:start + STAGING_INSERT_BATCH_SIZE])
+        self.db.commit()
+    
     def import_transactions(self, 
                             transactions: List[Dict[str, Any]], 
                             auto_categorize: bool = True) -> List[Transaction]:
         """
         Import transactions into the database.
         
+        Same as bulk_import_transactions(), but returns the inserted rows
+        as Transaction objects.
+        
         Args:
             transactions: List of transaction dictionaries to import
             auto_categorize: Whether to automatically categorize transactions
@@ -65,44 +236,137 @@ class ImportService:
         Returns:
             List of imported Transaction objects
         """
-        # Create Transaction objects
-        db_transactions = []
-        for transaction_data in transactions:
-            transaction = Transaction(
-                date=transaction_data["date"],
-                amount=transaction_data["amount"],
-                description=transaction_data["description"],
-                original_description=transaction_data.get("original_description"),
-                is_expense=transaction_data["is_expense"],
-                source=transaction_data["source"],
-                import_id=transaction_data["import_id"],
-                source_id=transaction_data.get("source_id"),
-                hash_id=transaction_data["hash_id"],
-            )
-            db_transactions.append(transaction)
-            self.db.add(transaction)
-        
-        # Commit to get IDs
-        self.db.commit()
+        return self._load_transactions(self.bulk_import_transactions(transactions, auto_categorize))
+    
+    def bulk_import_transactions(self,
+                                 transactions: List[Dict[str, Any]],
+                                 auto_categorize: bool = True) -> List[int]:
+        """
+        Import transactions with a single multi-row INSERT.
         
-        # Auto-categorize if requested
+        Categories are assigned before inserting, so each row is written
+        once, and no ORM objects are created. Rows whose hash_id already
+        exists (e.g. from a concurrent import of an overlapping file) are
+        skipped instead of failing the whole import.
+        
+        Args:
+            transactions: List of transaction dictionaries to import
+            auto_categorize: Whether to automatically categorize transactions
+            
+        Returns:
+            IDs of the inserted transactions
+        """
         if auto_categorize:
-            self.categorizer.batch_categorize(db_transactions)
+            self._assign_categories(transactions)
+        return self._write(lambda service: service._bulk_insert(transactions))
+    
+    def _assign_categories(self, transactions: List[Dict[str, Any]]) -> None:
+        """Fill in the category_id of transactions without one, sharing LLM requests between rows"""
+        pending = [t for t in transactions if t.get("category_id") is None]
+        if not pending:
+            return
+        suggestions = self.categorizer.suggest_category_ids([
+            (t["description"], t["source"], t["amount"]) for t in pending
+        ])
+        for transaction, category_id in zip(pending, suggestions):
+            transaction["category_id"] = category_id
+    
+    def _bulk_insert(self, transactions: List[Dict[str, Any]]) -> List[int]:
+        """The INSERT of bulk_import_transactions(), with the categories as given; the caller commits"""
+        if not transactions:
+            return []
+        
+        rows = []
+        for transaction_data in transactions:
+            rows.append({
+                "date": transaction_data["date"],
+                "amount": transaction_data["amount"],
+                "description": transaction_data["description"],
+                "original_description": transaction_data.get("original_description"),
+                "category_id": transaction_data.get("category_id"),
+                "is_expense": transaction_data["is_expense"],
+                "source": transaction_data["source"],
+                "import_id": transaction_data["import_id"],
+                "source_id": transaction_data.get("source_id"),
+                "hash_id": transaction_data["hash_id"],
+            })
+        
+        result = self.db.execute(
+            self._insert_ignoring_duplicates().returning(Transaction.id, Transaction.hash_id),
+            rows
+        )
+        inserted = {row.hash_id: row.id for row in result}
+        
+        # Count the rows that were actually inserted in the daily totals
+        delta = DailyTotalsDelta()
+        for row in rows:
+            if row["hash_id"] in inserted:
+                delta.add(row)
+        DailyTotalsService(self.db).apply(delta)
+        
+        return [inserted[row["hash_id"]] for row in rows if row["hash_id"] in inserted]
+    
+    def _write(self, work: Callable[["ImportService"], T]) -> T:
+        """
+        Run work with a service whose session can write, and commit it.
+        
+        With a writer, work is one writer job, which also stores the LLM
+        answers the categorizer got through the read-only session.
+        """
+        if self.writer is None:
+            result = work(self)
             self.db.commit()
+            return result
+        
+        categorizer = self.categorizer
+        def job(session: Session) -> T:
+            categorizer.store_llm_answers(session)
+            return work(ImportService(session))
         
-        return db_transactions
+        result = self.writer.run(job)
+        # End the read transaction, so the next read sees what was just written
+        self.db.rollback()
+        return result
     
-    def import_from_file(self, file_path: str, auto_categorize: bool = True) -> List[Transaction]:
+    def _load_transactions(self, transaction_ids: List[int]) -> List[Transaction]:
+        """The transactions with these IDs, in ID order"""
+        if not transaction_ids:
+            return []
+        return self.db.query(Transaction).filter(
+            Transaction.id.in_(transaction_ids)
+        ).order_by(Transaction.id).all()
+    
+    def _insert_ignoring_duplicates(self):
+        """INSERT statement for transactions that skips rows with an existing hash_id"""
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "sqlite":
+            return sqlite.insert(Transaction).on_conflict_do_nothing(index_elements=["hash_id"])
+        if dialect == "postgresql":
+            return postgresql.insert(Transaction).on_conflict_do_nothing(index_elements=["hash_id"])
+        return insert(Transaction)
+    
+    def import_from_file(self,
+                         file_path: str,
+                         auto_categorize: bool = True,
+                         digest: Optional[str] = None) -> List[Transaction]:
         """
         Import transactions directly from a file.
         
+        A file imported before is recognized by its content and not parsed
+        again; nothing new is imported from it.
+        
         Args:
             file_path: Path to the file to import
             auto_categorize: Whether to automatically categorize transactions
+            digest: SHA-256 of the file, if the caller already has it
             
         Returns:
             List of imported Transaction objects
         """
+        digest = digest or file_digest(file_path)
+        if self.find_imported_file(digest) is not None:
+            return []
+        
         # Get parser based on file type
         parser = ParserFactory.get_parser(file_path)
         
@@ -116,16 +380,286 @@ class ImportService:
         for transaction in transactions:
             transaction["import_id"] = import_id
         
-        # Filter out duplicates
-        non_duplicates = []
+        # Filter out duplicates, then import the rest
+        non_duplicates, _ = self._split_duplicates(transactions)
+        if auto_categorize:
+            self._assign_categories(non_duplicates)
+        
+        stats = FileStats()
+        stats.add(transactions)
+        
+        def write(service: "ImportService") -> List[int]:
+            inserted_ids = service._bulk_insert(non_duplicates)
+            service._record_file(digest, import_id, stats)
+            return inserted_ids
+        
+        return self._load_transactions(self._write(write))
+    
+    def import_files(self,
+                     file_paths: List[str],
+                     auto_categorize: bool = True,
+                     max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Import several statement files as one batch.
+        
+        The files are parsed in parallel worker processes, then merged,
+        deduplicated across files and against the database, and inserted
+        in a single bulk transaction under one import_id. Files imported
+        before are recognized by their content and not parsed again.
+        
+        Args:
+            file_paths: Paths of the files to import
+            auto_categorize: Whether to automatically categorize transactions
+            max_workers: Maximum number of parsing processes (default: CPU count)
+            
+        Returns:
+            Summary with the import_id, the number of files and the
+            imported/duplicate counts
+            
+        Raises:
+            ValueError: If a file type is not supported; nothing is imported
+        """
+        new_paths, digests, skipped = self.split_imported_files(file_paths)
+        parsed = parse_files(new_paths, max_workers) if new_paths else []
+        return self.import_parsed_files(parsed, auto_categorize, digests, skipped)
+    
+    def split_imported_files(self,
+                             file_paths: List[str],
+                             digests: Optional[List[str]] = None) -> Tuple[List[str], List[str], List[ImportedFile]]:
+        """
+        Separate files that still need parsing from ones imported before.
+        
+        Args:
+            file_paths: Paths of the files
+            digests: Each file's SHA-256, if the caller already has them
+        
+        Returns:
+            Tuple of (new file paths, their SHA-256 digests, records of the
+            files imported before)
+        """
+        digests = digests or [file_digest(path) for path in file_paths]
+        known = self.find_imported_files(digests)
+        
+        new_paths = [path for path, digest in zip(file_paths, digests) if digest not in known]
+        new_digests = [digest for digest in digests if digest not in known]
+        skipped = [known[digest] for digest in digests if digest in known]
+        return new_paths, new_digests, skipped
+    
+    def import_parsed_files(self,
+                            parsed: List[List[Dict[str, Any]]],
+                            auto_categorize: bool = True,
+                            digests: Optional[List[str]] = None,
+                            skipped: Optional[List[ImportedFile]] = None) -> Dict[str, Any]:
+        """
+        The writing half of import_files(), given each file's parsed transactions.
+        
+        The whole batch commits once: its rows and the records of its files
+        are stored together or not at all.
+        
+        Args:
+            parsed: Each file's parsed transactions
+            auto_categorize: Whether to automatically categorize transactions
+            digests: Each parsed file's SHA-256, to record the files as imported
+            skipped: Records of files left out because they were imported
+                before; their rows count as duplicates
+        
+        Returns:
+            Summary with the import_id, the number of files and the
+            imported/duplicate counts
+        """
+        skipped = skipped or []
+        
+        # Generate import_id
+        import_id = str(uuid.uuid4())
+        
+        transactions = [t for file_transactions in parsed for t in file_transactions]
         for transaction in transactions:
-            # Check if this hash already exists in the database
-            existing = self.db.query(Transaction).filter(
-                Transaction.hash_id == transaction["hash_id"]
-            ).first()
+            transaction["import_id"] = import_id
+        
+        non_duplicates, duplicates = self._split_duplicates(transactions)
+        if auto_categorize:
+            self._assign_categories(non_duplicates)
+        
+        files = []
+        for file_transactions, digest in zip(parsed, digests or []):
+            stats = FileStats()
+            stats.add(file_transactions)
+            files.append((digest, stats))
+        
+        def write(service: "ImportService") -> List[int]:
+            inserted_ids = service._bulk_insert(non_duplicates)
+            for digest, stats in files:
+                service._record_file(digest, import_id, stats)
+            return inserted_ids
+        
+        inserted_ids = self._write(write)
+        
+        return {
+            "import_id": import_id,
+            "file_count": len(parsed) + len(skipped),
+            "imported_count": len(inserted_ids),
+            "duplicate_count": (
+                len(duplicates) + len(non_duplicates) - len(inserted_ids)
+                + sum(record.row_count for record in skipped)
+            ),
+        }
+    
+    def import_from_file_in_chunks(self,
+                                   file_path: str,
+                                   auto_categorize: bool = True,
+                                   chunk_size: int = DEFAULT_CHUNK_SIZE,
+                                   on_chunk: Optional[Callable[[Dict[str, Any]], None]] = None,
+                                   digest: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Import transactions from a file one chunk at a time.
+        
+        Each chunk is parsed, deduplicated, inserted and committed before the
+        next one is read, so memory use doesn't grow with the size of the file.
+        With a writer every chunk is a writer job of its own, so other writes
+        are queued between chunks rather than behind the whole file.
+        A file imported before is recognized by its content and answered
+        from its record without being parsed: every row is a duplicate.
+        
+        Args:
+            file_path: Path to the file to import
+            auto_categorize: Whether to automatically categorize transactions
+            chunk_size: Maximum number of rows per chunk
+            on_chunk: Called after each committed chunk with the running summary
+                (plus rows_processed). An exception raised here stops the import;
+                chunks already committed stay imported.
+            digest: SHA-256 of the file, if the caller already has it
             
-            if not existing:
+        Returns:
+            Summary with the import_id and the imported/duplicate counts
+        """
+        digest = digest or file_digest(file_path)
+        record = self.find_imported_file(digest)
+        if record is not None:
+            summary = {
+                "import_id": record.import_id,
+                "imported_count": 0,
+                "duplicate_count": record.row_count,
+            }
+            if on_chunk:
+                on_chunk({**summary, "rows_processed": record.row_count})
+            return summary
+        
+        # Get parser based on file type
+        parser = ParserFactory.get_parser(file_path)
+        
+        # Generate import_id
+        import_id = str(uuid.uuid4())
+        
+        stats = FileStats()
+        imported_count = 0
+        duplicate_count = 0
+        rows_processed = 0
+        for transactions in parser.iter_parse(file_path, chunk_size):
+            stats.add(transactions)
+            non_duplicates, duplicates = self._split_duplicates(transactions)
+            
+            for transaction in non_duplicates:
+                transaction["import_id"] = import_id
+            if auto_categorize:
+                self._assign_categories(non_duplicates)
+            
+            # Commits, so the next chunk's duplicate check sees these rows
+            inserted_ids = self._write(lambda service: service._bulk_insert(non_duplicates))
+            
+            imported_count += len(inserted_ids)
+            duplicate_count += len(duplicates) + len(non_duplicates) - len(inserted_ids)
+            rows_processed += len(transactions)
+            
+            if on_chunk:
+                on_chunk({
+                    "import_id": import_id,
+                    "imported_count": imported_count,
+                    "duplicate_count": duplicate_count,
+                    "rows_processed": rows_processed,
+                })
+        
+        self._write(lambda service: service._record_file(digest, import_id, stats))
+        
+        return {
+            "import_id": import_id,
+            "imported_count": imported_count,
+            "duplicate_count": duplicate_count,
+        }
+    
+    def find_imported_file(self, digest: str) -> Optional[ImportedFile]:
+        """The record of an earlier import of the file with this SHA-256, if any"""
+        return self.db.get(ImportedFile, digest)
+    
+    def find_imported_files(self, digests: Iterable[str]) -> Dict[str, ImportedFile]:
+        """Records of earlier imports of any of these files, by SHA-256"""
+        unique_digests = list(set(digests))
+        
+        records = {}
+        for start in range(0, len(unique_digests), HASH_LOOKUP_BATCH_SIZE):
+            batch = unique_digests[start:start + HASH_LOOKUP_BATCH_SIZE]
+            for record in self.db.query(ImportedFile).filter(ImportedFile.sha256.in_(batch)):
+                records[record.sha256] = record
+        
+        return records
+    
+    def _record_file(self, digest: str, import_id: str, stats: FileStats) -> None:
+        """Remember a fully imported file, so importing it again can be skipped; the caller commits"""
+        self.db.merge(ImportedFile(
+            sha256=digest,
+            source=stats.source,
+            row_count=stats.row_count,
+            first_date=stats.first_date,
+            last_date=stats.last_date,
+            import_id=import_id,
+        ))
+    
+    def _split_duplicates(self, transactions: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Split transactions into new ones and ones that are already known.
+        
+        A transaction is a duplicate if its hash is already in the database
+        or appears earlier in the same list. Every hash is looked up, so no
+        known row reaches the categorizer (and possibly the LLM) only to be
+        dropped by the insert.
+        
+        Returns:
+            Tuple of (non_duplicates, duplicates)
+        """
+        # Hashes already in the database; new ones are added as we go
+        seen = self.find_existing_hashes(t["hash_id"] for t in transactions)
+        
+        non_duplicates = []
+        duplicates = []
+        for transaction in transactions:
+            if transaction["hash_id"] in seen:
+                duplicates.append(transaction)
+            else:
+                seen.add(transaction["hash_id"])
                 non_duplicates.append(transaction)
         
-        # Import non-duplicate transactions
-        return self.import_transactions(non_duplicates, auto_categorize)
\ No newline at end of file
+        return non_duplicates, duplicates
+    
+    def find_existing_hashes(self, hash_ids: Iterable[str]) -> Set[str]:
+        """
+        Find which of the given hashes already exist in the database.
+        
+        Lookups are batched into IN (...) queries of HASH_LOOKUP_BATCH_SIZE
+        hashes, so checking a whole file takes a handful of round trips.
+        
+        Args:
+            hash_ids: Transaction hashes to look up
+            
+        Returns:
+            The subset of hash_ids that already exist
+        """
+        unique_hashes = list(set(hash_ids))
+        
+        existing = set()
+        for start in range(0, len(unique_hashes), HASH_LOOKUP_BATCH_SIZE):
+            batch = unique_hashes[start:start + HASH_LOOKUP_BATCH_SIZE]
+            rows = self.db.query(Transaction.hash_id).filter(
+                Transaction.hash_id.in_(batch)
+            ).all()
+            existing.update(row.hash_id for row in rows)
+        
+        return existing
\ No newline at end of file
@@ -0,0 +1,179 @@
+import os
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Tuple
+from sqlalchemy.orm import Session
+
+from geda.models import LLMCacheEntry
+
+# Dates such as 2023-01-15, 01/15/2023, 15/01 or JAN 15
+DATE_RE = re.compile(
+    r"\b\d{4}[-/.]\d{1,2}[-/.]\d{1,2}\b"
+    r"|\b\d{1,2}[-/.]\d{1,2}(?:[-/.]\d{2,4})?\b"
+    r"|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{1,2}\b"
+)
+# Masked card numbers such as XXXX1234 or ****1234
+CARD_RE = re.compile(r"[x*]{2,}\s*\d{2,4}\b")
+# Store/terminal numbers such as #1234, No. 12 or a bare number
+NUMBER_RE = re.compile(r"(?:#|\bno\.?)\s*\d+|(?<![\w-])\d+(?![\w-])")
+# Punctuation that doesn't help tell merchants apart
+PUNCTUATION_RE = re.compile(r"[^\w&'\- ]+")
+WHITESPACE_RE = re.compile(r"\s+")
+
+def normalize_description(description: str) -> str:
+    """
+    Reduce a transaction description to the part that identifies the merchant.
+    
+    Store numbers, dates, masked card numbers, punctuation and whitespace
+    noise are removed, so "STARBUCKS #1234 01/15" and "Starbucks  #987"
+    share a cache entry.
+    """
+    text = description.lower()
+    text = DATE_RE.sub(" ", text)
+    text = CARD_RE.sub(" ", text)
+    text = NUMBER_RE.sub(" ", text)
+    text = PUNCTUATION_RE.sub(" ", text)
+    text = WHITESPACE_RE.sub(" ", text).strip()
+    
+    # Never collapse a description to nothing; fall back to the raw text
+    return text or WHITESPACE_RE.sub(" ", description.lower()).strip()
+
+class LLMCategoryCache:
+    """
+    Persistent cache of LLM categorization answers.
+    
+    Answers are stored in the llm_category_cache table, keyed by the
+    normalized description and the model that produced them, and fronted
+    by a bounded in-memory LRU. Entries older than the TTL are treated as
+    misses, refreshed by the next set() and deleted by evict_expired().
+    """
+    
+    def __init__(self, max_entries: int = 10000, ttl: timedelta = timedelta(days=90)):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # One LRU per engine, so separate databases never share answers
+        self._memory = weakref.WeakKeyDictionary()
+    
+    def _lru(self, db: Session) -> "OrderedDict[Tuple[str, str], Tuple[int, datetime]]":
+        """In-memory LRU for the database behind db (call with the lock held)"""
+        engine = db.get_bind().engine
+        lru = self._memory.get(engine)
+        if lru is None:
+            lru = self._memory[engine] = OrderedDict()
+        return lru
+    
+    def _expired(self, created_at: datetime) -> bool:
+        """Whether an entry created at created_at is past the TTL"""
+        return created_at < datetime.utcnow() - self.ttl
+    
+    def _remember(self, lru, key: Tuple[str, str], value: Tuple[int, datetime]) -> None:
+        """Store a value in the LRU, evicting the least recently used entries"""
+        lru[key] = value
+        lru.move_to_end(key)
+        while len(lru) > self.max_entries:
+            lru.popitem(last=False)
+    
+    def get(self, db: Session, description: str, model: str) -> Optional[int]:
+        """
+        Look up the cached category for a description.
+        
+        Args:
+            db: Database session
+            description: Raw transaction description
+            model: Name of the model whose answer is wanted
+        
+        Returns:
+            The cached category ID, or None on a miss
+        """
+        key = (model, normalize_description(description))
+        
+        with self._lock:
+            lru = self._lru(db)
+            cached = lru.get(key)
+            if cached is not None:
+                if not self._expired(cached[1]):
+                    lru.move_to_end(key)
+                    self.hits += 1
+                    return cached[0]
+                del lru[key]
+        
+        entry = db.query(LLMCacheEntry).filter(
+            LLMCacheEntry.model == model,
+            LLMCacheEntry.normalized_description == key[1]
+        ).first()
+        
+        with self._lock:
+            if entry is None or self._expired(entry.created_at):
+                self.misses += 1
+                return None
+            self._remember(self._lru(db), key, (entry.category_id, entry.created_at))
+            self.hits += 1
+            return entry.category_id
+    
+    def set(self, db: Session, description: str, model: str, category_id: int) -> None:
+        """
+        Cache the category a model chose for a description.
+        
+        The row is added to the session and persisted by the caller's commit.
+        """
+        key = (model, normalize_description(description))
+        now = datetime.utcnow()
+        
+        entry = db.query(LLMCacheEntry).filter(
+            LLMCacheEntry.model == model,
+            LLMCacheEntry.normalized_description == key[1]
+        ).first()
+        if entry is None:
+            entry = LLMCacheEntry(normalized_description=key[1], model=model)
+            db.add(entry)
+        entry.category_id = category_id
+        entry.created_at = now
+        
+        with self._lock:
+            self._remember(self._lru(db), key, (category_id, now))
+    
+    def remember(self, db: Session, description: str, model: str, category_id: int) -> None:
+        """Like set(), but only in memory, for sessions that can't write; set() persists it later"""
+        key = (model, normalize_description(description))
+        with self._lock:
+            self._remember(self._lru(db), key, (category_id, datetime.utcnow()))
+    
+    def evict_expired(self, db: Session) -> int:
+        """
+        Delete all entries older than the TTL.
+        
+        Returns:
+            Number of deleted rows
+        """
+        deleted = db.query(LLMCacheEntry).filter(
+            LLMCacheEntry.created_at < datetime.utcnow() - self.ttl
+        ).delete(synchronize_session=False)
+        db.commit()
+        
+        with self._lock:
+            for lru in self._memory.values():
+                for key in [k for k, v in lru.items() if self._expired(v[1])]:
+                    del lru[key]
+        
+        return deleted
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and the number of entries held in memory"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_entries": sum(len(lru) for lru in self._memory.values()),
+            }
+
+# Shared by every categorizer in the process
+llm_cache = LLMCategoryCache(
+    max_entries=int(os.environ.get("LLM_CACHE_SIZE", "10000")),
+    ttl=timedelta(days=int(os.environ.get("LLM_CACHE_TTL_DAYS", "90"))),
+)
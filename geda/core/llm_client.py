@@ -0,0 +1,54 @@
+import os
+from abc import ABC, abstractmethod
+from typing import List, Dict, Optional
+import openai
+
+class CompletionBackend(ABC):
+    """Interface for chat completion providers used by the categorizer"""
+    
+    model: str = "unknown"  # Cached answers are keyed by this name
+    
+    def is_configured(self) -> bool:
+        """Whether the backend can be called (e.g. an API key is set)"""
+        return True
+    
+    @abstractmethod
+    def complete(self, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        """
+        Send a chat conversation and return the reply text.
+        
+        Raises:
+            Exception: Any error from the provider; callers retry
+        """
+        pass
+
+class OpenAICompletionBackend(CompletionBackend):
+    """Chat completions through the OpenAI API"""
+    
+    def __init__(self, model: Optional[str] = None):
+        self.model = model or os.environ.get("OPENAI_MODEL", "gpt-3.5-turbo")
+    
+    def is_configured(self) -> bool:
+        return bool(os.environ.get("OPENAI_API_KEY"))
+    
+    def complete(self, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        response = openai.ChatCompletion.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=0.3
+        )
+        return response.choices[0].message.content
+
+_backend: Optional[CompletionBackend] = None
+
+def get_completion_backend() -> CompletionBackend:
+    """Return the backend categorizers should use (OpenAI unless replaced)"""
+    if _backend is None:
+        return OpenAICompletionBackend()
+    return _backend
+
+def set_completion_backend(backend: Optional[CompletionBackend]) -> None:
+    """Replace the completion backend, e.g. with a local fake in tests. None restores OpenAI."""
+    global _backend
+    _backend = backend
@@ -0,0 +1,281 @@
+import heapq
+import json
+import math
+import os
+import tempfile
+import threading
+import weakref
+from collections import Counter, defaultdict
+from typing import Optional, Dict, Tuple, Set
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from geda.models import Transaction, Category
+from geda.core.llm_cache import normalize_description
+
+# Seconds a change waits before the model is written, so a burst of learns is saved once
+SAVE_DELAY_SECONDS = float(os.environ.get("NN_SAVE_DELAY_SECONDS", "5"))
+
+def char_ngrams(text: str, n: int = 3) -> Set[str]:
+    """Character n-grams of text, padded so word edges count"""
+    padded = f" {text} "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+class NeighbourModel:
+    """
+    Nearest-neighbour categorizer over already-labelled descriptions.
+    
+    Every normalized description seen with a category is an example. A
+    query is compared to the examples sharing character trigrams with it,
+    using TF-IDF weighted cosine similarity, and the top-k neighbours vote
+    on the category. Examples are added incrementally with learn().
+    """
+    
+    def __init__(self,
+                 path: Optional[str] = None,
+                 k: int = 5,
+                 min_similarity: float = 0.6,
+                 save_delay: float = SAVE_DELAY_SECONDS):
+        """
+        Args:
+            path: JSON file the examples are persisted to, or None to keep them in memory
+            k: Number of neighbours that vote
+            min_similarity: Similarity the winning neighbour needs for a prediction
+            save_delay: Seconds schedule_save() waits before writing the file
+        """
+        self.path = path
+        self.k = k
+        self.min_similarity = min_similarity
+        self.save_delay = save_delay
+        self._lock = threading.Lock()
+        # Held for a whole save so two writers never race on the file
+        self._save_lock = threading.Lock()
+        self._save_timer: Optional[threading.Timer] = None
+        self._dirty = False
+        # normalized description -> category_id -> times it was assigned
+        self._labels: Dict[str, Counter] = {}
+        # trigram -> descriptions containing it
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+    
+    def __len__(self) -> int:
+        return len(self._labels)
+    
+    def learn(self, description: str, category_id: int) -> None:
+        """Record that description was assigned category_id"""
+        key = normalize_description(description)
+        with self._lock:
+            labels = self._labels.get(key)
+            if labels is None:
+                labels = self._labels[key] = Counter()
+                for gram in char_ngrams(key):
+                    self._postings[gram].add(key)
+            labels[category_id] += 1
+            self._dirty = True
+    
+    def unlearn(self, description: str, category_id: int) -> None:
+        """Undo one learn() call, e.g. when the user changes a category"""
+        key = normalize_description(description)
+        with self._lock:
+            labels = self._labels.get(key)
+            if not labels or not labels[category_id]:
+                return
+            labels[category_id] -= 1
+            if labels[category_id] <= 0:
+                del labels[category_id]
+            if not labels:
+                del self._labels[key]
+                for gram in char_ngrams(key):
+                    self._postings[gram].discard(key)
+            self._dirty = True
+    
+    def predict(self, description: str) -> Optional[Tuple[int, float]]:
+        """
+        Predict the category of a description.
+        
+        Returns:
+            (category_id, similarity) of the prediction, or None when no
+            neighbour is similar enough
+        """
+        key = normalize_description(description)
+        with self._lock:
+            # Exact matches don't need a neighbour search
+            labels = self._labels.get(key)
+            if labels:
+                return labels.most_common(1)[0][0], 1.0
+            
+            grams = char_ngrams(key)
+            num_examples = len(self._labels)
+            idf = {
+                gram: math.log((1 + num_examples) / (1 + len(self._postings.get(gram, ())))) + 1
+                for gram in grams
+            }
+            
+            # Dot products with every example sharing a trigram
+            scores: Dict[str, float] = defaultdict(float)
+            for gram in grams:
+                weight = idf[gram] ** 2
+                for example in self._postings.get(gram, ()):
+                    scores[example] += weight
+            if not scores:
+                return None
+            
+            # Only the best raw scores can end up among the top-k by cosine
+            query_norm = math.sqrt(sum(w ** 2 for w in idf.values()))
+            neighbours = []
+            for example, score in heapq.nlargest(self.k * 4, scores.items(), key=lambda item: item[1]):
+                example_norm = math.sqrt(sum(
+                    (math.log((1 + num_examples) / (1 + len(self._postings[gram]))) + 1) ** 2
+                    for gram in char_ngrams(example)
+                ))
+                neighbours.append((score / (query_norm * example_norm), example))
+            neighbours = heapq.nlargest(self.k, neighbours)
+            
+            # Similarity-weighted vote
+            votes: Dict[int, float] = defaultdict(float)
+            best_similarity: Dict[int, float] = {}
+            for similarity, example in neighbours:
+                category_id = self._labels[example].most_common(1)[0][0]
+                votes[category_id] += similarity
+                best_similarity[category_id] = max(best_similarity.get(category_id, 0.0), similarity)
+        
+        category_id = max(votes, key=votes.get)
+        if best_similarity[category_id] < self.min_similarity:
+            return None
+        return category_id, best_similarity[category_id]
+    
+    def save(self) -> None:
+        """Write the examples to disk if anything changed since the last save"""
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                data = {key: dict(labels) for key, labels in self._labels.items()}
+                self._dirty = False
+            
+            # Write to a temporary file of our own first so a crash never leaves a torn file
+            temp_path = None
+            try:
+                with tempfile.NamedTemporaryFile(
+                    "w",
+                    encoding="utf-8",
+                    dir=os.path.dirname(os.path.abspath(self.path)),
+                    prefix=os.path.basename(self.path),
+                    suffix=".tmp",
+                    delete=False,
+                ) as f:
+                    temp_path = f.name
+                    json.dump({"version": 1, "examples": data}, f)
+                os.replace(temp_path, self.path)
+            except BaseException:
+                with self._lock:
+                    self._dirty = True
+                if temp_path and os.path.exists(temp_path):
+                    os.unlink(temp_path)
+                raise
+    
+    def schedule_save(self) -> None:
+        """Save after save_delay seconds, once for however many changes happen meanwhile"""
+        if not self.path:
+            return
+        with self._lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(self.save_delay, self._save_scheduled)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+    
+    def flush(self) -> None:
+        """Save any pending changes now, e.g. at shutdown"""
+        with self._lock:
+            timer, self._save_timer = self._save_timer, None
+        if timer is not None:
+            timer.cancel()
+        self.save()
+    
+    def _save_scheduled(self) -> None:
+        with self._lock:
+            self._save_timer = None
+        self.save()
+    
+    def load(self) -> bool:
+        """
+        Load persisted examples.
+        
+        Returns:
+            True if a saved model was found
+        """
+        if not self.path or not os.path.exists(self.path):
+            return False
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        with self._lock:
+            for key, labels in data["examples"].items():
+                self._labels[key] = Counter({int(c): n for c, n in labels.items()})
+                for gram in char_ngrams(key):
+                    self._postings[gram].add(key)
+        return True
+    
+    def build_from_db(self, db: Session) -> None:
+        """Learn every categorized transaction in the database"""
+        rows = db.query(
+            Transaction.description,
+            Transaction.category_id,
+            func.count(Transaction.id).label("count")
+        ).join(
+            Category,
+            Transaction.category_id == Category.id
+        ).filter(
+            Category.name != "Uncategorized"
+        ).group_by(
+            Transaction.description,
+            Transaction.category_id
+        ).all()
+        
+        for row in rows:
+            for _ in range(row.count):
+                self.learn(row.description, row.category_id)
+
+def default_model_path(db: Session) -> Optional[str]:
+    """Where to persist the model: NN_MODEL_PATH, else next to a SQLite database file"""
+    if os.environ.get("NN_MODEL_PATH"):
+        return os.environ["NN_MODEL_PATH"]
+    
+    url = db.get_bind().engine.url
+    in_memory = url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+    if url.get_backend_name() == "sqlite" and not in_memory:
+        return f"{url.database}.neighbours.json"
+    return None
+
+class NeighbourModelRegistry:
+    """One model per database, loaded from disk or built from history on first use"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models = weakref.WeakKeyDictionary()
+    
+    def get(self, db: Session) -> NeighbourModel:
+        engine = db.get_bind().engine
+        with self._lock:
+            model = self._models.get(engine)
+            if model is None:
+                model = NeighbourModel(
+                    path=default_model_path(db),
+                    min_similarity=float(os.environ.get("NN_MIN_SIMILARITY", "0.6")),
+                )
+                if not model.load():
+                    model.build_from_db(db)
+                    model.save()
+                self._models[engine] = model
+            return model
+    
+    def flush(self) -> None:
+        """Save every model's pending changes"""
+        with self._lock:
+            models = list(self._models.values())
+        for model in models:
+            model.flush()
+
+# Shared by every categorizer in the process
+neighbour_models = NeighbourModelRegistry()
@@ -0,0 +1,90 @@
+import threading
+import weakref
+from typing import Optional, List, NamedTuple, Tuple
+from sqlalchemy.orm import Session
+
+from geda.db.data_version import read_rules_version, rules_changed_uncommitted
+from geda.db.writer import after_batch_commit
+from geda.models import Category
+from geda.core.rule_index import RuleIndex
+
+class CategoryInfo(NamedTuple):
+    """Detached copy of the category fields the categorizer needs"""
+    id: int
+    name: str
+
+class CategorizationSnapshot(NamedTuple):
+    """Compiled rules and categories as of one rules version"""
+    version: Tuple[str, int]
+    rule_index: RuleIndex
+    categories: List[CategoryInfo]
+    uncategorized_id: Optional[int]
+
+class CategorizationCache:
+    """
+    Process-wide cache of the compiled rules and the category list.
+    
+    Snapshots are keyed on the rules version stored in the database, which
+    every commit touching rules or categories bumps (see geda.db.data_version).
+    A change made by another worker or by manage.py therefore makes this
+    process rebuild too.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        # One snapshot per engine, so separate databases never share rules
+        self._snapshots = weakref.WeakKeyDictionary()
+    
+    def get(self, db: Session) -> CategorizationSnapshot:
+        """
+        Get the snapshot for the database behind db, rebuilding it if stale.
+        
+        Args:
+            db: Session used to read the rules version and, on a cache miss,
+                to load rules and categories
+        
+        Returns:
+            The current snapshot
+        """
+        bind = db.get_bind().engine
+        version = read_rules_version(db.connection())
+        
+        snapshot = self._snapshots.get(bind)
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        
+        snapshot = self._build(db, version)
+        
+        # Rules this session changed but hasn't committed aren't in the
+        # version yet, so a snapshot built from them must not be shared
+        if not rules_changed_uncommitted(db):
+            # A DatabaseWriter session's version is only final once its batch commits
+            after_batch_commit(db, lambda: self._store(bind, snapshot))
+        
+        return snapshot
+    
+    def _store(self, bind, snapshot: CategorizationSnapshot) -> None:
+        with self._lock:
+            current = self._snapshots.get(bind)
+            # Don't replace a newer snapshot with one built from an older read
+            token, version = snapshot.version
+            if current is None or current.version[0] != token or current.version[1] < version:
+                self._snapshots[bind] = snapshot
+    
+    def _build(self, db: Session, version: Tuple[str, int]) -> CategorizationSnapshot:
+        """Load rules and categories into a new snapshot"""
+        categories = [
+            CategoryInfo(row.id, row.name)
+            for row in db.query(Category.id, Category.name).all()
+        ]
+        uncategorized_id = next((c.id for c in categories if c.name == "Uncategorized"), None)
+        
+        return CategorizationSnapshot(
+            version=version,
+            rule_index=RuleIndex.from_db(db),
+            categories=categories,
+            uncategorized_id=uncategorized_id,
+        )
+
+# Shared by every categorizer in the process
+categorization_cache = CategorizationCache()
@@ -0,0 +1,174 @@
+import re
+from collections import deque
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+from sqlalchemy.orm import Session
+
+from geda.models import MappingRule
+
+# Sort key of a rule: higher priority first, then older rules first
+Rank = Tuple[float, int]
+
+def _rule_rank(rule: MappingRule) -> Rank:
+    """Rank rules the way ORDER BY priority DESC does (NULL priorities last)"""
+    priority = -rule.priority if rule.priority is not None else float("inf")
+    return (priority, rule.id or 0)
+
+class SubstringMatcher:
+    """
+    Aho-Corasick automaton over lowercased substring patterns.
+    
+    Every state remembers the best-ranked pattern that ends there, including
+    patterns reachable through its failure links, so a single pass over the
+    text finds the best match no matter how many patterns there are.
+    """
+    
+    def __init__(self, patterns: Dict[str, Tuple[Rank, int]]):
+        """
+        Build the automaton.
+        
+        Args:
+            patterns: Maps each lowercased pattern to its (rank, category_id)
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[Optional[Tuple[Rank, int]]] = [None]
+        
+        # Build the trie
+        for pattern, match in patterns.items():
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(None)
+                state = next_state
+            self._best[state] = self._better(self._best[state], match)
+        
+        # Breadth-first pass to set failure links and propagate matches
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail
+                self._best[next_state] = self._better(self._best[next_state], self._best[fail])
+                queue.append(next_state)
+    
+    @staticmethod
+    def _better(current: Optional[Tuple[Rank, int]], other: Optional[Tuple[Rank, int]]) -> Optional[Tuple[Rank, int]]:
+        """Return the better-ranked of two matches, either of which may be None"""
+        if current is None:
+            return other
+        if other is None:
+            return current
+        return min(current, other)
+    
+    def best_match(self, text: str) -> Optional[Tuple[Rank, int]]:
+        """Return the (rank, category_id) of the best pattern found in text"""
+        goto = self._goto
+        fail = self._fail
+        best_at = self._best
+        
+        # The root only matches if there is an empty pattern
+        best = best_at[0]
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            found = best_at[state]
+            if found is not None and (best is None or found < best):
+                best = found
+        
+        return best
+
+class _RuleGroup:
+    """Compiled rules that share the same source"""
+    
+    def __init__(self, rules: List[MappingRule]):
+        substrings: Dict[str, Tuple[Rank, int]] = {}
+        self.regexes: List[Tuple[Rank, Any, int]] = []
+        
+        for rule in rules:
+            rank = _rule_rank(rule)
+            if rule.is_regex:
+                try:
+                    pattern = re.compile(rule.pattern, re.IGNORECASE)
+                except re.error:
+                    # Invalid regex, skip this rule
+                    continue
+                self.regexes.append((rank, pattern, rule.category_id))
+            else:
+                key = rule.pattern.lower()
+                match = (rank, rule.category_id)
+                if key not in substrings or match < substrings[key]:
+                    substrings[key] = match
+        
+        self.regexes.sort(key=lambda item: item[0])
+        self.substrings = SubstringMatcher(substrings)
+    
+    def match(self, description: str) -> Optional[int]:
+        """Return the category ID of the highest-ranked matching rule"""
+        best = self.substrings.best_match(description.lower())
+        
+        # Regex rules are tried in rank order, and only while they could
+        # still beat the best substring match
+        for rank, pattern, category_id in self.regexes:
+            if best is not None and rank > best[0]:
+                break
+            if pattern.search(description):
+                best = (rank, category_id)
+                break
+        
+        return best[1] if best else None
+
+class RuleIndex:
+    """
+    Compiled index of mapping rules.
+    
+    Substring rules are merged into one Aho-Corasick automaton per source and
+    regex rules are compiled once, so matching a description costs time
+    proportional to its length rather than to the number of rules.
+    """
+    
+    def __init__(self, rules: Iterable[MappingRule]):
+        by_source: Dict[Optional[str], List[MappingRule]] = {}
+        for rule in rules:
+            by_source.setdefault(rule.source, []).append(rule)
+        
+        self._groups = {source: _RuleGroup(group) for source, group in by_source.items()}
+    
+    @classmethod
+    def from_db(cls, db: Session) -> "RuleIndex":
+        """Build the index from all rules in the mapping_rules table"""
+        return cls(db.query(MappingRule).all())
+    
+    def match(self, description: str, source: Optional[str]) -> Optional[int]:
+        """
+        Find the category for a description.
+        
+        Source-specific rules are checked first, then generic rules. Within
+        each group the highest-priority matching rule wins.
+        
+        Args:
+            description: Transaction description
+            source: Transaction source (e.g. "RBC")
+        
+        Returns:
+            The ID of the matched category, or None if no rule matches
+        """
+        if source is not None and source in self._groups:
+            category_id = self._groups[source].match(description)
+            if category_id is not None:
+                return category_id
+        
+        if None in self._groups:
+            return self._groups[None].match(description)
+        
+        return None
@@ -1,10 +1,44 @@
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+import base64
+import json
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+from sqlalchemy.orm import Session, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, tuple_, text, or_, cast, Integer, Float
 
-from geda.models import Transaction, Category
+from geda.models import Transaction, Category, DailyCategoryTotal, UNCATEGORIZED_ID
+from geda.db.fts import FTS_TABLE, fts_available, build_match_query
 from geda.core.categorizer import TransactionCategorizer
+from geda.core.daily_totals import DailyTotalsDelta, DailyTotalsService
+
+# Rows fetched per round trip by TransactionService.export_transactions
+EXPORT_BATCH_SIZE = 1000
+
+# Fields of each exported row, in order
+EXPORT_COLUMNS = (
+    "id", "date", "amount", "description", "original_description",
+    "category_id", "category_name", "is_expense", "source", "source_id",
+    "import_id", "hash_id", "created_at", "updated_at",
+)
+
+def encode_cursor(transaction: Transaction) -> str:
+    """Opaque cursor pointing just after a transaction in listing order"""
+    raw = json.dumps([transaction.date.isoformat(), transaction.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor made by encode_cursor.
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date_str, transaction_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(date_str), int(transaction_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
 
 class TransactionService:
     """Service for managing transactions"""
@@ -36,6 +70,105 @@ class TransactionService:
         Returns:
             List of matching transactions
         """
+        query = self._filtered_query(start_date, end_date, category_id, search, is_expense)
+        
+        # Order by date (newest first)
+        query = query.order_by(Transaction.date.desc())
+        
+        # Apply pagination
+        query = query.offset(skip).limit(limit)
+        
+        return query.all()
+    
+    def get_transactions_page(self,
+                              limit: int = 100,
+                              cursor: Optional[str] = None,
+                              start_date: Optional[datetime] = None,
+                              end_date: Optional[datetime] = None,
+                              category_id: Optional[int] = None,
+                              search: Optional[str] = None,
+                              is_expense: Optional[bool] = None) -> Tuple[List[Transaction], Optional[str]]:
+        """
+        Get one page of transactions using keyset pagination.
+        
+        Pages are ordered by (date, id) descending and continue strictly after
+        the cursor, so each page costs the same however deep it is and rows
+        imported meanwhile don't shift later pages.
+        
+        Args:
+            limit: Maximum number of records to return
+            cursor: next_cursor from the previous page, or None for the first page
+            start_date: Filter by start date
+            end_date: Filter by end date
+            category_id: Filter by category
+            search: Search in description
+            is_expense: Filter by expense/income
+            
+        Returns:
+            The transactions and the cursor of the next page (None on the last page)
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        query = self._filtered_query(start_date, end_date, category_id, search, is_expense)
+        
+        if cursor:
+            query = query.filter(tuple_(Transaction.date, Transaction.id) < decode_cursor(cursor))
+        
+        query = query.order_by(Transaction.date.desc(), Transaction.id.desc())
+        
+        # Fetch one extra row to know whether there is a next page
+        transactions = query.limit(limit + 1).all()
+        if len(transactions) <= limit:
+            return transactions, None
+        
+        transactions = transactions[:limit]
+        return transactions, encode_cursor(transactions[-1])
+    
+    def export_transactions(self,
+                            start_date: Optional[datetime] = None,
+                            end_date: Optional[datetime] = None,
+                            category_id: Optional[int] = None,
+                            search: Optional[str] = None,
+                            is_expense: Optional[bool] = None,
+                            batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[List[Tuple]]:
+        """
+        Stream every matching transaction, in listing order, a batch at a time.
+        
+        Rows are plain tuples of EXPORT_COLUMNS, with the category name joined
+        in, read through a server-side cursor batch_size rows at a time. No
+        ORM objects are built, so memory stays flat however many rows match.
+        
+        Args:
+            start_date: Filter by start date
+            end_date: Filter by end date
+            category_id: Filter by category
+            search: Search in description
+            is_expense: Filter by expense/income
+            batch_size: Rows fetched per round trip
+            
+        Returns:
+            Iterator over batches of rows
+        """
+        query = self._filtered_query(start_date, end_date, category_id, search, is_expense)
+        query = query.outerjoin(Category, Category.id == Transaction.category_id).with_entities(*[
+            Category.name.label(column) if column == "category_name" else getattr(Transaction, column)
+            for column in EXPORT_COLUMNS
+        ]).order_by(Transaction.date.desc(), Transaction.id.desc())
+        
+        result = self.db.execute(query.statement, execution_options={"yield_per": batch_size})
+        try:
+            yield from result.partitions()
+        finally:
+            result.close()
+    
+    def _filtered_query(self,
+                        start_date: Optional[datetime],
+                        end_date: Optional[datetime],
+                        category_id: Optional[int],
+                        search: Optional[str],
+                        is_expense: Optional[bool]) -> Query:
+        """Transactions query with the listing filters applied"""
         query = self.db.query(Transaction)
         
         # Apply filters
@@ -49,33 +182,107 @@ class TransactionService:
             query = query.filter(Transaction.category_id == category_id)
         
         if search:
-            query = query.filter(Transaction.description.ilike(f"%{search}%"))
+            query = self._apply_search(query, search)
         
         if is_expense is not None:
             query = query.filter(Transaction.is_expense == is_expense)
         
-        # Order by date (newest first)
-        query = query.order_by(Transaction.date.desc())
+        return query
+    
+    def _apply_search(self, query: Query, search: str) -> Query:
+        """
+        Filter to transactions whose descriptions contain every search term.
         
-        # Apply pagination
-        query = query.offset(skip).limit(limit)
+        Uses the full-text index when the database has one. Terms shorter
+        than a trigram, or every term without the index, fall back to ILIKE.
+        """
+        if not fts_available(self.db.get_bind().engine):
+            return query.filter(Transaction.description.ilike(f"%{search}%"))
         
-        return query.all()
+        match, short_terms = build_match_query(search)
+        if match:
+            query = query.filter(Transaction.id.in_(
+                text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match").bindparams(match=match)
+            ))
+        query = self._filter_short_terms(query, short_terms)
+        
+        return query
+    
+    @staticmethod
+    def _filter_short_terms(query: Query, terms: List[str]) -> Query:
+        """Filter with ILIKE on terms too short for the trigram index"""
+        for term in terms:
+            query = query.filter(or_(
+                Transaction.description.ilike(f"%{term}%"),
+                Transaction.original_description.ilike(f"%{term}%")
+            ))
+        return query
+    
+    def search_transactions(self, search: str, limit: int = 50) -> List[Transaction]:
+        """
+        Search transaction descriptions, best matches first.
+        
+        Results are ranked with BM25 when the full-text index is available,
+        and newest first otherwise.
+        
+        Args:
+            search: One or more terms that must all appear
+            limit: Maximum number of records to return
+            
+        Returns:
+            List of matching transactions
+        """
+        match, short_terms = build_match_query(search)
+        if not match or not fts_available(self.db.get_bind().engine):
+            return self.get_transactions(limit=limit, search=search)
+        
+        ranked = text(
+            f"SELECT rowid AS id, bm25({FTS_TABLE}) AS rank FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH :match"
+        ).bindparams(match=match).columns(id=Integer, rank=Float).subquery()
+        
+        query = self.db.query(Transaction).join(ranked, ranked.c.id == Transaction.id)
+        query = self._filter_short_terms(query, short_terms)
+        
+        # Lower BM25 scores are better matches
+        return query.order_by(ranked.c.rank, Transaction.date.desc()).limit(limit).all()
     
     def get_transaction(self, transaction_id: int) -> Optional[Transaction]:
         """Get a transaction by ID"""
         return self.db.query(Transaction).filter(Transaction.id == transaction_id).first()
     
-    def create_transaction(self, transaction_data: Dict[str, Any]) -> Transaction:
+    def suggest_category(self, transaction_data: Dict[str, Any]) -> Optional[int]:
+        """
+        The category create_transaction() would assign a transaction without one.
+        
+        Reads only, so it can run outside the writer; an LLM answer it
+        needed is kept by the categorizer until store_llm_answers().
+        """
+        return self.categorizer.suggest_category_id(
+            transaction_data["description"],
+            transaction_data.get("source", "manual"),
+            transaction_data["amount"],
+        )
+    
+    def create_transaction(self,
+                           transaction_data: Dict[str, Any],
+                           suggested_category_id: Optional[int] = None) -> Transaction:
         """
         Create a new transaction.
         
         Args:
             transaction_data: Data for the transaction
+            suggested_category_id: Category from suggest_category(), used
+                when transaction_data has none instead of categorizing here
             
         Returns:
             The created transaction
         """
+        # Auto-categorize up front if no category provided, so the row is written once
+        category_id = transaction_data.get("category_id") or suggested_category_id
+        if not category_id:
+            category_id = self.suggest_category(transaction_data)
+        
         # Create Transaction object
         transaction = Transaction(
             date=transaction_data["date"],
@@ -84,21 +291,23 @@ class TransactionService:
             original_description=transaction_data.get("original_description"),
             is_expense=transaction_data.get("is_expense", True),
             source=transaction_data.get("source", "manual"),
-            category_id=transaction_data.get("category_id"),
+            category_id=category_id,
             # Generate a unique hash for the transaction
             hash_id=f"manual_{datetime.utcnow().timestamp()}",
         )
         
         self.db.add(transaction)
+        
+        delta = DailyTotalsDelta()
+        delta.add(transaction)
+        DailyTotalsService(self.db).apply(delta)
+        
         self.db.commit()
         self.db.refresh(transaction)
         
-        # Auto-categorize if no category provided
-        if not transaction.category_id:
-            category = self.categorizer.categorize_transaction(transaction)
-            if category:
-                transaction.category_id = category.id
-                self.db.commit()
+        # A category chosen by the user is a new labelled example
+        if transaction_data.get("category_id"):
+            self.categorizer.learn(transaction.description, transaction.category_id)
         
         return transaction
     
@@ -117,6 +326,13 @@ class TransactionService:
         if not transaction:
             return None
         
+        previous_description = transaction.description
+        previous_category_id = transaction.category_id
+        
+        # Move the transaction's old values out of the daily totals
+        delta = DailyTotalsDelta()
+        delta.remove(transaction)
+        
         # Update fields
         if "date" in transaction_data:
             transaction.date = transaction_data["date"]
@@ -131,9 +347,20 @@ class TransactionService:
         # Update updated_at timestamp
         transaction.updated_at = datetime.utcnow()
         
+        delta.add(transaction)
+        DailyTotalsService(self.db).apply(delta)
+        
         self.db.commit()
         self.db.refresh(transaction)
         
+        # Move the labelled example to the corrected category
+        if "category_id" in transaction_data and transaction.category_id != previous_category_id:
+            self.categorizer.learn(
+                transaction.description,
+                transaction.category_id,
+                previous=(previous_description, previous_category_id),
+            )
+        
         return transaction
     
     def delete_transaction(self, transaction_id: int) -> bool:
@@ -149,53 +376,76 @@ class TransactionService:
         transaction = self.get_transaction(transaction_id)
         if not transaction:
             return False
+        previous = (transaction.description, transaction.category_id)
         
         self.db.delete(transaction)
+        
+        delta = DailyTotalsDelta()
+        delta.remove(transaction)
+        DailyTotalsService(self.db).apply(delta)
+        
         self.db.commit()
         
+        # Its category no longer counts as a labelled example
+        self.categorizer.learn(None, None, previous=previous)
+        
         return True
     
-    def get_spending_by_category(self, 
-                                 start_date: Optional[datetime] = None,
-                                 end_date: Optional[datetime] = None) -> List[Dict[str, Any]]:
-        """
-        Get aggregated spending by category.
-        
-        Args:
-            start_date: Filter by start date
-            end_date: Filter by end date
-            
-        Returns:
-            List of dictionaries with category and sum
-        """
+    def _days_between(self, day_column, end_day: date):
+        """SQL expression for the whole days from a date column to end_day"""
+        if self.db.get_bind().dialect.name == "sqlite":
+            return cast(func.julianday(end_day) - func.julianday(day_column), Integer)
+        return end_day - day_column
+    
+    def _totals_by_category(self,
+                            is_expense: bool,
+                            start_date: Optional[datetime],
+                            end_date: Optional[datetime]) -> Query:
+        """Rollup sums per category over whole days, skipping uncategorized rows"""
         # Default to last 30 days if not specified
         if not start_date:
             start_date = datetime.utcnow() - timedelta(days=30)
         if not end_date:
             end_date = datetime.utcnow()
         
-        # Query for expenses by category
-        query = self.db.query(
+        total = func.sum(DailyCategoryTotal.total)
+        return self.db.query(
             Category.id,
             Category.name,
-            func.sum(Transaction.amount).label("total")
+            total.label("total")
         ).join(
-            Transaction,
-            Transaction.category_id == Category.id
+            DailyCategoryTotal,
+            DailyCategoryTotal.category_id == Category.id
         ).filter(
-            Transaction.date >= start_date,
-            Transaction.date <= end_date,
-            Transaction.is_expense == True
+            DailyCategoryTotal.day >= start_date.date(),
+            DailyCategoryTotal.day <= end_date.date(),
+            DailyCategoryTotal.is_expense == is_expense
         ).group_by(
             Category.id,
             Category.name
         ).order_by(
-            func.sum(Transaction.amount)
+            total if is_expense else total.desc()
         )
+    
+    def get_spending_by_category(self, 
+                                 start_date: Optional[datetime] = None,
+                                 end_date: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Get aggregated spending by category.
+        
+        Reads the daily_category_totals rollup, so the cost depends on the
+        number of days in range rather than the number of transactions.
         
+        Args:
+            start_date: Filter by start date (whole days)
+            end_date: Filter by end date (whole days)
+            
+        Returns:
+            List of dictionaries with category and sum
+        """
         # Convert to dictionaries
         results = []
-        for row in query.all():
+        for row in self._totals_by_category(True, start_date, end_date).all():
             results.append({
                 "category_id": row.id,
                 "category_name": row.name,
@@ -210,41 +460,18 @@ class TransactionService:
         """
         Get aggregated income by category.
         
+        Reads the daily_category_totals rollup, like get_spending_by_category.
+        
         Args:
-            start_date: Filter by start date
-            end_date: Filter by end date
+            start_date: Filter by start date (whole days)
+            end_date: Filter by end date (whole days)
             
         Returns:
             List of dictionaries with category and sum
         """
-        # Default to last 30 days if not specified
-        if not start_date:
-            start_date = datetime.utcnow() - timedelta(days=30)
-        if not end_date:
-            end_date = datetime.utcnow()
-        
-        # Query for income by category
-        query = self.db.query(
-            Category.id,
-            Category.name,
-            func.sum(Transaction.amount).label("total")
-        ).join(
-            Transaction,
-            Transaction.category_id == Category.id
-        ).filter(
-            Transaction.date >= start_date,
-            Transaction.date <= end_date,
-            Transaction.is_expense == False
-        ).group_by(
-            Category.id,
-            Category.name
-        ).order_by(
-            func.sum(Transaction.amount).desc()
-        )
-        
         # Convert to dictionaries
         results = []
-        for row in query.all():
+        for row in self._totals_by_category(False, start_date, end_date).all():
             results.append({
                 "category_id": row.id,
                 "category_name": row.name,
@@ -259,6 +486,9 @@ class TransactionService:
         """
         Get spending trends over time periods.
         
+        Periods are whole days ending today, computed in one query over the
+        daily_category_totals rollup.
+        
         Args:
             num_periods: Number of time periods to analyze
             period_days: Number of days in each period
@@ -267,53 +497,134 @@ class TransactionService:
             Dictionary with trend data
         """
         end_date = datetime.utcnow()
-        periods = []
+        today = end_date.date()
+        start_day = today - timedelta(days=num_periods*period_days - 1)
         
-        for i in range(num_periods):
-            period_end = end_date - timedelta(days=i*period_days)
-            period_start = end_date - timedelta(days=(i+1)*period_days)
-            
-            # Get total spending for this period
-            total_query = self.db.query(
-                func.sum(Transaction.amount)
-            ).filter(
-                Transaction.date >= period_start,
-                Transaction.date <= period_end,
-                Transaction.is_expense == True
-            )
-            
-            total = total_query.scalar() or 0
-            
-            # Get top categories for this period
-            category_query = self.db.query(
-                Category.name,
-                func.sum(Transaction.amount).label("total")
-            ).join(
-                Transaction,
-                Transaction.category_id == Category.id
-            ).filter(
-                Transaction.date >= period_start,
-                Transaction.date <= period_end,
-                Transaction.is_expense == True
-            ).group_by(
-                Category.name
-            ).order_by(
-                func.sum(Transaction.amount)
-            ).limit(3)
-            
-            top_categories = []
-            for row in category_query.all():
-                top_categories.append({
+        # Period 0 is the most recent
+        bucket = cast(self._days_between(DailyCategoryTotal.day, today) / period_days, Integer)
+        
+        # Spending per period and category
+        per_category = self.db.query(
+            bucket.label("bucket"),
+            DailyCategoryTotal.category_id,
+            func.sum(DailyCategoryTotal.total).label("total")
+        ).filter(
+            DailyCategoryTotal.day >= start_day,
+            DailyCategoryTotal.day <= today,
+            DailyCategoryTotal.is_expense == True
+        ).group_by(
+            bucket,
+            DailyCategoryTotal.category_id
+        ).subquery()
+        
+        # Rank categories within each period, biggest spending first and
+        # uncategorized rows last, next to the period's overall total
+        ranked = self.db.query(
+            per_category.c.bucket,
+            per_category.c.category_id,
+            per_category.c.total,
+            func.sum(per_category.c.total).over(
+                partition_by=per_category.c.bucket
+            ).label("period_total"),
+            func.row_number().over(
+                partition_by=per_category.c.bucket,
+                order_by=(
+                    per_category.c.category_id == UNCATEGORIZED_ID,
+                    per_category.c.total,
+                    per_category.c.category_id
+                )
+            ).label("rank")
+        ).subquery()
+        
+        query = self.db.query(
+            ranked.c.bucket,
+            ranked.c.total,
+            ranked.c.period_total,
+            Category.name
+        ).outerjoin(
+            Category,
+            Category.id == ranked.c.category_id
+        ).filter(
+            ranked.c.rank <= 3
+        ).order_by(
+            ranked.c.bucket,
+            ranked.c.rank
+        )
+        
+        periods = [
+            {
+                "start_date": end_date - timedelta(days=(i+1)*period_days),
+                "end_date": end_date - timedelta(days=i*period_days),
+                "total": 0,
+                "top_categories": []
+            }
+            for i in range(num_periods)
+        ]
+        for row in query.all():
+            period = periods[row.bucket]
+            period["total"] = abs(row.period_total)
+            if row.name is not None:
+                period["top_categories"].append({
                     "name": row.name,
                     "total": abs(row.total)
                 })
-            
-            periods.append({
-                "start_date": period_start,
-                "end_date": period_end,
-                "total": abs(total),
-                "top_categories": top_categories
-            })
         
         # Return in chronological order
-        return {"periods": list(reversed(periods))}
\ No newline at end of file
+        return {"periods": list(reversed(periods))}
+
+class AsyncTransactionService:
+    """
+    The read paths of TransactionService for async routes.
+    
+    Each method runs the synchronous query code through AsyncSession.run_sync,
+    so the database I/O is awaited instead of blocking the event loop.
+    Transactions are returned with their category loaded, because lazy
+    loading isn't possible once the method has returned.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_transactions(self, **filters) -> List[Transaction]:
+        """See TransactionService.get_transactions"""
+        return await self.db.run_sync(
+            lambda db: _with_categories(TransactionService(db).get_transactions(**filters))
+        )
+    
+    async def get_transactions_page(self, **filters) -> Tuple[List[Transaction], Optional[str]]:
+        """See TransactionService.get_transactions_page"""
+        def page(db: Session):
+            transactions, next_cursor = TransactionService(db).get_transactions_page(**filters)
+            return _with_categories(transactions), next_cursor
+        return await self.db.run_sync(page)
+    
+    async def search_transactions(self, search: str, limit: int = 50) -> List[Transaction]:
+        """See TransactionService.search_transactions"""
+        return await self.db.run_sync(
+            lambda db: _with_categories(TransactionService(db).search_transactions(search, limit))
+        )
+    
+    async def get_transaction(self, transaction_id: int) -> Optional[Transaction]:
+        """See TransactionService.get_transaction"""
+        def get(db: Session):
+            transaction = TransactionService(db).get_transaction(transaction_id)
+            return _with_categories([transaction])[0] if transaction else None
+        return await self.db.run_sync(get)
+    
+    async def get_spending_by_category(self, **filters) -> List[Dict[str, Any]]:
+        """See TransactionService.get_spending_by_category"""
+        return await self.db.run_sync(lambda db: TransactionService(db).get_spending_by_category(**filters))
+    
+    async def get_income_by_category(self, **filters) -> List[Dict[str, Any]]:
+        """See TransactionService.get_income_by_category"""
+        return await self.db.run_sync(lambda db: TransactionService(db).get_income_by_category(**filters))
+    
+    async def get_spending_trends(self, **options) -> Dict[str, Any]:
+        """See TransactionService.get_spending_trends"""
+        return await self.db.run_sync(lambda db: TransactionService(db).get_spending_trends(**options))
+
+def _with_categories(transactions: List[Transaction]) -> List[Transaction]:
+    """Load each transaction's category; repeated categories come from the identity map"""
+    for transaction in transactions:
+        transaction.category
+    return transactions
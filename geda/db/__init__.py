@@ -1,4 +1,10 @@
 from geda.db.base import Base
-from geda.db.session import get_db, engine, SessionLocal
+from geda.db.session import get_db, get_writer, engine, SessionLocal, db_writer
+from geda.db import fts  # Registers the full-text index with create_all
+from geda.db.data_version import data_version, read_data_version
+from geda.db.async_session import get_async_db, async_engine, AsyncSessionLocal
 
-__all__ = ["Base", "get_db", "engine", "SessionLocal"]
\ No newline at end of file
+__all__ = [
+    "Base", "get_db", "get_writer", "engine", "SessionLocal", "db_writer", "data_version",
+    "read_data_version", "get_async_db", "async_engine", "AsyncSessionLocal"
+]
\ No newline at end of file
@@ -0,0 +1,53 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from geda.db.session import SQLALCHEMY_DATABASE_URL, SQLITE_BUSY_TIMEOUT_MS
+from geda.db.writer import READ_ONLY
+
+# Async drivers for the synchronous database URLs we accept
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+def async_database_url(url: str) -> str:
+    """The same database as url, through its async driver"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False) if driver else url
+
+def create_async_db_engine(url: str) -> AsyncEngine:
+    """
+    Create an async engine for the database behind a synchronous URL.
+    
+    SQLite connections get the same busy timeout as create_db_engine();
+    WAL is a property of the database file, which the synchronous engine
+    has already switched on.
+    """
+    url = async_database_url(url)
+    if not url.startswith("sqlite"):
+        return create_async_engine(url)
+    
+    in_memory = make_url(url).database in (None, "", ":memory:") or "mode=memory" in url
+    engine = create_async_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool if in_memory else None,
+    )
+    
+    @event.listens_for(engine.sync_engine, "connect")
+    def _configure_connection(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.close()
+    
+    return engine
+
+async_engine = create_async_db_engine(SQLALCHEMY_DATABASE_URL)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Dependency to get an async DB session
+async def get_async_db():
+    """Read-only async session for async routes; writes go through get_writer()"""
+    async with AsyncSessionLocal(info={READ_ONLY: True}) as db:
+        yield db
@@ -0,0 +1,106 @@
+import uuid
+from typing import Tuple
+from sqlalchemy import Table, Column, Integer, String, event, select, update, insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from geda.db.base import Base
+
+# One row that changes whenever a session commits a write. It is bumped in
+# the same transaction as the write, so every process sharing the database
+# (API workers, manage.py, import jobs) sees the change once it commits.
+data_version = Table(
+    "data_version",
+    Base.metadata,
+    Column("id", Integer, primary_key=True),
+    # Random per database, so versions of a recreated database never match old ones
+    Column("token", String, nullable=False),
+    Column("version", Integer, nullable=False),
+    # Bumped only by changes to rules and categories, see geda.core.rule_cache
+    Column("rules_version", Integer, nullable=False, server_default="0"),
+)
+
+def read_data_version(connection: Connection) -> Tuple[str, int]:
+    """
+    The database's current data version.
+    
+    Anything derived from the database (e.g. cached API responses) can
+    store the version it was computed at and compare it with this instead
+    of querying the database again.
+    
+    Returns:
+        (token, version), or ("", 0) before the first write
+    """
+    row = connection.execute(
+        select(data_version.c.token, data_version.c.version).where(data_version.c.id == 1)
+    ).first()
+    return (row.token, row.version) if row else ("", 0)
+
+def read_rules_version(connection: Connection) -> Tuple[str, int]:
+    """Like read_data_version(), for the version only rule and category changes bump"""
+    row = connection.execute(
+        select(data_version.c.token, data_version.c.rules_version).where(data_version.c.id == 1)
+    ).first()
+    return (row.token, row.rules_version) if row else ("", 0)
+
+def bump_data_version(session: Session, rules_changed: bool = False) -> None:
+    """Advance the data version, and the rules version if asked, inside the session's transaction"""
+    values = {"version": data_version.c.version + 1}
+    if rules_changed:
+        values["rules_version"] = data_version.c.rules_version + 1
+    bumped = session.execute(update(data_version).where(data_version.c.id == 1).values(**values))
+    if bumped.rowcount == 0:
+        session.execute(insert(data_version).values(
+            id=1, token=uuid.uuid4().hex, version=1, rules_version=int(rules_changed)
+        ))
+
+# Flag in Session.info marking a transaction that wrote something
+_WROTE = "geda_wrote"
+
+# Flag in Session.info marking a transaction that changed rules or categories
+_RULES_CHANGED = "geda_rules_changed"
+
+# Tables whose changes also bump rules_version
+_RULE_TABLES = {"categories", "mapping_rules"}
+
+def rules_changed_uncommitted(session: Session) -> bool:
+    """Whether the session has flushed rule or category changes it hasn't committed yet"""
+    return session.info.get(_RULES_CHANGED, False)
+
+@event.listens_for(Session, "after_flush")
+def _mark_flush(session, flush_context):
+    """ORM inserts, updates and deletes"""
+    session.info[_WROTE] = True
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if getattr(obj, "__tablename__", None) in _RULE_TABLES:
+            session.info[_RULES_CHANGED] = True
+            break
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_bulk_write(orm_execute_state):
+    """Core-style insert/update/delete run through the session, e.g. bulk imports"""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        session = orm_execute_state.session
+        session.info[_WROTE] = True
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.local_table.name in _RULE_TABLES:
+            session.info[_RULES_CHANGED] = True
+
+@event.listens_for(Session, "before_commit")
+def _bump_before_commit(session):
+    # Commit flushes after this hook, so flush now to see every pending write
+    session.flush()
+    rules_changed = session.info.pop(_RULES_CHANGED, False)
+    if session.info.pop(_WROTE, False):
+        bump_data_version(session, rules_changed)
+
+@event.listens_for(Session, "after_commit")
+def _forget_committed(session):
+    # Set again by the bump's own UPDATE
+    session.info.pop(_WROTE, None)
+    session.info.pop(_RULES_CHANGED, None)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session):
+    session.info.pop(_WROTE, None)
+    session.info.pop(_RULES_CHANGED, None)
@@ -0,0 +1,117 @@
+import weakref
+from typing import List, Tuple
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection, Engine
+
+from geda.db.base import Base
+
+# FTS5 index over transactions.description and original_description. The
+# trigram tokenizer matches any substring of 3+ characters, like ILIKE did.
+FTS_TABLE = "transactions_fts"
+
+# Shortest term the trigram tokenizer can match
+MIN_TERM_LENGTH = 3
+
+FTS_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        description,
+        original_description,
+        content='transactions',
+        content_rowid='id',
+        tokenize='trigram'
+    )
+    """,
+    # Keep the index in sync with the external content table
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON transactions BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, description, original_description)
+        VALUES (new.id, new.description, new.original_description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON transactions BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description, original_description)
+        VALUES ('delete', old.id, old.description, old.original_description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF description, original_description ON transactions BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description, original_description)
+        VALUES ('delete', old.id, old.description, old.original_description);
+        INSERT INTO {FTS_TABLE}(rowid, description, original_description)
+        VALUES (new.id, new.description, new.original_description);
+    END
+    """,
+]
+
+# Engines known to have the index, so searches don't re-check sqlite_master
+_available = weakref.WeakKeyDictionary()
+
+def _fts_table_exists(connection: Connection) -> bool:
+    """Whether the full-text table exists in the connected SQLite database"""
+    return connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE}
+    ).first() is not None
+
+def create_fts_index(connection: Connection) -> bool:
+    """
+    Create the full-text index and its triggers if SQLite supports them.
+    
+    A newly created index is filled from the existing transactions.
+    
+    Returns:
+        True if the index exists afterwards
+    """
+    if connection.dialect.name != "sqlite":
+        return False
+    
+    if not _fts_table_exists(connection):
+        try:
+            for statement in FTS_DDL:
+                connection.execute(text(statement))
+        except Exception as e:
+            # SQLite built without FTS5 or older than 3.34 (no trigram tokenizer)
+            print(f"Full-text search unavailable, falling back to LIKE: {e}")
+            return False
+        connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    
+    _available[connection.engine] = True
+    return True
+
+def fts_available(engine: Engine) -> bool:
+    """Whether the database behind engine has the full-text index"""
+    available = _available.get(engine)
+    if available is None:
+        available = False
+        if engine.dialect.name == "sqlite":
+            with engine.connect() as connection:
+                available = _fts_table_exists(connection)
+        _available[engine] = available
+    return available
+
+def build_match_query(search: str) -> Tuple[str, List[str]]:
+    """
+    Split a search string into an FTS5 MATCH expression and leftover terms.
+    
+    Every term must appear (AND). Terms shorter than the trigram length
+    can't be matched by the index and are returned separately so callers
+    can filter them with LIKE.
+    
+    Returns:
+        (match expression or "", short terms)
+    """
+    terms = search.split()
+    indexed = [t for t in terms if len(t) >= MIN_TERM_LENGTH]
+    short = [t for t in terms if len(t) < MIN_TERM_LENGTH]
+    
+    # Quote every term so FTS5 operators and punctuation are taken literally
+    match = " ".join('"' + t.replace('"', '""') + '"' for t in indexed)
+    return match, short
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_fts_index(target, connection, **kw):
+    """Set up full-text search whenever the schema is created"""
+    if "transactions" in target.tables:
+        create_fts_index(connection)
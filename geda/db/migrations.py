@@ -0,0 +1,110 @@
+from datetime import datetime
+from typing import Callable, List, NamedTuple
+from sqlalchemy import Table, Column, Integer, String, DateTime, MetaData, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+
+# Applied migrations. Kept out of Base.metadata so create_all never touches it.
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+class Migration(NamedTuple):
+    """One schema or data change, applied at most once per database"""
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+MIGRATIONS: List[Migration] = []
+
+def migration(version: int, description: str):
+    """Register a function as the upgrade step for a schema version"""
+    def register(upgrade: Callable[[Connection], None]) -> Callable[[Connection], None]:
+        MIGRATIONS.append(Migration(version, description, upgrade))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return upgrade
+    return register
+
+def current_version(connection: Connection) -> int:
+    """Highest applied migration version, 0 for a new database"""
+    return connection.execute(select(schema_version.c.version).order_by(
+        schema_version.c.version.desc()
+    ).limit(1)).scalar() or 0
+
+def run_migrations(engine: Engine) -> List[int]:
+    """
+    Apply every migration newer than the database's schema version.
+    
+    Run after Base.metadata.create_all, which creates missing tables.
+    Migrations bring existing tables up to date and must therefore be
+    idempotent on a database create_all has just built. Each migration
+    runs in its own transaction together with its version row.
+    
+    Returns:
+        Versions applied by this call
+    """
+    schema_version.create(engine, checkfirst=True)
+    
+    applied = []
+    for step in MIGRATIONS:
+        with engine.begin() as connection:
+            if step.version <= current_version(connection):
+                continue
+            step.upgrade(connection)
+            connection.execute(schema_version.insert().values(
+                version=step.version,
+                description=step.description,
+                applied_at=datetime.utcnow(),
+            ))
+        applied.append(step.version)
+    
+    return applied
+
+@migration(1, "Index transactions for keyset pagination and reporting")
+def _add_transaction_indexes(connection: Connection) -> None:
+    # Listing order, used by cursor pagination
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_date_id ON transactions (date, id)"
+    ))
+    # Covers the stats and trends queries without touching the table
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_expense_date_category_amount "
+        "ON transactions (is_expense, date, category_id, amount)"
+    ))
+    # Category and source filters, newest first
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_category_date ON transactions (category_id, date)"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_source_date ON transactions (source, date)"
+    ))
+    # Give the query planner statistics for the new indexes
+    connection.execute(text("ANALYZE transactions"))
+
+@migration(2, "Fill daily_category_totals from existing transactions")
+def _build_daily_totals(connection: Connection) -> None:
+    # Imported here: the rollup lives in geda.core, which imports geda.db
+    from sqlalchemy.orm import Session
+    from geda.core.daily_totals import DailyTotalsService
+    
+    # The session joins the migration's transaction, so its commit doesn't end it
+    with Session(bind=connection) as session:
+        DailyTotalsService(session).rebuild()
+
+@migration(3, "Record the file behind each staged import preview")
+def _add_staged_file_digest(connection: Connection) -> None:
+    # create_all builds new databases with the column already in place
+    columns = {column["name"] for column in inspect(connection).get_columns("staged_transactions")}
+    if "file_sha256" not in columns:
+        connection.execute(text("ALTER TABLE staged_transactions ADD COLUMN file_sha256 VARCHAR"))
+
+@migration(4, "Track rule and category changes in data_version")
+def _add_rules_version(connection: Connection) -> None:
+    columns = {column["name"] for column in inspect(connection).get_columns("data_version")}
+    if "rules_version" not in columns:
+        connection.execute(text(
+            "ALTER TABLE data_version ADD COLUMN rules_version INTEGER NOT NULL DEFAULT 0"
+        ))
@@ -1,27 +1,71 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from geda.db.writer import DatabaseWriter, READ_ONLY
+
 # Use SQLite database
 SQLALCHEMY_DATABASE_URL = os.environ.get(
     "DATABASE_URL", "sqlite:///./geda.db"
 )
 
-connect_args = {"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
+# Milliseconds a SQLite connection waits for a lock before failing
+SQLITE_BUSY_TIMEOUT_MS = 30000
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args=connect_args,
-    poolclass=StaticPool,
-)
+def create_db_engine(url: str) -> Engine:
+    """
+    Create an engine, tuned for concurrent readers and one writer on SQLite.
+
+    File databases get a connection pool and run in WAL mode, so readers
+    aren't blocked while the writer commits. In-memory databases exist only
+    on their one connection and keep StaticPool.
+    """
+    if not url.startswith("sqlite"):
+        return create_engine(url)
+
+    in_memory = url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool if in_memory else None,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _configure_connection(dbapi_connection, connection_record):
+        # Let SQLAlchemy emit BEGIN itself, which pysqlite's own transaction
+        # handling gets wrong around SAVEPOINTs
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+        if not in_memory:
+            cursor.execute("PRAGMA journal_mode = WAL")
+            cursor.execute("PRAGMA synchronous = NORMAL")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    return engine
+
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Every write made through the API
+db_writer = DatabaseWriter(engine)
+
 # Dependency to get DB session
 def get_db():
-    db = SessionLocal()
+    """Read-only session; writes go through get_writer()"""
+    db = SessionLocal(info={READ_ONLY: True})
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_writer() -> DatabaseWriter:
+    """Dependency to get the writer every write is sent through"""
+    return db_writer
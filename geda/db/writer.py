@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, Optional, TypeVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+# Most writes committed together in one transaction
+DEFAULT_MAX_BATCH = 32
+
+# Session.info keys
+READ_ONLY = "geda_read_only"
+_AFTER_BATCH = "geda_after_batch"
+
+class DatabaseWriter:
+    """
+    Runs every write on one thread, so writers never wait on each other's locks.
+    
+    Callers hand run() a function of a Session and block until its changes
+    are committed. Writes queued while a transaction is running are grouped
+    into the next one: each gets its own session on a shared connection,
+    and its commit() only releases a SAVEPOINT, so a failing write is rolled
+    back on its own while the rest of the batch still commits. run() returns
+    after the batch's real COMMIT, so the caller's next read sees its write.
+    """
+    
+    def __init__(self, engine: Engine, max_batch: int = DEFAULT_MAX_BATCH):
+        """
+        Args:
+            engine: Engine the writes run on
+            max_batch: Most writes grouped into one transaction
+        """
+        self.engine = engine
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+    
+    def run(self, work: Callable[[Session], T]) -> T:
+        """
+        Run a write and wait until it is committed.
+        
+        Args:
+            work: Called on the writer thread with a session to write through.
+                Objects it returns stay loaded after the session is closed.
+        
+        Returns:
+            What work returned
+        
+        Raises:
+            Whatever work raised, after its changes were rolled back
+        """
+        return self.submit(work).result()
+    
+    async def run_async(self, work: Callable[[Session], T]) -> T:
+        """Like run(), but waits for the commit without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(work))
+    
+    def submit(self, work: Callable[[Session], T]) -> "Future[T]":
+        """Queue a write; the future resolves once it is committed"""
+        if threading.current_thread() is self._thread:
+            raise InvalidRequestError("DatabaseWriter.run() can't be called from a write")
+        
+        future: Future = Future()
+        self._ensure_started()
+        self._queue.put((work, future))
+        return future
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Finish the queued writes and stop the thread; a later run() restarts it"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            if wait:
+                thread.join()
+    
+    def _ensure_started(self) -> None:
+        with self._lock:
+            # Also replaces a thread that died, so queued writes never wait forever
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="db-writer", daemon=True)
+                self._thread.start()
+    
+    def _loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            
+            # Take whatever else is already waiting, up to max_batch
+            batch = [item]
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            
+            self._write_batch(batch)
+            if stop:
+                return
+    
+    def _write_batch(self, batch: List[tuple]) -> None:
+        """Run a batch of writes in one transaction and resolve their futures"""
+        results = []
+        callbacks: List[Callable[[], None]] = []
+        try:
+            with self.engine.connect() as connection:
+                transaction = connection.begin()
+                for work, future in batch:
+                    session = Session(
+                        bind=connection,
+                        join_transaction_mode="create_savepoint",
+                        expire_on_commit=False,
+                        info={_AFTER_BATCH: callbacks},
+                    )
+                    try:
+                        result = work(session)
+                        session.commit()
+                        results.append((future, result, None))
+                    except BaseException as e:
+                        session.rollback()
+                        results.append((future, None, e))
+                    finally:
+                        session.close()
+                transaction.commit()
+        except BaseException as e:
+            # The batch never committed, so no write in it took effect
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        
+        for future, result, error in results:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+        
+        # The writes are in; a failing callback must not stop the writer
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                logger.exception("after_batch_commit callback failed")
+
+def after_batch_commit(session: Session, callback: Callable[[], None]) -> None:
+    """
+    Call callback once session's committed writes are really in the database.
+    
+    For a DatabaseWriter session that is after its batch's COMMIT; for any
+    other session it is now, so call this after session.commit().
+    """
+    callbacks = session.info.get(_AFTER_BATCH)
+    if callbacks is None:
+        callback()
+    else:
+        callbacks.append(callback)
+
+@event.listens_for(Session, "before_flush")
+def _refuse_read_only_flush(session, flush_context, instances):
+    if session.info.get(READ_ONLY) and (session.new or session.dirty or session.deleted):
+        raise InvalidRequestError("Read-only session; send writes through the DatabaseWriter")
+
+@event.listens_for(Session, "do_orm_execute")
+def _refuse_read_only_execute(orm_execute_state):
+    state = orm_execute_state
+    if state.session.info.get(READ_ONLY) and (state.is_insert or state.is_update or state.is_delete):
+        raise InvalidRequestError("Read-only session; send writes through the DatabaseWriter")
\ No newline at end of file
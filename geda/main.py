@@ -3,11 +3,18 @@ from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 
 from geda.api.routes import api_router
-from geda.db import Base, engine, get_db
-from geda.core import CategoryService, RuleService
+from geda.api.uploads import reject_oversized_requests
+from geda.db import Base, engine, async_engine, db_writer
+from geda.db.migrations import run_migrations
+from geda.core import CategoryService, RuleService, ImportService
+from geda.core.llm_cache import llm_cache
+from geda.core.import_jobs import import_job_manager
+from geda.core.neighbour_model import neighbour_models
+from geda.parsers.pdf_tables import pdf_table_extractor
 
-# Create database tables
+# Create database tables, then bring existing ones up to date
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
 
 app = FastAPI(
     title="Geda Budget API",
@@ -22,24 +29,46 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# Refuse oversized uploads before reading them
+app.middleware("http")(reject_oversized_requests)
+
 # Include API routes
 app.include_router(api_router, prefix="/api")
 
 @app.on_event("startup")
 async def startup_event():
     """Create default data on startup"""
-    # Create default categories and rules
-    db = next(get_db())
+    def create_defaults(db):
+        # Create default categories
+        CategoryService(db).create_default_categories()
+        
+        # Create default rules
+        RuleService(db).create_default_rules()
+    
+    db_writer.run(create_defaults)
     
-    # Create default categories
-    category_service = CategoryService(db)
-    category_service.create_default_categories()
+    # Drop cached LLM answers past their TTL, which are only ever misses,
+    # and previews nobody confirmed
+    def purge_expired(db):
+        llm_cache.evict_expired(db)
+        ImportService(db).purge_expired_previews()
     
-    # Create default rules
-    rule_service = RuleService(db)
-    rule_service.create_default_rules()
+    db_writer.run(purge_expired)
+    
+    # Pick up imports interrupted by the last shutdown
+    import_job_manager.resume_pending()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the import, PDF extraction and database writer threads and save the neighbour model"""
+    import_job_manager.shutdown(wait=False)
+    pdf_table_extractor.shutdown(wait=False)
+    db_writer.shutdown()
+    neighbour_models.flush()
+    await async_engine.dispose()
 
 @app.get("/")
 async def root():
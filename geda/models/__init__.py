@@ -1,5 +1,14 @@
 from geda.models.transaction import Transaction
 from geda.models.category import Category
 from geda.models.mapping_rule import MappingRule
+from geda.models.llm_cache_entry import LLMCacheEntry
+from geda.models.daily_category_total import DailyCategoryTotal, UNCATEGORIZED_ID
+from geda.models.import_job import ImportJob
+from geda.models.staged_transaction import StagedTransaction
+from geda.models.imported_file import ImportedFile
 
-__all__ = ["Transaction", "Category", "MappingRule"]
\ No newline at end of file
+__all__ = [
+    "Transaction", "Category", "MappingRule", "LLMCacheEntry",
+    "DailyCategoryTotal", "UNCATEGORIZED_ID", "ImportJob",
+    "StagedTransaction", "ImportedFile"
+]
\ No newline at end of file
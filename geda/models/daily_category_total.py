@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, Float, Date, Boolean
+from geda.db.base import Base
+
+# category_id used for transactions without a category
+UNCATEGORIZED_ID = 0
+
+class DailyCategoryTotal(Base):
+    """Sum and count of transactions per day, category and direction, kept in step with transactions"""
+    __tablename__ = "daily_category_totals"
+    
+    day = Column(Date, primary_key=True)
+    category_id = Column(Integer, primary_key=True)  # UNCATEGORIZED_ID for uncategorized rows, so not a foreign key
+    is_expense = Column(Boolean, primary_key=True)
+    total = Column(Float, nullable=False, default=0.0)
+    count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<DailyCategoryTotal {self.day} {self.category_id} {self.total}>"
@@ -0,0 +1,37 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from geda.db.base import Base
+
+class ImportJob(Base):
+    """A file import running in the background"""
+    __tablename__ = "import_jobs"
+    
+    id = Column(String, primary_key=True)  # UUID
+    filename = Column(String, nullable=False)  # Name of the uploaded file
+    file_path = Column(String, nullable=False)  # Where the upload is kept until the job ends
+    auto_categorize = Column(Boolean, default=True)
+    status = Column(String, nullable=False, default="queued")  # queued, running, completed, failed, cancelled
+    stage = Column(String, nullable=False, default="queued")  # queued, parsing, importing, done
+    rows_total = Column(Integer, nullable=True)  # Estimated until parsing has finished
+    rows_processed = Column(Integer, default=0)
+    imported_count = Column(Integer, default=0)
+    duplicate_count = Column(Integer, default=0)
+    import_id = Column(String, nullable=True)
+    error = Column(String, nullable=True)
+    cancel_requested = Column(Boolean, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Seconds left at the rate rows have been processed so far, if known"""
+        if self.status != "running" or not self.started_at or not self.rows_total or not self.rows_processed:
+            return None
+        elapsed = (datetime.utcnow() - self.started_at).total_seconds()
+        remaining = max(self.rows_total - self.rows_processed, 0)
+        return elapsed / self.rows_processed * remaining
+    
+    def __repr__(self):
+        return f"<ImportJob {self.id} {self.status}>"
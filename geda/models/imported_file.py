@@ -0,0 +1,19 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime
+from geda.db.base import Base
+
+class ImportedFile(Base):
+    """A statement file that has been fully imported, identified by its content"""
+    __tablename__ = "imported_files"
+    
+    sha256 = Column(String, primary_key=True)  # Hex digest of the file's content
+    source = Column(String, nullable=True)  # Source name of the parser that read it; None if it had no rows
+    row_count = Column(Integer, nullable=False)  # Rows parsed from the file, duplicates included
+    # Date range of the file's rows, reported when the same file is previewed again
+    first_date = Column(DateTime, nullable=True)
+    last_date = Column(DateTime, nullable=True)
+    import_id = Column(String, nullable=False)  # The import that brought the file in
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<ImportedFile {self.sha256[:12]} {self.source} {self.row_count} rows>"
@@ -0,0 +1,19 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from geda.db.base import Base
+
+class LLMCacheEntry(Base):
+    """Stores LLM category answers keyed by normalized description and model"""
+    __tablename__ = "llm_category_cache"
+    __table_args__ = (
+        UniqueConstraint("normalized_description", "model", name="uq_llm_cache_description_model"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    normalized_description = Column(String, nullable=False)
+    model = Column(String, nullable=False)  # e.g., "gpt-3.5-turbo"; answers are never shared across models
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<LLMCacheEntry {self.normalized_description} ({self.model}) -> {self.category_id}>"
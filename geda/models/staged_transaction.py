@@ -0,0 +1,27 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, Float, String, DateTime, Boolean, Index
+from geda.db.base import Base
+
+class StagedTransaction(Base):
+    """A parsed row of an import preview, kept until it is confirmed or expires"""
+    __tablename__ = "staged_transactions"
+    __table_args__ = (
+        # Finds expired previews without scanning every staged row
+        Index("ix_staged_transactions_created_at", "created_at"),
+    )
+    
+    import_id = Column(String, primary_key=True)  # The preview's import_id
+    position = Column(Integer, primary_key=True)  # Index of the row in the preview
+    date = Column(DateTime, nullable=False)
+    amount = Column(Float, nullable=False)
+    description = Column(String, nullable=False)
+    original_description = Column(String, nullable=True)
+    is_expense = Column(Boolean, default=True)
+    source = Column(String, nullable=False)
+    source_id = Column(String, nullable=True)
+    hash_id = Column(String, nullable=False)
+    file_sha256 = Column(String, nullable=True)  # Digest of the previewed file
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<StagedTransaction {self.import_id}:{self.position} {self.description}>"
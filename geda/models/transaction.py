@@ -1,11 +1,19 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from geda.db.base import Base
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Matches the listing order, so cursor pages are index range scans
+        Index("ix_transactions_date_id", "date", "id"),
+        # Covers the stats and trends queries without touching the table
+        Index("ix_transactions_expense_date_category_amount", "is_expense", "date", "category_id", "amount"),
+        Index("ix_transactions_category_date", "category_id", "date"),
+        Index("ix_transactions_source_date", "source", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     date = Column(DateTime, nullable=False)
@@ -1,5 +1,6 @@
 from geda.parsers.base_parser import BaseParser
+from geda.parsers.csv_parser import CSVParser
 from geda.parsers.parser_factory import ParserFactory
 from geda.parsers.pdf_parser import PDFParser
 
-__all__ = ["BaseParser", "ParserFactory", "PDFParser"]
\ No newline at end of file
+__all__ = ["BaseParser", "CSVParser", "ParserFactory", "PDFParser"]
\ No newline at end of file
@@ -1,17 +1,14 @@
-from datetime import datetime
 from typing import List, Dict, Any
 import pandas as pd
-from geda.parsers.base_parser import BaseParser
+from geda.parsers.csv_parser import CSVParser
 
-class CIBCParser(BaseParser):
+class CIBCParser(CSVParser):
     """Parser for CIBC credit card and bank account CSV files"""
     
     source_name = "CIBC"
     
-    def parse(self, file_path: str) -> List[Dict[str, Any]]:
-        """Parse CIBC CSV file format"""
-        df = self.read_csv(file_path)
-        
+    def parse_frame(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Parse a CIBC CSV export that has already been loaded"""
         # Determine if it's a credit card or bank account CSV
         if "Card Number" in df.columns or "Transaction Type" in df.columns:
             return self._parse_credit_card(df)
@@ -23,58 +20,38 @@ class CIBCParser(BaseParser):
         # Expected columns: 
         # Date, Card Number, Description, Amount
         
-        transactions = []
+        # Parse dates and amounts (CIBC uses negative for expenses)
+        dates = self.parse_dates(df["Date"], ["%Y/%m/%d"])
+        amounts = self.parse_amounts(df["Amount"])
         
-        for _, row in df.iterrows():
-            # Parse date
-            date = datetime.strptime(row["Date"], "%Y/%m/%d")
-            
-            # Parse amount (CIBC uses negative for expenses)
-            amount = float(str(row["Amount"]).replace("$", "").replace(",", ""))
-            
-            # Create transaction
-            card_number = row.get("Card Number", "")
-            transaction = {
-                "date": date,
-                "amount": amount,
-                "description": row["Description"],
-                "original_description": row["Description"],
-                "source_id": f"{card_number}_{row['Date']}_{row['Description']}"
-            }
-            
-            transactions.append(transaction)
+        card_numbers = df["Card Number"].astype(str) if "Card Number" in df.columns else ""
+        source_ids = (
+            card_numbers + "_"
+            + df["Date"].astype(str) + "_"
+            + df["Description"].astype(str)
+        )
         
-        # Process and return
-        return self.process_transactions(transactions)
+        # Create and process transactions
+        return self.build_transactions(dates, amounts, df["Description"], source_ids)
     
     def _parse_bank_account(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
         """Parse CIBC bank account CSV format"""
         # Expected columns: 
         # Date, Description, Withdrawal, Deposit, Balance
         
-        transactions = []
+        # Parse dates
+        dates = self.parse_dates(df["Date"], ["%Y/%m/%d"])
+        
+        # Parse amount: withdrawals are expenses, deposits are income
+        amounts = pd.Series(0.0, index=df.index)
+        if "Deposit" in df.columns:
+            deposit = self.has_value(df["Deposit"])
+            amounts[deposit] = self.parse_amounts(df["Deposit"][deposit])
+        if "Withdrawal" in df.columns:
+            withdrawal = self.has_value(df["Withdrawal"])
+            amounts[withdrawal] = -self.parse_amounts(df["Withdrawal"][withdrawal])
         
-        for _, row in df.iterrows():
-            # Parse date
-            date = datetime.strptime(row["Date"], "%Y/%m/%d")
-            
-            # Parse amount
-            amount = 0.0
-            if pd.notna(row.get("Withdrawal", None)) and row["Withdrawal"]:
-                amount = -float(str(row["Withdrawal"]).replace("$", "").replace(",", ""))
-            elif pd.notna(row.get("Deposit", None)) and row["Deposit"]:
-                amount = float(str(row["Deposit"]).replace("$", "").replace(",", ""))
-            
-            # Create transaction
-            transaction = {
-                "date": date,
-                "amount": amount,
-                "description": row["Description"],
-                "original_description": row["Description"],
-                "source_id": f"{row['Date']}_{row['Description']}"
-            }
-            
-            transactions.append(transaction)
+        source_ids = df["Date"].astype(str) + "_" + df["Description"].astype(str)
         
-        # Process and return
-        return self.process_transactions(transactions)
\ No newline at end of file
+        # Create and process transactions
+        return self.build_transactions(dates, amounts, df["Description"], source_ids)
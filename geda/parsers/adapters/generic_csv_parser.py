@@ -1,48 +1,31 @@
-from datetime import datetime
 from typing import List, Dict, Any
 import pandas as pd
-from geda.parsers.base_parser import BaseParser
+from geda.parsers.csv_parser import CSVParser
 
-class GenericCSVParser(BaseParser):
+class GenericCSVParser(CSVParser):
     """Parser for generic CSV files with Date,Description,Amount format"""
     
     source_name = "Generic CSV"
     
-    def parse(self, file_path: str) -> List[Dict[str, Any]]:
-        """Parse generic CSV file format"""
-        df = self.read_csv(file_path)
-        
+    def parse_frame(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Parse a generic CSV file that has already been loaded"""
         # Verify required columns exist
         required_columns = ["Date", "Description", "Amount"]
         missing_columns = [col for col in required_columns if col not in df.columns]
         if missing_columns:
             raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
         
-        transactions = []
+        # Parse dates - try multiple formats
+        dates = self.parse_dates(df["Date"], ["%Y-%m-%d", "%m/%d/%Y"])
+        
+        # Parse amounts
+        amounts = self.parse_amounts(df["Amount"])
         
-        for _, row in df.iterrows():
-            # Parse date - try multiple formats
-            try:
-                date = datetime.strptime(row["Date"], "%Y-%m-%d")
-            except ValueError:
-                try:
-                    date = datetime.strptime(row["Date"], "%m/%d/%Y")
-                except ValueError:
-                    raise ValueError(f"Unsupported date format: {row['Date']}")
-            
-            # Parse amount
-            amount = float(str(row["Amount"]).replace("$", "").replace(",", ""))
-            
-            # Create transaction
-            transaction = {
-                "date": date,
-                "amount": amount,
-                "description": row["Description"],
-                "original_description": row["Description"],
-                "source_id": f"{row['Date']}_{row['Description']}_{row['Amount']}"
-            }
-            
-            transactions.append(transaction)
+        source_ids = (
+            df["Date"].astype(str) + "_"
+            + df["Description"].astype(str) + "_"
+            + df["Amount"].astype(str)
+        )
         
-        # Process and return
-        return self.process_transactions(transactions) 
\ No newline at end of file
+        # Create and process transactions
+        return self.build_transactions(dates, amounts, df["Description"], source_ids)
@@ -1,17 +1,14 @@
-from datetime import datetime
 from typing import List, Dict, Any
 import pandas as pd
-from geda.parsers.base_parser import BaseParser
+from geda.parsers.csv_parser import CSVParser
 
-class RBCParser(BaseParser):
+class RBCParser(CSVParser):
     """Parser for RBC credit card and bank account CSV files"""
     
     source_name = "RBC"
     
-    def parse(self, file_path: str) -> List[Dict[str, Any]]:
-        """Parse RBC CSV file format"""
-        df = self.read_csv(file_path)
-        
+    def parse_frame(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Parse an RBC CSV export that has already been loaded"""
         # Determine if it's a credit card or bank account CSV
         if "Account Type" in df.columns and "Card Number" in df.columns:
             return self._parse_credit_card(df)
@@ -23,62 +20,49 @@ class RBCParser(BaseParser):
         # Expected columns: 
         # Transaction Date, Posting Date, Card Number, Description, Category, Debit, Credit
         
-        transactions = []
+        # Parse dates
+        dates = self.parse_dates(df["Transaction Date"], ["%m/%d/%Y"])
+        
+        # Parse amount: debits are expenses, credits are income
+        amounts = pd.Series(0.0, index=df.index)
+        if "Credit" in df.columns:
+            credit = self.has_value(df["Credit"])
+            amounts[credit] = self.parse_amounts(df["Credit"][credit])
+        if "Debit" in df.columns:
+            debit = self.has_value(df["Debit"])
+            amounts[debit] = -self.parse_amounts(df["Debit"][debit])
         
-        for _, row in df.iterrows():
-            # Parse date
-            date = datetime.strptime(row["Transaction Date"], "%m/%d/%Y")
-            
-            # Parse amount
-            amount = 0.0
-            if pd.notna(row.get("Debit", None)) and row["Debit"]:
-                amount = -float(row["Debit"].replace("$", "").replace(",", ""))
-            elif pd.notna(row.get("Credit", None)) and row["Credit"]:
-                amount = float(row["Credit"].replace("$", "").replace(",", ""))
-            
-            # Create transaction
-            transaction = {
-                "date": date,
-                "amount": amount,
-                "description": row["Description"],
-                "original_description": row["Description"],
-                "source_id": f"{row['Card Number']}_{row['Transaction Date']}_{row['Description']}"
-            }
-            
-            transactions.append(transaction)
+        source_ids = (
+            df["Card Number"].astype(str) + "_"
+            + df["Transaction Date"].astype(str) + "_"
+            + df["Description"].astype(str)
+        )
         
-        # Process and return
-        return self.process_transactions(transactions)
+        # Create and process transactions
+        return self.build_transactions(dates, amounts, df["Description"], source_ids)
     
     def _parse_bank_account(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
         """Parse RBC bank account CSV format"""
         # Expected columns: 
         # Date, Transaction, Name, Memo, Amount
         
-        transactions = []
+        # Parse dates and amounts
+        dates = self.parse_dates(df["Date"], ["%m/%d/%Y"])
+        amounts = self.parse_amounts(df["Amount"])
+        
+        # Create description, appending the memo when there is one
+        descriptions = df["Name"]
+        if "Memo" in df.columns:
+            memo = self.has_value(df["Memo"])
+            descriptions = descriptions.where(
+                ~memo, descriptions.astype(str) + " - " + df["Memo"].astype(str)
+            )
         
-        for _, row in df.iterrows():
-            # Parse date
-            date = datetime.strptime(row["Date"], "%m/%d/%Y")
-            
-            # Parse amount
-            amount = float(str(row["Amount"]).replace("$", "").replace(",", ""))
-            
-            # Create description
-            description = row["Name"]
-            if pd.notna(row.get("Memo", None)) and row["Memo"]:
-                description += f" - {row['Memo']}"
-            
-            # Create transaction
-            transaction = {
-                "date": date,
-                "amount": amount,
-                "description": description,
-                "original_description": description,
-                "source_id": f"{row['Date']}_{row['Transaction']}_{row['Name']}"
-            }
-            
-            transactions.append(transaction)
+        source_ids = (
+            df["Date"].astype(str) + "_"
+            + df["Transaction"].astype(str) + "_"
+            + df["Name"].astype(str)
+        )
         
-        # Process and return
-        return self.process_transactions(transactions)
\ No newline at end of file
+        # Create and process transactions
+        return self.build_transactions(dates, amounts, descriptions, source_ids)
@@ -1,10 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator
 import pandas as pd
 import hashlib
 import json
 from datetime import datetime
 
+# Rows per chunk when a parser streams a file
+DEFAULT_CHUNK_SIZE = 5000
+
 class BaseParser(ABC):
     """Base class for all parsers"""
     
@@ -24,6 +27,15 @@ class BaseParser(ABC):
         """
         pass
     
+    def iter_parse(self, file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Parse the file in chunks of transaction dictionaries.
+        
+        Parsers that can only read a whole document at once (e.g. PDF)
+        yield all transactions as a single chunk.
+        """
+        yield self.parse(file_path)
+    
     def generate_hash(self, transaction: Dict[str, Any]) -> str:
         """
         Generate a hash for the transaction to detect duplicates.
@@ -36,21 +48,115 @@ class BaseParser(ABC):
         """
         # Extract and format key fields
         date_str = transaction["date"].strftime("%Y-%m-%d")
-        amount_str = f"{float(transaction['amount']):.2f}"
-        source = self.source_name
         
+        return self._hash_fields(date_str, transaction["amount"], transaction["description"])
+    
+    def _hash_fields(self, date_str: str, amount: float, description: Any) -> str:
+        """Hash the already formatted duplicate-detection fields"""
         # Combine fields into a string
-        hash_str = f"{date_str}|{amount_str}|{transaction['description']}|{source}"
+        hash_str = f"{date_str}|{float(amount):.2f}|{description}|{self.source_name}"
         
         # Generate hash
-        hash_value = hashlib.sha256(hash_str.encode()).hexdigest()
-        
-        return hash_value
+        return hashlib.sha256(hash_str.encode()).hexdigest()
     
     def read_csv(self, file_path: str) -> pd.DataFrame:
         """Read a CSV file into a pandas DataFrame"""
         return pd.read_csv(file_path, encoding="utf-8")
     
+    def parse_dates(self, values: pd.Series, formats: List[str]) -> pd.Series:
+        """
+        Parse a whole column of date strings.
+        
+        Each format is tried in turn on the values the previous formats
+        couldn't parse, so a column mixing two formats is still handled.
+        
+        Args:
+            values: Column of date strings
+            formats: strptime-style formats to try, in order
+            
+        Returns:
+            A datetime64 Series aligned with values
+            
+        Raises:
+            ValueError: If a value doesn't match any of the formats
+        """
+        dates = pd.to_datetime(values, format=formats[0], errors="coerce")
+        
+        for date_format in formats[1:]:
+            missing = dates.isna()
+            if not missing.any():
+                break
+            dates[missing] = pd.to_datetime(values[missing], format=date_format, errors="coerce")
+        
+        unparsed = dates.isna()
+        if unparsed.any():
+            raise ValueError(f"Unsupported date format: {values[unparsed].iloc[0]}")
+        
+        return dates
+    
+    def parse_amounts(self, values: pd.Series) -> pd.Series:
+        """Convert a column of currency strings such as "$1,234.56" to floats"""
+        if pd.api.types.is_numeric_dtype(values):
+            return values.astype(float)
+        
+        # Remove currency symbols and thousands separators
+        cleaned = (
+            values.astype(str)
+            .str.replace("$", "", regex=False)
+            .str.replace(",", "", regex=False)
+        )
+        return cleaned.astype(float)
+    
+    @staticmethod
+    def has_value(values: pd.Series) -> pd.Series:
+        """Boolean mask of cells that are neither missing nor empty/zero"""
+        return values.notna() & values.astype(bool)
+    
+    def build_transactions(self,
+                           dates: pd.Series,
+                           amounts: pd.Series,
+                           descriptions: pd.Series,
+                           source_ids: pd.Series) -> List[Dict[str, Any]]:
+        """
+        Assemble processed transaction dictionaries from parsed columns.
+        
+        This produces the same dictionaries as building them row by row and
+        passing them through process_transactions, but every field except
+        the hash is computed column-wise.
+        
+        Args:
+            dates: Parsed datetime64 column
+            amounts: Parsed float column (negative for expenses)
+            descriptions: Description column
+            source_ids: Source ID column
+            
+        Returns:
+            List of transaction dictionaries
+        """
+        day_strings = dates.values.astype("datetime64[D]").astype(str).tolist()
+        amount_values = amounts.tolist()
+        
+        transactions = []
+        for date, amount, description, source_id, day in zip(
+            dates.dt.to_pydatetime(),
+            amount_values,
+            descriptions.tolist(),
+            source_ids.tolist(),
+            day_strings,
+        ):
+            transactions.append({
+                "date": date,
+                "amount": amount,
+                "description": description,
+                "original_description": description,
+                "source_id": source_id,
+                "source": self.source_name,
+                "is_expense": amount < 0,
+                "hash_id": self._hash_fields(day, amount, description),
+            })
+        
+        return transactions
+    
     def process_transactions(self, transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Process transactions and add common fields.
@@ -0,0 +1,39 @@
+from abc import abstractmethod
+from typing import List, Dict, Any, Iterator
+import pandas as pd
+
+from geda.parsers.base_parser import BaseParser, DEFAULT_CHUNK_SIZE
+
+class CSVParser(BaseParser):
+    """Base class for parsers of CSV exports"""
+    
+    def parse(self, file_path: str) -> List[Dict[str, Any]]:
+        """Parse the whole CSV file"""
+        return self.parse_frame(self.read_csv(file_path))
+    
+    @abstractmethod
+    def parse_frame(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Parse rows of the CSV file that have already been loaded.
+        
+        Called with the whole file by parse() and with one chunk at a time
+        by iter_parse(), so it must not assume it sees every row.
+        """
+        pass
+    
+    def iter_parse(self, file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Parse the CSV file chunk by chunk.
+        
+        Only one chunk of rows is held in memory at a time.
+        
+        Args:
+            file_path: Path to the CSV file
+            chunk_size: Maximum number of rows per chunk
+            
+        Yields:
+            Lists of transaction dictionaries
+        """
+        with pd.read_csv(file_path, encoding="utf-8", chunksize=chunk_size) as reader:
+            for df in reader:
+                yield self.parse_frame(df)
@@ -1,10 +1,16 @@
+import io
 import os
+import pandas as pd
 from typing import Optional, List, Dict, Any
 from geda.parsers.base_parser import BaseParser
 from geda.parsers.adapters.rbc_parser import RBCParser
 from geda.parsers.adapters.cibc_parser import CIBCParser
 from geda.parsers.adapters.generic_csv_parser import GenericCSVParser
 from geda.parsers.pdf_parser import PDFParser
+from geda.parsers.sniffing import sniff_csv, sniff_pdf
+
+# Rows parsed when trying parsers to detect a CSV file's format
+DETECTION_ROWS = 50
 
 class ParserFactory:
     """Factory for creating parsers based on file type and source"""
@@ -31,8 +37,8 @@ class ParserFactory:
             # For CSV, we'll try to detect the source from the content
             return ParserFactory._get_csv_parser(file_path)
         elif ext == '.pdf':
-            # For PDF, use the generic PDF parser which will detect the source
-            return PDFParser()
+            # For PDF, sniff the first page once; the parser reuses what was read
+            return PDFParser(sniff_pdf(file_path))
         else:
             raise ValueError(f"Unsupported file type: {ext}")
     
@@ -41,53 +47,32 @@ class ParserFactory:
         """
         Get the appropriate CSV parser based on file content.
         
+        Only the first SNIFF_BYTES of the file are read: the header lines are
+        checked for a bank signature and, failing that, each parser is tried
+        on the first rows of the sample.
+        
         Args:
             file_path: Path to the CSV file
             
         Returns:
             An instance of a BaseParser subclass for CSV files
         """
-        # Read the first few lines to detect the format
-        with open(file_path, 'r', encoding='utf-8') as f:
-            header = ''.join([f.readline() for _ in range(5)])
+        sniff = sniff_csv(file_path)
+        if sniff.signature and sniff.signature.csv_parser:
+            return sniff.signature.csv_parser()
         
-        # Check for RBC patterns
-        if "RBC" in header or "Royal Bank" in header:
-            return RBCParser()
-        # Check for CIBC patterns
-        elif "CIBC" in header or "Canadian Imperial Bank of Commerce" in header:
-            return CIBCParser()
-        # Additional banks can be added here
-        # elif "AMEX" in header or "American Express" in header:
-        #     return AmexParser()
-        else:
-            # Default to trying different parsers
-            try:
-                # Try RBC first
-                parser = RBCParser()
-                transactions = parser.parse(file_path)
-                if transactions:
-                    return parser
-            except Exception:
-                pass
-                
-            try:
-                # Try CIBC next
-                parser = CIBCParser()
-                transactions = parser.parse(file_path)
-                if transactions:
-                    return parser
-            except Exception:
-                pass
-                
-            try:
-                # Try generic CSV parser as last resort
-                parser = GenericCSVParser()
-                transactions = parser.parse(file_path)
-                if transactions:
-                    return parser
-            except Exception:
-                pass
-                
-            # If we get here, we couldn't determine the source
-            raise ValueError(f"Could not determine source for CSV file: {file_path}")
\ No newline at end of file
+        # Default to trying different parsers on the first rows of the file
+        try:
+            sample = pd.read_csv(io.StringIO(sniff.sample), nrows=DETECTION_ROWS)
+        except Exception:
+            sample = None
+        if sample is not None:
+            for parser in (RBCParser(), CIBCParser(), GenericCSVParser()):
+                try:
+                    if parser.parse_frame(sample):
+                        return parser
+                except Exception:
+                    pass
+        
+        # If we get here, we couldn't determine the source
+        raise ValueError(f"Could not determine source for CSV file: {file_path}")
\ No newline at end of file
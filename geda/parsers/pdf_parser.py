@@ -1,23 +1,34 @@
 import os
 import pandas as pd
-import tabula
-import PyPDF2
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import tempfile
 import re
 
 from geda.parsers.base_parser import BaseParser
+from geda.parsers.pdf_tables import pdf_table_extractor
+from geda.parsers.sniffing import PDFSniff, sniff_pdf
 
 class PDFParser(BaseParser):
     """Parser for PDF statements"""
     
     source_name: str = "Unknown"  # Will be set based on detection
     
+    def __init__(self, sniff: Optional[PDFSniff] = None):
+        """
+        Args:
+            sniff: What ParserFactory already read from the file's first page,
+                so it isn't read again
+        """
+        self.sniff = sniff
+        if sniff is not None:
+            self.source_name = sniff.signature.source_name if sniff.signature else "Unknown"
+    
     def parse(self, file_path: str) -> List[Dict[str, Any]]:
         """Parse PDF and extract transactions"""
         # First, determine the source/bank
-        self.detect_source(file_path)
+        if self.sniff is None:
+            self.detect_source(file_path)
         
         # Extract tables from PDF
         tables = self.extract_tables(file_path)
@@ -31,29 +42,14 @@ class PDFParser(BaseParser):
             raise ValueError(f"Unsupported PDF format from source: {self.source_name}")
     
     def detect_source(self, file_path: str) -> None:
-        """Detect the source bank from the PDF content"""
-        # Open the PDF
-        with open(file_path, "rb") as file:
-            pdf = PyPDF2.PdfReader(file)
-            
-            # Extract text from first page
-            text = pdf.pages[0].extract_text()
-            
-            # Look for bank identifiers
-            if "CIBC" in text:
-                self.source_name = "CIBC"
-            elif "RBC" in text:
-                self.source_name = "RBC"
-            elif "AMEX" in text or "American Express" in text:
-                self.source_name = "AMEX"
-            else:
-                self.source_name = "Unknown"
+        """Detect the source bank from the PDF's first page and metadata"""
+        self.sniff = sniff_pdf(file_path)
+        self.source_name = self.sniff.signature.source_name if self.sniff.signature else "Unknown"
     
     def extract_tables(self, file_path: str) -> List[pd.DataFrame]:
-        """Extract tables from PDF"""
-        # Extract all tables from all pages
-        tables = tabula.read_pdf(file_path, pages="all", multiple_tables=True)
-        return tables
+        """Extract tables from PDF, page ranges in parallel and cached per page"""
+        page_count = self.sniff.page_count if self.sniff is not None else None
+        return pdf_table_extractor.extract(file_path, page_count)
     
     def parse_cibc(self, tables: List[pd.DataFrame]) -> List[Dict[str, Any]]:
         """Parse CIBC PDF tables"""
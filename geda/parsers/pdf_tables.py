@@ -0,0 +1,233 @@
+import os
+import hashlib
+import math
+import pickle
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from typing import List, Optional
+import pandas as pd
+import tabula
+import PyPDF2
+
+# Fewest pages extracted by one worker task
+PAGES_PER_TASK = 2
+
+# Bounds of the on-disk table cache
+DEFAULT_CACHE_MAX_BYTES = 256 << 20
+DEFAULT_CACHE_TTL = timedelta(days=30)
+
+def file_digest(file_path: str) -> str:
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def extract_pages(file_path: str, pages: List[int]) -> List[pd.DataFrame]:
+    """
+    Extract the tables of a range of pages.
+    
+    Runs inside a worker process. tabula-py starts a java process for every
+    read_pdf() call, so the whole range is read in one call.
+    """
+    return tabula.read_pdf(file_path, pages=pages, multiple_tables=True)
+
+class PageTableCache:
+    """
+    Tables extracted from ranges of PDF pages, kept on disk.
+    
+    Entries are keyed by the file's content hash and page range, so the
+    same statement uploaded again under any name hits the cache. Entries
+    unused for longer than ttl are dropped, and the least recently used
+    ones go once the cache grows past max_bytes.
+    """
+    
+    def __init__(self,
+                 cache_dir: Optional[str],
+                 max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+                 ttl: timedelta = DEFAULT_CACHE_TTL):
+        """
+        Args:
+            cache_dir: Directory to keep the tables in; None disables caching
+            max_bytes: Most bytes of tables kept
+            ttl: How long an entry is kept after it was last used
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+    
+    def get(self, digest: str, pages: List[int]) -> Optional[List[pd.DataFrame]]:
+        """Cached tables of a page range, or None if the range isn't cached"""
+        if not self.cache_dir:
+            return None
+        path = self._path(digest, pages)
+        try:
+            with open(path, "rb") as f:
+                tables = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        
+        # Mark the entry as recently used
+        os.utime(path)
+        return tables
+    
+    def put(self, digest: str, pages: List[int], tables: List[pd.DataFrame]) -> None:
+        """Cache the tables of a page range"""
+        if not self.cache_dir:
+            return
+        path = self._path(digest, pages)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        # Write to a temporary file first so a crash never leaves a torn file
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(tables, f)
+        os.replace(temp_path, path)
+    
+    def prune(self) -> int:
+        """
+        Drop expired entries, then the least recently used ones until the
+        cache fits in max_bytes.
+        
+        Returns:
+            Number of entries dropped
+        """
+        if not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return 0
+        
+        entries = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith(".pkl"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        
+        expired_before = time.time() - self.ttl.total_seconds()
+        total = sum(size for _, size, _ in entries)
+        dropped = 0
+        for mtime, size, path in sorted(entries):
+            if mtime >= expired_before and total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            dropped += 1
+            
+            # Remove the file's directory once its last range is gone
+            try:
+                os.rmdir(os.path.dirname(path))
+            except OSError:
+                pass
+        return dropped
+    
+    def _path(self, digest: str, pages: List[int]) -> str:
+        return os.path.join(self.cache_dir, digest, f"{pages[0]}-{pages[-1]}.pkl")
+
+class PDFTableExtractor:
+    """
+    Extracts a PDF's tables page range by page range on a process pool.
+    
+    The pages are split into at most one contiguous range per worker, each
+    read with a single tabula call, so a document costs one java start per
+    worker rather than one per page. The pool is started with the first
+    multi-page document and reused afterwards. Ranges already in the cache
+    are not extracted again.
+    """
+    
+    def __init__(self,
+                 cache: PageTableCache,
+                 max_workers: int = 2,
+                 pages_per_task: int = PAGES_PER_TASK):
+        """
+        Args:
+            cache: Where extracted tables are cached
+            max_workers: Maximum number of extraction processes; 1 extracts
+                in the calling process
+            pages_per_task: Fewest pages extracted by one worker task
+        """
+        self.cache = cache
+        self.max_workers = max_workers
+        self.pages_per_task = pages_per_task
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+    
+    def extract(self, file_path: str, page_count: Optional[int] = None) -> List[pd.DataFrame]:
+        """
+        Extract the tables of every page of a PDF.
+        
+        Args:
+            file_path: Path to the PDF
+            page_count: Number of pages, if already known; read from the
+                PDF otherwise
+        
+        Returns:
+            The tables, in page order
+        """
+        digest = file_digest(file_path)
+        if page_count is None:
+            with open(file_path, "rb") as f:
+                page_count = len(PyPDF2.PdfReader(f).pages)
+        
+        ranges = self._page_ranges(page_count)
+        tables_by_range = [self.cache.get(digest, pages) for pages in ranges]
+        missing = [i for i, tables in enumerate(tables_by_range) if tables is None]
+        
+        extracted = self._extract_ranges(file_path, [ranges[i] for i in missing])
+        for i, tables in zip(missing, extracted):
+            self.cache.put(digest, ranges[i], tables)
+            tables_by_range[i] = tables
+        if missing:
+            self.cache.prune()
+        
+        return [table for tables in tables_by_range for table in tables]
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes; a later extract() starts new ones"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+    
+    def _page_ranges(self, page_count: int) -> List[List[int]]:
+        """Split a document's pages into one contiguous range per task"""
+        if page_count == 0:
+            return []
+        if self.max_workers == 1:
+            return [list(range(1, page_count + 1))]
+        
+        size = max(self.pages_per_task, math.ceil(page_count / self.max_workers))
+        return [list(range(first, min(first + size, page_count + 1))) for first in range(1, page_count + 1, size)]
+    
+    def _extract_ranges(self, file_path: str, ranges: List[List[int]]) -> List[List[pd.DataFrame]]:
+        """Extract some page ranges, on the pool when there is more than one"""
+        if len(ranges) <= 1:
+            return [extract_pages(file_path, pages) for pages in ranges]
+        
+        futures = [self._get_executor().submit(extract_pages, file_path, pages) for pages in ranges]
+        return [future.result() for future in futures]
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """The worker pool, started on first use"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+# Shared by every PDFParser; its processes start with the first multi-page PDF
+pdf_table_extractor = PDFTableExtractor(
+    PageTableCache(
+        os.environ.get("PDF_TABLE_CACHE_DIR", "./cache/pdf_tables"),
+        max_bytes=int(os.environ.get("PDF_TABLE_CACHE_MAX_BYTES", str(DEFAULT_CACHE_MAX_BYTES))),
+        ttl=timedelta(days=int(os.environ.get("PDF_TABLE_CACHE_TTL_DAYS", "30"))),
+    ),
+    max_workers=int(os.environ.get("PDF_WORKERS", "2")),
+)
@@ -0,0 +1,96 @@
+import re
+from typing import List, Dict, Any, Optional, NamedTuple, Type, Sequence
+import PyPDF2
+
+from geda.parsers.csv_parser import CSVParser
+from geda.parsers.adapters.rbc_parser import RBCParser
+from geda.parsers.adapters.cibc_parser import CIBCParser
+
+# Bytes read from the start of a CSV file to detect its format
+SNIFF_BYTES = 8192
+
+# Most lines at the top of a CSV file searched for a bank signature
+HEADER_LINES = 5
+
+# A date such as 2023-01-05 or 01/05/2023, which marks a CSV data row
+_DATE = re.compile(r"\b\d{1,4}[/-]\d{1,2}[/-]\d{1,4}\b")
+
+class BankSignature(NamedTuple):
+    """Text that identifies a bank's statements"""
+    source_name: str
+    markers: tuple  # Any of these in the sniffed text identifies the bank
+    csv_parser: Optional[Type[CSVParser]] = None  # Parser for the bank's CSV exports
+
+# Checked in order for CSV files; the first signature with a matching marker wins
+BANK_SIGNATURES: List[BankSignature] = [
+    BankSignature("RBC", ("RBC", "Royal Bank"), RBCParser),
+    BankSignature("CIBC", ("CIBC", "Canadian Imperial Bank of Commerce"), CIBCParser),
+    BankSignature("AMEX", ("AMEX", "American Express")),
+]
+
+# PDF statements are checked for CIBC first
+PDF_SIGNATURES: List[BankSignature] = sorted(
+    BANK_SIGNATURES, key=lambda signature: signature.source_name != "CIBC"
+)
+
+def match_signature(text: str, signatures: Sequence[BankSignature] = BANK_SIGNATURES) -> Optional[BankSignature]:
+    """The first bank signature with a marker in the text, if any"""
+    for signature in signatures:
+        if any(marker in text for marker in signature.markers):
+            return signature
+    return None
+
+def header_text(sample: str) -> str:
+    """
+    The lines of a CSV sample above its first data row.
+    
+    Only these are searched for a bank signature, so a description that
+    mentions another bank doesn't decide the format.
+    """
+    lines = []
+    for line in sample.splitlines(keepends=True)[:HEADER_LINES]:
+        if _DATE.search(line):
+            break
+        lines.append(line)
+    return "".join(lines)
+
+class CSVSniff(NamedTuple):
+    """What the start of a CSV file says about it"""
+    sample: str  # Whole lines from the start of the file
+    signature: Optional[BankSignature]
+
+def sniff_csv(file_path: str, num_bytes: int = SNIFF_BYTES) -> CSVSniff:
+    """Read the first few KB of a CSV file and look for a bank signature"""
+    with open(file_path, "rb") as f:
+        head = f.read(num_bytes)
+        at_end = not f.read(1)
+    
+    # Drop a line (and any character) cut off by the read
+    text = head.decode("utf-8", errors="ignore")
+    if not at_end and "\n" in text:
+        text = text[:text.rindex("\n") + 1]
+    
+    return CSVSniff(text, match_signature(header_text(text)))
+
+class PDFSniff(NamedTuple):
+    """What the first page and metadata of a PDF say about it"""
+    page_count: int
+    first_page_text: str
+    metadata: Dict[str, Any]
+    signature: Optional[BankSignature]
+
+def sniff_pdf(file_path: str) -> PDFSniff:
+    """
+    Read a PDF's first page text and metadata and look for a bank signature.
+    
+    The reader works from the open file, so only the cross-reference table,
+    the page tree and the first page's content stream are read.
+    """
+    with open(file_path, "rb") as f:
+        pdf = PyPDF2.PdfReader(f)
+        page_count = len(pdf.pages)
+        first_page_text = pdf.pages[0].extract_text() if page_count else ""
+        metadata = {key: str(value) for key, value in (pdf.metadata or {}).items()}
+    
+    text = "\n".join([first_page_text, *metadata.values()])
+    return PDFSniff(page_count, first_page_text, metadata, match_signature(text, PDF_SIGNATURES))
\ No newline at end of file
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for the Geda database
+"""
+
+import argparse
+import tempfile
+
+from geda.db import Base, engine, SessionLocal
+from geda.db.migrations import run_migrations
+from geda.core import ImportService
+from geda.core.batch_import import collect_statement_files
+from geda.core.daily_totals import DailyTotalsService
+from geda.core.llm_cache import llm_cache
+
+def migrate(args):
+    """Create missing tables and apply pending migrations"""
+    Base.metadata.create_all(bind=engine)
+    applied = run_migrations(engine)
+    print(f"Applied migrations: {applied}" if applied else "Database is up to date")
+
+def rebuild_totals(args):
+    """Recompute the daily_category_totals rollup from the transactions table"""
+    db = SessionLocal()
+    try:
+        rows = DailyTotalsService(db).rebuild()
+        print(f"Rebuilt daily_category_totals: {rows} rows")
+    finally:
+        db.close()
+
+def evict_llm_cache(args):
+    """Delete cached LLM category answers older than the cache TTL"""
+    db = SessionLocal()
+    try:
+        deleted = llm_cache.evict_expired(db)
+        print(f"Deleted {deleted} expired LLM cache entries")
+    finally:
+        db.close()
+
+def import_files(args):
+    """Import statement files, zip archives or directories of statements in one batch"""
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    
+    db = SessionLocal()
+    try:
+        with tempfile.TemporaryDirectory() as extract_dir:
+            files = collect_statement_files(args.paths, extract_dir)
+            if not files:
+                print("No statement files found")
+                return
+            summary = ImportService(db).import_files(
+                files, auto_categorize=not args.no_categorize, max_workers=args.workers
+            )
+        print(
+            f"Imported {summary['imported_count']} transactions from {summary['file_count']} files "
+            f"({summary['duplicate_count']} duplicates skipped), import_id {summary['import_id']}"
+        )
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    commands.add_parser("migrate", help=migrate.__doc__).set_defaults(func=migrate)
+    commands.add_parser("rebuild-totals", help=rebuild_totals.__doc__).set_defaults(func=rebuild_totals)
+    commands.add_parser("evict-llm-cache", help=evict_llm_cache.__doc__).set_defaults(func=evict_llm_cache)
+    
+    import_parser = commands.add_parser("import", help=import_files.__doc__)
+    import_parser.add_argument("paths", nargs="+", help="CSV/PDF statements, zip archives or directories")
+    import_parser.add_argument("--workers", type=int, default=None, help="Parsing processes (default: CPU count)")
+    import_parser.add_argument("--no-categorize", action="store_true", help="Don't auto-categorize")
+    import_parser.set_defaults(func=import_files)
+    
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming ledger export endpoint
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from geda.core.transaction_service import EXPORT_COLUMNS
+from geda.models import Transaction
+
+@pytest.fixture
+def ledger(db):
+    """Three transactions across two months, one uncategorized"""
+    db.add_all([
+        Transaction(date=datetime(2023, 1, 5), amount=-20.0, description="STARBUCKS", category_id=1,
+                    is_expense=True, source="RBC", hash_id="a"),
+        Transaction(date=datetime(2023, 1, 9), amount=1000.0, description="SALARY",
+                    is_expense=False, source="RBC", hash_id="b"),
+        Transaction(date=datetime(2023, 2, 1), amount=-5.0, description="TIM HORTONS", category_id=1,
+                    is_expense=True, source="CIBC", hash_id="c"),
+    ])
+    db.commit()
+
+def test_ndjson_export_has_one_object_per_row(client, ledger):
+    response = client.get("/api/transactions/export")
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["hash_id"] for row in rows] == ["c", "b", "a"]
+    assert rows[0]["date"] == "2023-02-01T00:00:00"
+    assert rows[0]["category_name"] == "Food & Dining"
+    assert rows[1]["category_name"] is None
+
+def test_csv_export_applies_the_listing_filters(client, ledger):
+    response = client.get(
+        "/api/transactions/export?format=csv&is_expense=true&start_date=2023-01-01&end_date=2023-01-31"
+    )
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(row["description"], row["amount"]) for row in rows] == [("STARBUCKS", "-20.0")]
+
+def test_empty_csv_export_still_has_a_header(client):
+    response = client.get("/api/transactions/export?format=csv")
+    
+    assert response.status_code == 200
+    assert response.text.splitlines() == [",".join(EXPORT_COLUMNS)]
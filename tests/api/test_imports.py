@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for the import endpoints and the writer they insert through
+"""
+
+import json
+import re
+import threading
+
+import pytest
+
+from geda.core.llm_cache import LLMCategoryCache
+from geda.core.llm_client import CompletionBackend, set_completion_backend
+from geda.models import LLMCacheEntry, Transaction
+
+STATEMENT = "Date,Description,Amount\n" + "".join(
+    f"2023-01-{day:02d},MERCHANT {name},-{day}.50\n"
+    for day, name in enumerate(["ALPHA", "BRAVO", "CHARLIE", "DELTA", "ECHO", "FOXTROT"], start=1)
+)
+
+class ThreadRecordingBackend(CompletionBackend):
+    """Fake LLM answering "Travel" for everything and noting which thread asked"""
+    
+    model = "fake-model"
+    
+    def __init__(self):
+        self.threads = []
+    
+    def complete(self, messages, max_tokens):
+        self.threads.append(threading.current_thread().name)
+        numbers = re.findall(r"^(\d+)\. ", messages[-1]["content"], re.MULTILINE)
+        return json.dumps({number: "Travel" for number in numbers})
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    backend = ThreadRecordingBackend()
+    set_completion_backend(backend)
+    monkeypatch.setattr("geda.core.categorizer.llm_cache", LLMCategoryCache())
+    yield backend
+    set_completion_backend(None)
+
+@pytest.fixture
+def writer_jobs(writer, monkeypatch):
+    """Writer jobs, recorded as they are queued"""
+    jobs = []
+    submit = writer.submit
+    monkeypatch.setattr(writer, "submit", lambda work: jobs.append(work) or submit(work))
+    return jobs
+
+@pytest.mark.parametrize("url", ["/api/imports/file", "/api/imports/file/chunked"])
+def test_file_import_categorizes_outside_the_writer(db, client, fake_llm, writer_jobs, url):
+    response = client.post(url, files={"file": ("statement.csv", STATEMENT)})
+    
+    assert response.status_code == 200
+    assert fake_llm.threads and "db-writer" not in fake_llm.threads
+    db.rollback()  # Read past the snapshot taken before the writer committed
+    # The LLM's answers are stored along with the rows
+    assert db.query(LLMCacheEntry).count() == 6
+    assert {t.category.name for t in db.query(Transaction)} == {"Travel"}
+    # /file inserts and records the file in one job; /file/chunked adds one for the record
+    assert len(writer_jobs) == (1 if url.endswith("/file") else 2)
+
+def test_confirm_inserts_through_the_writer(db, client, fake_llm):
+    preview = client.post("/api/imports/preview", files={"file": ("statement.csv", STATEMENT)}).json()
+    
+    response = client.post("/api/imports/confirm", json={"import_id": preview["import_id"]})
+    
+    assert response.status_code == 200
+    assert len(response.json()) == 6
+    assert "db-writer" not in fake_llm.threads
+    db.rollback()
+    assert db.query(Transaction).filter(Transaction.import_id == preview["import_id"]).count() == 6
+    
+    # Importing the same file again finds every row
+    again = client.post("/api/imports/file", files={"file": ("statement.csv", STATEMENT)})
+    assert again.json() == []
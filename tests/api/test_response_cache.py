@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for ETag caching of the stats and category endpoints
+"""
+
+from datetime import datetime
+
+import pytest
+
+from sqlalchemy import update
+
+from geda.core import TransactionService
+from geda.db import data_version
+
+@pytest.mark.parametrize("url", [
+    "/api/categories/",
+    "/api/transactions/stats/by-category?start_date=2023-01-01&end_date=2023-01-31",
+    "/api/transactions/stats/income-by-category",
+    "/api/transactions/stats/trends?num_periods=3",
+])
+def test_unchanged_data_is_served_from_the_version_row(async_engine, client, record_statements, url):
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    
+    statements = record_statements(async_engine.sync_engine)
+    repeat = client.get(url)
+    revalidated = client.get(url, headers={"If-None-Match": etag})
+    
+    # Only the data version is read
+    assert len(statements) == 2
+    assert all("FROM data_version" in statement for statement in statements)
+    assert repeat.content == first.content
+    assert repeat.headers["etag"] == etag
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+
+def test_writes_change_the_etag(db, client):
+    url = "/api/transactions/stats/by-category?start_date=2023-01-01&end_date=2023-01-31"
+    before = client.get(url)
+    assert before.json() == []
+    
+    TransactionService(db).create_transaction({
+        "date": datetime(2023, 1, 5), "amount": -20.0, "description": "STARBUCKS", "is_expense": True
+    })
+    after = client.get(url, headers={"If-None-Match": before.headers["etag"]})
+    
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    assert after.json() == [{"category_id": 1, "category_name": "Food & Dining", "total": 20.0}]
+
+def test_writes_from_other_processes_change_the_etag(db, client):
+    """The version lives in the database, so a write no session here saw still counts"""
+    url = "/api/categories/"
+    before = client.get(url)
+    
+    # What another worker or manage.py committing a write leaves behind
+    with db.get_bind().begin() as connection:
+        connection.execute(update(data_version).values(version=data_version.c.version + 1))
+    after = client.get(url, headers={"If-None-Match": before.headers["etag"]})
+    
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming uploads to disk
+"""
+
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from starlette.datastructures import UploadFile
+
+from geda.api import uploads
+from geda.api.uploads import save_upload, reject_oversized_requests
+
+CONTENT = b"Date,Description,Amount\n" + b"2023-01-05,STARBUCKS,-4.50\n" * 1000
+
+def test_upload_is_copied_in_chunks_and_hashed(monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_CHUNK_BYTES", 1024)
+    reads = []
+    source = io.BytesIO(CONTENT)
+    read = source.read
+    source.read = lambda size=-1: reads.append(size) or read(size)
+    
+    saved = save_upload(UploadFile(source, filename="statement.csv"))
+    try:
+        with open(saved.path, "rb") as f:
+            assert f.read() == CONTENT
+        assert saved.path.endswith(".csv")
+        assert saved.sha256 == hashlib.sha256(CONTENT).hexdigest()
+        assert saved.size == len(CONTENT)
+        assert set(reads) == {1024}
+    finally:
+        os.unlink(saved.path)
+
+@pytest.mark.parametrize("declared_size", [len(CONTENT), None])
+def test_oversized_upload_is_refused_without_leaving_a_file(tmp_path, declared_size):
+    path = str(tmp_path / "statement.csv")
+    upload = UploadFile(io.BytesIO(CONTENT), size=declared_size, filename="statement.csv")
+    
+    with pytest.raises(HTTPException) as error:
+        save_upload(upload, path, max_bytes=len(CONTENT) - 1)
+    
+    assert error.value.status_code == 413
+    assert not os.path.exists(path)
+
+def test_oversized_request_is_refused_before_its_body_is_read(monkeypatch):
+    monkeypatch.setattr(uploads, "MAX_UPLOAD_BYTES", 100)
+    app = FastAPI()
+    app.middleware("http")(reject_oversized_requests)
+    
+    @app.post("/upload")
+    async def upload():
+        raise AssertionError("route should not run")
+    
+    response = TestClient(app).post("/upload", content=CONTENT)
+    
+    assert response.status_code == 413
@@ -0,0 +1,83 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+
+from geda.api.routes import api_router
+from geda.db import Base, get_db, get_async_db, get_writer
+from geda.db.async_session import create_async_db_engine
+from geda.db.session import create_db_engine
+from geda.db.writer import DatabaseWriter, READ_ONLY
+from geda.core import CategoryService, RuleService
+
+@pytest.fixture
+def db_url(tmp_path):
+    """URL of a fresh database file that other engines (e.g. async ones) can open too"""
+    return f"sqlite:///{tmp_path / 'geda.db'}"
+
+@pytest.fixture
+def db(db_url):
+    """Session on a fresh database with the default categories and rules"""
+    engine = create_db_engine(db_url)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+    CategoryService(session).create_default_categories()
+    RuleService(session).create_default_rules()
+
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def async_engine(db, db_url):
+    """Async engine on the test database"""
+    engine = create_async_db_engine(db_url)
+    yield engine
+    engine.sync_engine.dispose()
+
+@pytest.fixture
+def writer(db):
+    """The writer API writes to the test database go through"""
+    writer = DatabaseWriter(db.get_bind())
+    yield writer
+    writer.shutdown()
+
+@pytest.fixture
+def client(db, async_engine, writer):
+    """API client running against the test database"""
+    app = FastAPI()
+    app.include_router(api_router, prefix="/api")
+    
+    async def get_test_async_db():
+        async with AsyncSession(async_engine) as session:
+            yield session
+    def get_test_db():
+        session = Session(db.get_bind(), info={READ_ONLY: True})
+        try:
+            yield session
+        finally:
+            session.close()
+    app.dependency_overrides[get_db] = get_test_db
+    app.dependency_overrides[get_async_db] = get_test_async_db
+    app.dependency_overrides[get_writer] = lambda: writer
+    
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def record_statements():
+    """Start collecting the SQL statements an engine executes"""
+    def record(engine):
+        statements = []
+        event.listen(
+            engine, "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+        return statements
+    return record
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Tests for transaction categorization
+"""
+
+import json
+import re
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from geda.core import TransactionCategorizer, TransactionService, RuleService, CategoryService
+from geda.core.llm_cache import LLMCategoryCache, normalize_description
+from geda.core.llm_client import CompletionBackend, set_completion_backend
+from geda.core.neighbour_model import NeighbourModel
+from geda.db.session import create_db_engine
+from geda.models import LLMCacheEntry
+
+def new_transaction(description):
+    return {"date": datetime(2023, 1, 1), "amount": -12.5, "description": description}
+
+def test_manual_transaction_needs_no_rule_query(db, record_statements):
+    """Once the cache is warm, categorizing runs no rule or category query"""
+    service = TransactionService(db)
+    service.create_transaction(new_transaction("WARM UP"))
+    
+    statements = record_statements(db.get_bind())
+    transaction = service.create_transaction(new_transaction("STARBUCKS #123"))
+    lookups = [s for s in statements if "mapping_rules" in s or "FROM categories" in s]
+    
+    assert lookups == []
+    assert transaction.category.name == "Food & Dining"
+
+def test_rule_changes_invalidate_the_cache(db):
+    """New rules apply to the very next transaction"""
+    service = TransactionService(db)
+    assert service.create_transaction(new_transaction("GYM MEMBERSHIP")).category.name == "Uncategorized"
+    
+    health = CategoryService(db).get_category_by_name("Health & Fitness")
+    RuleService(db).create_rule({"pattern": "gym", "category_id": health.id})
+    
+    assert service.create_transaction(new_transaction("GYM MEMBERSHIP")).category.name == "Health & Fitness"
+
+def test_rule_changes_from_another_process_invalidate_the_cache(db, db_url):
+    """Rules added through another engine (e.g. manage.py) apply here too"""
+    service = TransactionService(db)
+    assert service.create_transaction(new_transaction("GYM MEMBERSHIP")).category.name == "Uncategorized"
+    
+    other_engine = create_db_engine(db_url)
+    with Session(other_engine) as other:
+        health = CategoryService(other).get_category_by_name("Health & Fitness")
+        RuleService(other).create_rule({"pattern": "gym", "category_id": health.id})
+    other_engine.dispose()
+    
+    db.rollback()  # Read past the snapshot taken before the other engine committed
+    assert service.create_transaction(new_transaction("GYM MEMBERSHIP")).category.name == "Health & Fitness"
+
+def test_normalize_description():
+    """Store numbers, dates, card suffixes and spacing don't split merchants"""
+    assert normalize_description("STARBUCKS #1234 01/15") == "starbucks"
+    assert normalize_description("Starbucks   No. 987") == "starbucks"
+    assert normalize_description("SHELL 2023-03-04 VISA XXXX1234") == "shell visa"
+    assert normalize_description("7-ELEVEN JAN 5") == "7-eleven"
+    assert normalize_description("1234") == "1234"
+
+class FakeCompletionBackend(CompletionBackend):
+    """Local stand-in for the LLM that answers "Travel" for everything"""
+    
+    def __init__(self, model="fake-model", failures=0):
+        self.model = model
+        self.failures = failures
+        self.calls = []
+    
+    def complete(self, messages, max_tokens):
+        self.calls.append(messages)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("rate limited")
+        
+        numbers = re.findall(r"^(\d+)\. ", messages[-1]["content"], re.MULTILINE)
+        return "Sure:\n" + json.dumps({number: "Travel" for number in numbers})
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Route LLM calls to a fake backend with an empty LLM cache"""
+    backend = FakeCompletionBackend()
+    set_completion_backend(backend)
+    monkeypatch.setattr("geda.core.categorizer.llm_cache", LLMCategoryCache())
+    monkeypatch.setenv("LLM_RETRY_BACKOFF", "0")
+    yield backend
+    set_completion_backend(None)
+
+def test_llm_answers_are_persisted_per_model(db, fake_llm, monkeypatch):
+    """Cached answers survive a new cache instance but not a model change"""
+    service = TransactionService(db)
+    service.create_transaction(new_transaction("AIR CANADA #123"))
+    service.create_transaction(new_transaction("AIR CANADA #456"))
+    assert len(fake_llm.calls) == 1
+    
+    # A fresh cache (e.g. after a restart) reads the answer back from the database
+    fresh_cache = LLMCategoryCache()
+    monkeypatch.setattr("geda.core.categorizer.llm_cache", fresh_cache)
+    assert service.create_transaction(new_transaction("Air Canada 789")).category.name == "Travel"
+    assert len(fake_llm.calls) == 1
+    assert fresh_cache.stats()["hits"] == 1
+    
+    # Answers from another model are not reused
+    assert fresh_cache.get(db, "AIR CANADA #123", "another-model") is None
+
+def test_import_batches_unique_merchants(db, fake_llm, monkeypatch):
+    """2,000 rows with 300 merchants need one request per 50 merchants"""
+    monkeypatch.setenv("LLM_BATCH_SIZE", "50")
+    items = [(f"MERCHANT{i % 300:03d}X #{i}", "RBC", -10.0) for i in range(2000)]
+    
+    category_ids = TransactionCategorizer(db).suggest_category_ids(items)
+    
+    travel = CategoryService(db).get_category_by_name("Travel")
+    assert category_ids == [travel.id] * 2000
+    assert len(fake_llm.calls) == 6
+    # The category list is sent once per request, not once per transaction
+    assert all(call[-1]["content"].count("Uncategorized") == 1 for call in fake_llm.calls)
+
+def test_llm_requests_are_retried(db, fake_llm):
+    """Transient backend errors are retried before giving up"""
+    fake_llm.failures = 2
+    
+    transaction = TransactionService(db).create_transaction(new_transaction("WESTJET"))
+    
+    assert transaction.category.name == "Travel"
+    assert len(fake_llm.calls) == 3
+
+def test_llm_cache_ttl_and_lru_bound(db):
+    """Expired entries are misses and the memory front stays bounded"""
+    cache = LLMCategoryCache(max_entries=2, ttl=timedelta(days=1))
+    for name in ["a", "b", "c"]:
+        cache.set(db, name, "model", 1)
+    db.commit()
+    assert cache.stats()["memory_entries"] == 2
+    
+    db.query(LLMCacheEntry).filter(LLMCacheEntry.normalized_description == "a").update(
+        {"created_at": datetime.utcnow() - timedelta(days=2)}
+    )
+    db.commit()
+    
+    assert cache.get(db, "a", "model") is None
+    assert cache.get(db, "c", "model") == 1
+    assert cache.evict_expired(db) == 1
+    assert cache.stats() == {"hits": 1, "misses": 1, "memory_entries": 2}
+
+def test_neighbour_model_predicts_similar_descriptions(tmp_path):
+    """Close descriptions get the neighbours' category; unrelated ones get nothing"""
+    model = NeighbourModel(path=str(tmp_path / "model.json"))
+    for description, category_id in [("NETFLIX.COM", 1), ("AIR CANADA", 2), ("WESTJET AIRLINES", 2), ("LOBLAWS", 3)]:
+        model.learn(description, category_id)
+    
+    assert model.predict("Netflix.com #4411")[0] == 1
+    assert model.predict("AIR CANADA ROUGE")[0] == 2
+    assert model.predict("HYDRO ONE") is None
+    
+    # Corrections move the example to the new category
+    model.unlearn("LOBLAWS", 3)
+    model.learn("LOBLAWS", 4)
+    assert model.predict("LOBLAWS") == (4, 1.0)
+    
+    # The examples survive a restart
+    model.save()
+    restored = NeighbourModel(path=model.path)
+    assert restored.load()
+    assert len(restored) == 4
+    assert restored.predict("AIR CANADA ROUGE") == model.predict("AIR CANADA ROUGE")
+
+def test_neighbour_model_batches_saves(tmp_path):
+    """A burst of learns is written once, and concurrent saves never clash"""
+    model = NeighbourModel(path=str(tmp_path / "model.json"), save_delay=60)
+    for name in ["ALPHA", "BRAVO", "CHARLIE", "DELTA", "ECHO"] * 10:
+        model.learn(f"SHOP {name}", 1)
+        model.schedule_save()
+    assert not (tmp_path / "model.json").exists()
+    
+    threads = [threading.Thread(target=model.flush) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert [p.name for p in tmp_path.iterdir()] == ["model.json"]
+    assert json.loads((tmp_path / "model.json").read_text())["examples"]["shop alpha"] == {"1": 10}
+
+def test_deleted_transaction_is_unlearned(db):
+    """Deleting a user-categorized transaction removes its example"""
+    service = TransactionService(db)
+    entertainment = CategoryService(db).get_category_by_name("Entertainment")
+    neighbours = service.categorizer.neighbours
+    transaction = service.create_transaction({**new_transaction("CINEPLEX ODEON"), "category_id": entertainment.id})
+    assert neighbours.predict("CINEPLEX ODEON") == (entertainment.id, 1.0)
+    
+    service.delete_transaction(transaction.id)
+    
+    assert neighbours.predict("CINEPLEX ODEON") is None
+
+def test_user_categories_replace_llm_calls(db, fake_llm):
+    """A category picked by the user is reused for similar descriptions"""
+    service = TransactionService(db)
+    entertainment = CategoryService(db).get_category_by_name("Entertainment")
+    service.create_transaction({**new_transaction("CINEPLEX ODEON"), "category_id": entertainment.id})
+    
+    transaction = service.create_transaction(new_transaction("CINEPLEX ODEON YONGE"))
+    
+    assert transaction.category_id == entertainment.id
+    assert fake_llm.calls == []
+
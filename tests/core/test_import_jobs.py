@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests for background import jobs
+"""
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from geda.core.import_jobs import ImportJobManager
+from geda.models import ImportJob, Transaction
+
+@pytest.fixture
+def manager(db, writer, tmp_path):
+    """Job manager whose workers use the test database"""
+    manager = ImportJobManager(
+        sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind()),
+        writer,
+        max_workers=1,
+        upload_dir=str(tmp_path / "uploads"),
+    )
+    yield manager
+    manager.shutdown()
+
+def write_statement(tmp_path, num_rows, name="statement.csv"):
+    lines = ["Date,Description,Amount"]
+    for row in range(1, num_rows + 1):
+        lines.append(f"2023-01-{row % 28 + 1:02d},STARBUCKS COFFEE,-{row}.50")
+    path = tmp_path / name
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+def test_job_imports_file_and_reports_progress(db, writer, manager, tmp_path):
+    job = manager.submit(write_statement(tmp_path, 12), "statement.csv", auto_categorize=False)
+    assert job.rows_total == 12
+    
+    manager.wait(job.id, timeout=30)
+    db.rollback()  # Read past the snapshot taken before the job committed
+    job = db.get(ImportJob, job.id)
+    
+    assert job.status == "completed"
+    assert job.stage == "done"
+    assert (job.rows_processed, job.imported_count, job.duplicate_count) == (12, 12, 0)
+    assert db.query(Transaction).filter(Transaction.import_id == job.import_id).count() == 12
+    # The upload is removed once the job's end is committed
+    writer.run(lambda writer_db: None)
+    assert not os.path.exists(job.file_path)
+
+def test_submit_keeps_no_upload_when_the_job_row_fails(manager, tmp_path, monkeypatch):
+    def fail(work):
+        raise RuntimeError("database is locked")
+    monkeypatch.setattr(manager.writer, "run", fail)
+    
+    with pytest.raises(RuntimeError):
+        manager.submit(write_statement(tmp_path, 3), "statement.csv")
+    
+    assert os.listdir(manager.upload_dir) == []
+
+def test_failed_job_records_error(db, manager, tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("not a statement")
+    
+    job = manager.submit(str(path), "notes.txt")
+    manager.wait(job.id, timeout=30)
+    db.rollback()  # Read past the snapshot taken before the job committed
+    job = db.get(ImportJob, job.id)
+    
+    assert job.status == "failed"
+    assert job.error
+
+def test_cancel_queued_job(db, manager, tmp_path):
+    path = write_statement(tmp_path, 3)
+    job = ImportJob(id="queued-job", filename="statement.csv", file_path=path)
+    db.add(job)
+    db.commit()
+    
+    manager.cancel(db, job.id)
+    
+    assert job.status == "cancelled"
+    assert not os.path.exists(path)
+    assert db.query(Transaction).count() == 0
+
+def test_cancelled_upload_is_kept_until_the_batch_commits(db, writer, manager, tmp_path):
+    path = write_statement(tmp_path, 3)
+    db.add(ImportJob(id="queued-job", filename="statement.csv", file_path=path))
+    db.commit()
+    
+    exists_before_commit = []
+    def cancel(writer_db):
+        manager.cancel(writer_db, "queued-job")
+        exists_before_commit.append(os.path.exists(path))
+    writer.run(cancel)
+    writer.run(lambda writer_db: None)  # Let the batch's after-commit callbacks finish
+    
+    assert exists_before_commit == [True]
+    assert not os.path.exists(path)
+
+def test_resume_pending_restarts_interrupted_jobs(db, manager, tmp_path):
+    """A job left running by a previous process is imported again"""
+    job = ImportJob(
+        id="interrupted-job",
+        filename="statement.csv",
+        file_path=write_statement(tmp_path, 5),
+        status="running",
+        stage="importing",
+        rows_processed=2,
+    )
+    db.add(job)
+    db.commit()
+    
+    assert manager.resume_pending() == [job.id]
+    manager.wait(job.id, timeout=30)
+    db.rollback()  # Read past the snapshot taken before the job committed
+    db.refresh(job)
+    
+    assert job.status == "completed"
+    assert job.imported_count == 5
+
+def test_eta_from_processing_rate():
+    job = ImportJob(
+        status="running",
+        started_at=datetime.utcnow() - timedelta(seconds=10),
+        rows_total=300,
+        rows_processed=100,
+    )
+    assert job.eta_seconds == pytest.approx(20, abs=1)
+    
+    job.status = "completed"
+    assert job.eta_seconds is None
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Tests for importing files through ImportService
+"""
+
+import os
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from geda.core import ImportService
+from geda.core import batch_import
+from geda.core.batch_import import collect_statement_files
+from geda.core.import_service import STAGED_PREVIEW_TTL
+from geda.db.writer import READ_ONLY
+from geda.models import Transaction, StagedTransaction, ImportedFile
+from geda.parsers import ParserFactory
+from geda.parsers.pdf_tables import file_digest
+
+def write_statement(tmp_path, num_rows, repeat_first=False):
+    """Write a generic CSV statement with a different amount on every row"""
+    lines = ["Date,Description,Amount"]
+    for row in range(1, num_rows + 1):
+        lines.append(f"2023-01-{row % 28 + 1:02d},STARBUCKS COFFEE,-{row}.50")
+    if repeat_first:
+        lines.append(lines[1])
+    path = tmp_path / f"statement_{num_rows}.csv"
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+def test_import_in_chunks(db, tmp_path):
+    """Every chunk is committed and repeated rows are reported as duplicates"""
+    path = write_statement(tmp_path, 12, repeat_first=True)
+    service = ImportService(db)
+
+    summary = service.import_from_file_in_chunks(path, chunk_size=5)
+
+    assert summary["imported_count"] == 12
+    assert summary["duplicate_count"] == 1
+    assert db.query(Transaction).filter(Transaction.import_id == summary["import_id"]).count() == 12
+    assert db.query(Transaction).filter(Transaction.category_id == None).count() == 0
+
+def test_reimport_in_chunks_skips_everything(db, tmp_path):
+    """Re-importing the same file inserts nothing"""
+    path = write_statement(tmp_path, 7)
+    service = ImportService(db)
+
+    service.import_from_file_in_chunks(path, chunk_size=3)
+    summary = service.import_from_file_in_chunks(path, chunk_size=3)
+
+    assert summary["imported_count"] == 0
+    assert summary["duplicate_count"] == 7
+    assert db.query(Transaction).count() == 7
+
+def test_import_from_file_drops_repeated_rows(db, tmp_path):
+    """Rows repeated within one file are imported once"""
+    path = write_statement(tmp_path, 4, repeat_first=True)
+
+    imported = ImportService(db).import_from_file(path)
+
+    assert len(imported) == 4
+    assert all(t.id is not None for t in imported)
+
+def test_preview_finds_duplicates_across_lookup_batches(db, tmp_path):
+    """Duplicate detection spans more hashes than fit in one IN (...) query"""
+    service = ImportService(db)
+    service.import_from_file(write_statement(tmp_path, 600), auto_categorize=False)
+
+    transactions, duplicates, _ = service.preview_import(write_statement(tmp_path, 1200))
+
+    assert len(transactions) == 1200
+    assert len(duplicates) == 600
+    assert {t["hash_id"] for t in duplicates} == {t.hash_id for t in db.query(Transaction)}
+
+def test_bulk_import_categorizes_and_skips_conflicts(db, tmp_path):
+    """Rows are categorized before insert and existing hashes are ignored"""
+    service = ImportService(db)
+    transactions, _, _ = service.preview_import(write_statement(tmp_path, 3))
+
+    first_ids = service.bulk_import_transactions(transactions[:2])
+    # Overlaps the first call, as a concurrent import of the same file would
+    second_ids = service.bulk_import_transactions(transactions)
+
+    assert len(first_ids) == 2
+    assert len(second_ids) == 1
+    categories = {t.category.name for t in db.query(Transaction)}
+    assert categories == {"Food & Dining"}
+
+def test_import_transactions_returns_the_inserted_rows(db, tmp_path):
+    """The ORM-returning wrapper goes through the same bulk insert"""
+    service = ImportService(db)
+    transactions, _, _ = service.preview_import(write_statement(tmp_path, 3))
+    service.bulk_import_transactions(transactions[:1])
+    
+    imported = service.import_transactions(transactions)
+    
+    assert [t.amount for t in imported] == [-2.5, -3.5]
+    assert {t.category.name for t in imported} == {"Food & Dining"}
+
+def test_confirm_imports_staged_preview(db, tmp_path):
+    """Confirming imports the selected staged rows once, without the file"""
+    path = write_statement(tmp_path, 5)
+    service = ImportService(db)
+    transactions, _, import_id = service.preview_import(path)
+    os.unlink(path)
+
+    imported = service.confirm_import(import_id, [0, 2, 4])
+
+    assert [t.hash_id for t in imported] == [transactions[i]["hash_id"] for i in (0, 2, 4)]
+    assert all(t.import_id == import_id for t in imported)
+    assert db.query(StagedTransaction).count() == 0
+    assert service.confirm_import(import_id) is None
+
+def test_expired_previews_are_purged(db, tmp_path):
+    """Previews older than the TTL can't be confirmed and are deleted"""
+    service = ImportService(db)
+    _, _, import_id = service.preview_import(write_statement(tmp_path, 3))
+    db.query(StagedTransaction).update({
+        StagedTransaction.created_at: datetime.utcnow() - STAGED_PREVIEW_TTL - timedelta(minutes=1)
+    })
+    db.commit()
+
+    assert service.confirm_import(import_id) is None
+    assert service.purge_expired_previews() == 3
+    assert db.query(Transaction).count() == 0
+
+def test_import_files_dedupes_across_files(db, tmp_path):
+    """Files parsed in worker processes are merged and imported once"""
+    first = write_statement(tmp_path, 4)
+    second = write_statement(tmp_path, 6)  # Repeats the first file's rows
+    service = ImportService(db)
+
+    summary = service.import_files([first, second], auto_categorize=False, max_workers=2)
+
+    assert summary["file_count"] == 2
+    assert summary["imported_count"] == 6
+    assert summary["duplicate_count"] == 4
+    assert db.query(Transaction).filter(Transaction.import_id == summary["import_id"]).count() == 6
+
+def test_collect_statement_files_expands_zips_and_directories(tmp_path):
+    """Zip archives are extracted and directories searched for statements"""
+    statements = tmp_path / "statements"
+    statements.mkdir()
+    write_statement(statements, 2)
+    (statements / "notes.txt").write_text("not a statement")
+    archive = tmp_path / "more.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.write(write_statement(tmp_path, 3), "march/statement_3.csv")
+    extract_dir = tmp_path / "extracted"
+
+    files = collect_statement_files([str(statements), str(archive)], str(extract_dir))
+
+    assert [os.path.basename(f) for f in files] == ["statement_2.csv", "statement_3.csv"]
+    assert files[1].startswith(str(extract_dir))
+
+def test_reimporting_a_file_is_answered_from_its_record(db, tmp_path, monkeypatch):
+    """An identical file isn't parsed again and imports nothing"""
+    path = write_statement(tmp_path, 5)
+    service = ImportService(db)
+    first = service.import_from_file(path, auto_categorize=False)
+    record = db.query(ImportedFile).one()
+    
+    def refuse(*args):
+        raise AssertionError("file parsed again")
+    monkeypatch.setattr(ParserFactory, "get_parser", refuse)
+    
+    assert service.import_from_file(path) == []
+    summary = service.import_from_file_in_chunks(path)
+    
+    assert (record.row_count, record.import_id) == (5, first[0].import_id)
+    assert (record.first_date, record.last_date) == (datetime(2023, 1, 2), datetime(2023, 1, 6))
+    assert summary == {"import_id": record.import_id, "imported_count": 0, "duplicate_count": 5}
+
+def test_only_a_fully_confirmed_preview_records_its_file(db, tmp_path):
+    """Confirming part of a preview leaves the file importable"""
+    path = write_statement(tmp_path, 4)
+    service = ImportService(db)
+    
+    _, _, import_id = service.preview_import(path)
+    service.confirm_import(import_id, [0])
+    assert service.find_imported_file(file_digest(path)) is None
+    
+    _, _, import_id = service.preview_import(path)
+    service.confirm_import(import_id)
+    assert service.find_imported_file(file_digest(path)).import_id == import_id
+
+def test_import_files_skips_files_imported_before(db, tmp_path):
+    """Known files count as duplicates without being parsed"""
+    first = write_statement(tmp_path, 4)
+    second = write_statement(tmp_path, 6)
+    service = ImportService(db)
+    service.import_from_file(first, auto_categorize=False)
+    
+    summary = service.import_files([first, second], auto_categorize=False, max_workers=1)
+    
+    assert summary["file_count"] == 2
+    assert summary["imported_count"] == 2
+    assert summary["duplicate_count"] == 8
+    assert service.find_imported_file(file_digest(second)).import_id == summary["import_id"]
+
+def test_chunks_commit_one_writer_job_at_a_time(db, writer, tmp_path):
+    """With a writer, each chunk is visible to other connections as soon as it is done"""
+    visible = []
+    def count_committed_rows(summary):
+        with db.get_bind().connect() as connection:
+            visible.append((summary["rows_processed"], connection.execute(text("SELECT COUNT(*) FROM transactions")).scalar()))
+    
+    reader = Session(db.get_bind(), info={READ_ONLY: True})
+    ImportService(reader, writer).import_from_file_in_chunks(
+        write_statement(tmp_path, 12), auto_categorize=False, chunk_size=5, on_chunk=count_committed_rows
+    )
+    reader.close()
+    
+    assert visible == [(5, 5), (10, 10), (12, 12)]
+
+def test_overlapping_file_only_categorizes_new_rows(db, tmp_path, monkeypatch):
+    """Rows already imported from an overlapping file never reach the categorizer"""
+    service = ImportService(db)
+    service.import_from_file(write_statement(tmp_path, 4), auto_categorize=False)  # Jan 2-5
+    
+    categorized = []
+    suggest_category_ids = service.categorizer.suggest_category_ids
+    def record_suggestions(items):
+        categorized.extend(items)
+        return suggest_category_ids(items)
+    monkeypatch.setattr(service.categorizer, "suggest_category_ids", record_suggestions)
+    
+    summary = service.import_from_file_in_chunks(write_statement(tmp_path, 10))  # Jan 2-11
+    
+    assert len(categorized) == 6
+    assert (summary["imported_count"], summary["duplicate_count"]) == (6, 4)
+    assert db.query(Transaction).count() == 10
+
+def test_batch_import_commits_once(db, tmp_path, monkeypatch):
+    """A batch whose file records can't be stored leaves no rows behind"""
+    service = ImportService(db)
+    parsed = [ParserFactory.get_parser(path).parse(path) for path in (write_statement(tmp_path, 3),)]
+    def fail(*args):
+        raise RuntimeError("disk full")
+    monkeypatch.setattr(service, "_record_file", fail)
+    
+    with pytest.raises(RuntimeError):
+        service.import_parsed_files(parsed, auto_categorize=False, digests=["abc"])
+    db.rollback()
+    
+    assert db.query(Transaction).count() == 0
+
+def test_collect_statement_files_refuses_unsafe_archives(tmp_path, monkeypatch):
+    """Members outside the archive, or archives too large once extracted, are refused"""
+    escaping = tmp_path / "escaping.zip"
+    with zipfile.ZipFile(escaping, "w") as zf:
+        zf.writestr("../outside.csv", "Date,Description,Amount\n")
+    bomb = tmp_path / "bomb.zip"
+    with zipfile.ZipFile(bomb, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("big.csv", b"0" * 10000)
+    monkeypatch.setattr(batch_import, "MAX_EXTRACTED_BYTES", 5000)
+    
+    for archive in (escaping, bomb):
+        with pytest.raises(ValueError):
+            collect_statement_files([str(archive)], str(tmp_path / "extracted"))
+    assert not (tmp_path / "outside.csv").exists()
+    assert not (tmp_path / "extracted").exists()
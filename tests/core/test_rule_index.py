@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled mapping rule index
+"""
+
+import random
+import re
+from types import SimpleNamespace
+
+from geda.core.rule_index import RuleIndex
+
+def make_rule(rule_id, pattern, category_id, source=None, is_regex=0, priority=1):
+    """Build a stand-in for a MappingRule row"""
+    return SimpleNamespace(
+        id=rule_id, pattern=pattern, category_id=category_id,
+        source=source, is_regex=is_regex, priority=priority,
+    )
+
+def naive_match(rules, description, source):
+    """Reference implementation: try every rule in priority order"""
+    ordered = sorted(rules, key=lambda r: (-r.priority, r.id))
+    for group in ([r for r in ordered if r.source == source], [r for r in ordered if r.source is None]):
+        for rule in group:
+            if rule.is_regex:
+                if re.search(rule.pattern, description, re.IGNORECASE):
+                    return rule.category_id
+            elif rule.pattern.lower() in description.lower():
+                return rule.category_id
+    return None
+
+def test_priority_and_overlapping_patterns():
+    """The highest-priority match wins even when patterns overlap"""
+    rules = [
+        make_rule(1, "UBER(?!\\s+EATS)", 10, is_regex=1, priority=3),
+        make_rule(2, "UBER EATS", 20, priority=3),
+        make_rule(3, "EATS", 30, priority=2),
+        make_rule(4, "eats", 40, priority=5, source="RBC"),
+    ]
+    index = RuleIndex(rules)
+    
+    assert index.match("UBER TRIP 1234", "CIBC") == 10
+    assert index.match("Uber Eats Toronto", "CIBC") == 20
+    assert index.match("SKIP THE DISHES EATS", "CIBC") == 30
+    assert index.match("Uber Eats Toronto", "RBC") == 40
+    assert index.match("NETFLIX", "RBC") is None
+
+def test_invalid_regex_is_skipped():
+    """Rules with a broken regex never match"""
+    index = RuleIndex([make_rule(1, "([", 10, is_regex=1), make_rule(2, "(", 20)])
+    
+    assert index.match("A ( B", None) == 20
+
+def test_matches_naive_scan():
+    """The index agrees with checking every rule in order"""
+    rng = random.Random(7)
+    words = ["COFFEE", "SHOP", "GAS", "STATION", "UBER", "EATS", "STORE", "ONLINE", "PAY", "MARKET"]
+    sources = [None, None, "RBC", "CIBC"]
+    
+    rules = []
+    for rule_id in range(1, 301):
+        pattern = " ".join(rng.sample(words, rng.randint(1, 2)))
+        if rule_id % 10 == 0:
+            pattern = pattern.replace(" ", "\\s+") + "\\b"
+        rules.append(make_rule(
+            rule_id, pattern, rng.randint(1, 15), source=rng.choice(sources),
+            is_regex=int(rule_id % 10 == 0), priority=rng.randint(1, 4),
+        ))
+    index = RuleIndex(rules)
+    
+    for _ in range(500):
+        description = " ".join(rng.choice(words) for _ in range(rng.randint(1, 5)))
+        source = rng.choice(["RBC", "CIBC", "AMEX"])
+        assert index.match(description, source) == naive_match(rules, description, source)
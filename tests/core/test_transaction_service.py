@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Tests for transaction listing, search and stats
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from geda.core import TransactionService, AsyncTransactionService, CategoryService, ImportService
+from geda.core.daily_totals import DailyTotalsService
+from geda.core.transaction_service import EXPORT_COLUMNS
+from geda.db.async_session import create_async_db_engine
+from geda.db.fts import fts_available
+from geda.models import Transaction, Category, DailyCategoryTotal
+
+def add_transactions(db, count):
+    """Insert count transactions, two per day so dates tie"""
+    start = datetime(2023, 1, 1)
+    db.add_all([
+        Transaction(
+            date=start + timedelta(days=i // 2),
+            amount=-1.0 - i,
+            description=f"SHOP {i}",
+            source="RBC",
+            hash_id=f"hash-{i}",
+        )
+        for i in range(count)
+    ])
+    db.commit()
+
+def test_cursor_pages_cover_every_row_once(db):
+    """Following next_cursor visits all rows in (date, id) descending order"""
+    add_transactions(db, 25)
+    service = TransactionService(db)
+    
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = service.get_transactions_page(limit=10, cursor=cursor)
+        seen.extend(page)
+        if cursor is None:
+            break
+    
+    assert len(seen) == 25
+    assert [(t.date, t.id) for t in seen] == sorted(((t.date, t.id) for t in seen), reverse=True)
+    # The first page matches offset pagination
+    assert seen[:10] == service.get_transactions(skip=0, limit=10)
+
+def test_cursor_pages_are_stable_across_imports(db):
+    """Rows newer than the cursor don't shift the next page"""
+    add_transactions(db, 20)
+    service = TransactionService(db)
+    first, cursor = service.get_transactions_page(limit=10)
+    expected, _ = service.get_transactions_page(limit=10, cursor=cursor)
+    
+    db.add(Transaction(date=datetime(2024, 1, 1), amount=-5.0, description="NEW", source="RBC", hash_id="new"))
+    db.commit()
+    
+    assert service.get_transactions_page(limit=10, cursor=cursor)[0] == expected
+
+def test_invalid_cursor(db):
+    with pytest.raises(ValueError):
+        TransactionService(db).get_transactions_page(cursor="not-a-cursor")
+
+def add_described(db, descriptions):
+    db.add_all([
+        Transaction(date=datetime(2023, 1, 1 + i), amount=-1.0, description=d, source="RBC", hash_id=d)
+        for i, d in enumerate(descriptions)
+    ])
+    db.commit()
+
+def test_search_uses_the_full_text_index(db):
+    """Substring, multi-term and short-term searches match like ILIKE did"""
+    add_described(db, ["STARBUCKS TORONTO", "STARBUCKS OTTAWA", "TIM HORTONS TORONTO", "AB CAFE"])
+    service = TransactionService(db)
+    assert fts_available(db.get_bind())
+    
+    def search(term):
+        return sorted(t.description for t in service.get_transactions(search=term))
+    
+    assert search("bucks") == ["STARBUCKS OTTAWA", "STARBUCKS TORONTO"]
+    assert search("toronto star") == ["STARBUCKS TORONTO"]
+    assert search("ab caf") == ["AB CAFE"]
+    assert search('"') == []
+
+def test_search_index_follows_updates_and_deletes(db):
+    add_described(db, ["NETFLIX", "SPOTIFY"])
+    service = TransactionService(db)
+    netflix, spotify = sorted(service.get_transactions(), key=lambda t: t.description)
+    
+    service.update_transaction(netflix.id, {"description": "DISNEY PLUS"})
+    service.delete_transaction(spotify.id)
+    
+    assert service.get_transactions(search="netflix") == []
+    assert service.get_transactions(search="spotify") == []
+    assert [t.id for t in service.get_transactions(search="disney")] == [netflix.id]
+
+def test_search_ranks_best_matches_first(db):
+    add_described(db, ["PAYMENT THANK YOU", "AMAZON MARKETPLACE PAYMENT", "AMAZON"])
+    
+    results = TransactionService(db).search_transactions("amazon")
+    
+    assert [t.description for t in results] == ["AMAZON", "AMAZON MARKETPLACE PAYMENT"]
+
+def test_spending_trends_in_one_query(db, record_statements):
+    """Totals and top categories per period match a plain Python aggregation"""
+    now = datetime.utcnow()
+    db.add_all([
+        Transaction(
+            date=now - timedelta(days=i * 1.7, hours=1),
+            amount=-float(1 + i % 13),
+            is_expense=True,
+            description=f"SHOP {i}",
+            source="RBC",
+            category_id=None if i % 7 == 0 else 1 + i % 5,
+            hash_id=f"hash-{i}",
+        )
+        for i in range(200)
+    ])
+    db.commit()
+    DailyTotalsService(db).rebuild()
+    names = {c.id: c.name for c in db.query(Category).all()}
+    
+    statements = record_statements(db.get_bind())
+    trends = TransactionService(db).get_spending_trends(num_periods=12, period_days=30)
+    
+    assert len(statements) == 1
+    assert len(trends["periods"]) == 12
+    for age, period in enumerate(reversed(trends["periods"])):
+        # Periods are made of whole days ending today
+        rows = [
+            t for t in db.query(Transaction).all()
+            if (now.date() - t.date.date()).days // 30 == age
+        ]
+        by_category = {}
+        for t in rows:
+            if t.category_id is not None:
+                by_category[t.category_id] = by_category.get(t.category_id, 0) + t.amount
+        # Ties go to the lower category ID
+        top = [
+            (names[category_id], total)
+            for category_id, total in sorted(by_category.items(), key=lambda item: (item[1], item[0]))[:3]
+        ]
+        
+        assert period["total"] == pytest.approx(abs(sum(t.amount for t in rows)))
+        assert [c["name"] for c in period["top_categories"]] == [name for name, _ in top]
+        assert [c["total"] for c in period["top_categories"]] == pytest.approx([abs(total) for _, total in top])
+
+def new_transaction(description):
+    return {"date": datetime(2023, 1, 1), "amount": -12.5, "description": description}
+
+def rollup(db):
+    """daily_category_totals as comparable tuples"""
+    return sorted(
+        (r.day, r.category_id, r.is_expense, round(r.total, 6), r.count)
+        for r in db.query(DailyCategoryTotal).all()
+    )
+
+def test_daily_totals_follow_every_write_path(db, tmp_path):
+    """Incremental rollup updates always equal a full rebuild"""
+    service = TransactionService(db)
+    categories = CategoryService(db)
+    food = categories.get_category_by_name("Food & Dining")
+    gifts = categories.create_category({"name": "Gifts"})
+    
+    first = service.create_transaction({**new_transaction("A"), "category_id": gifts.id})
+    second = service.create_transaction({**new_transaction("B"), "category_id": food.id})
+    service.create_transaction({**new_transaction("C"), "category_id": gifts.id, "date": datetime(2023, 1, 2)})
+    service.update_transaction(second.id, {"amount": -40.0, "date": datetime(2023, 1, 3), "category_id": gifts.id})
+    service.delete_transaction(first.id)
+    
+    csv_path = tmp_path / "statement.csv"
+    csv_path.write_text("Date,Description,Amount\n2023-01-02,SHOP ONE,-5.00\n2023-01-04,SALARY,100.00\n")
+    ImportService(db).import_from_file(str(csv_path))
+    ImportService(db).import_from_file_in_chunks(str(csv_path))
+    csv_path.write_text("Date,Description,Amount\n2023-01-05,SHOP TWO,-7.00\n")
+    ImportService(db).import_from_file_in_chunks(str(csv_path))
+    
+    categories.delete_category(gifts.id, reassign_to_id=food.id)
+    
+    incremental = rollup(db)
+    DailyTotalsService(db).rebuild()
+    assert incremental == rollup(db)
+    assert gifts.id not in {row[1] for row in incremental}
+    
+    spending = service.get_spending_by_category(datetime(2023, 1, 1), datetime(2023, 1, 31))
+    assert {row["category_name"]: row["total"] for row in spending}["Food & Dining"] == pytest.approx(52.5)
+
+def test_deleted_category_totals_become_uncategorized(db):
+    """A category created after a deletion never inherits the deleted one's spending"""
+    service = TransactionService(db)
+    categories = CategoryService(db)
+    gifts = categories.create_category({"name": "Gifts"})
+    service.create_transaction({**new_transaction("FLOWERS"), "amount": -50.0, "category_id": gifts.id})
+    
+    categories.delete_category(gifts.id)
+    pets = categories.create_category({"name": "Pets"})
+    
+    incremental = rollup(db)
+    DailyTotalsService(db).rebuild()
+    assert incremental == rollup(db)
+    spending = service.get_spending_by_category(datetime(2023, 1, 1), datetime(2023, 1, 31))
+    assert pets.name not in {row["category_name"] for row in spending}
+
+def test_async_service_matches_sync_service(db, db_url):
+    """AsyncTransactionService returns the same rows, with categories loaded"""
+    add_transactions(db, 5)
+    db.query(Transaction).update({Transaction.category_id: 1})
+    db.commit()
+    
+    async def read():
+        engine = create_async_db_engine(db_url)
+        try:
+            async with AsyncSession(engine) as session:
+                service = AsyncTransactionService(session)
+                transactions = await service.get_transactions(limit=10)
+                spending = await service.get_spending_by_category()
+                return [(t.id, t.category.name) for t in transactions], spending
+        finally:
+            await engine.dispose()
+    
+    rows, spending = asyncio.run(read())
+    
+    service = TransactionService(db)
+    assert rows == [(t.id, t.category.name) for t in service.get_transactions(limit=10)]
+    assert spending == service.get_spending_by_category()
+
+def test_export_streams_plain_rows_in_batches(db):
+    """Exported rows come in batch_size batches, in listing order, with category names"""
+    add_transactions(db, 7)
+    db.query(Transaction).filter(Transaction.id <= 3).update({Transaction.category_id: 1})
+    db.commit()
+    service = TransactionService(db)
+    
+    batches = list(service.export_transactions(batch_size=3))
+    rows = [dict(zip(EXPORT_COLUMNS, row)) for batch in batches for row in batch]
+    
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert [row["id"] for row in rows] == [t.id for t in service.get_transactions_page(limit=10)[0]]
+    assert {row["id"]: row["category_name"] for row in rows if row["id"] <= 4} == {
+        1: "Food & Dining", 2: "Food & Dining", 3: "Food & Dining", 4: None
+    }
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Schema migrations and query plans of the TransactionService queries
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+
+from geda.core import TransactionService
+from geda.core.daily_totals import DailyTotalsService
+from geda.db import Base
+from geda.db.migrations import MIGRATIONS, run_migrations
+from geda.models import Transaction
+
+INDEXES = {
+    "ix_transactions_date_id",
+    "ix_transactions_expense_date_category_amount",
+    "ix_transactions_category_date",
+    "ix_transactions_source_date",
+}
+
+def query_plans(db, call, verb="SELECT"):
+    """Run call and return the EXPLAIN QUERY PLAN rows of each statement of a kind it issues"""
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(verb):
+            statements.append((statement, parameters))
+    
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        call()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    
+    connection = db.connection().connection.driver_connection
+    return [
+        [row[3] for row in connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+        for statement, parameters in statements
+    ]
+
+def assert_no_transaction_scans(plans):
+    """Every plan reads transactions through an index, never a full table scan"""
+    assert plans
+    for plan in plans:
+        # "SCAN transactions USING INDEX ..." is an ordered index walk that stops at LIMIT
+        assert "SCAN transactions" not in plan, plan
+
+@pytest.fixture
+def ledger(db):
+    """A few hundred transactions spread over a year"""
+    start = datetime(2023, 1, 1)
+    db.add_all([
+        Transaction(
+            date=start + timedelta(days=i % 365),
+            amount=-float(i % 90) if i % 5 else float(i),
+            is_expense=bool(i % 5),
+            description=f"SHOP {i % 40}",
+            source="RBC" if i % 2 else "CIBC",
+            category_id=1 + i % 8,
+            hash_id=f"hash-{i}",
+        )
+        for i in range(500)
+    ])
+    db.commit()
+    db.execute(text("ANALYZE"))
+    return TransactionService(db)
+
+@pytest.mark.parametrize("name, call", [
+    ("listing", lambda s: s.get_transactions(limit=50)),
+    ("listing by category", lambda s: s.get_transactions(category_id=3)),
+    ("listing by date", lambda s: s.get_transactions(start_date=datetime(2023, 6, 1), end_date=datetime(2023, 7, 1))),
+    ("cursor page", lambda s: s.get_transactions_page(limit=20, cursor=s.get_transactions_page(limit=20)[1])),
+    ("spending by category", lambda s: s.get_spending_by_category(datetime(2023, 1, 1), datetime(2023, 3, 1))),
+    ("income by category", lambda s: s.get_income_by_category(datetime(2023, 1, 1), datetime(2023, 3, 1))),
+    ("spending trends", lambda s: s.get_spending_trends(num_periods=3)),
+])
+def test_queries_use_indexes(db, ledger, name, call):
+    assert_no_transaction_scans(query_plans(db, lambda: call(ledger)))
+
+def test_deleting_a_transaction_checks_only_its_rollup_row(db, ledger):
+    """Emptied daily totals are found by key, not by scanning the rollup"""
+    DailyTotalsService(db).rebuild()
+    db.commit()
+    
+    plans = query_plans(db, lambda: ledger.delete_transaction(1), verb="DELETE")
+    
+    rollup_plans = [plan for plan in plans if any("daily_category_totals" in step for step in plan)]
+    assert rollup_plans
+    for plan in rollup_plans:
+        assert "SCAN daily_category_totals" not in plan, plan
+
+def test_migrations_upgrade_an_existing_database():
+    """Indexes are added to tables created before they existed, exactly once"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        for name in INDEXES:
+            connection.execute(text(f"DROP INDEX {name}"))
+    
+    assert run_migrations(engine) == [m.version for m in MIGRATIONS]
+    assert INDEXES <= {index["name"] for index in inspect(engine).get_indexes("transactions")}
+    
+    # Already up to date
+    assert run_migrations(engine) == []
+    engine.dispose()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the serialized database writer and read-only sessions
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import sessionmaker
+
+from geda.db import Base
+from geda.db.session import create_db_engine
+from geda.db.writer import DatabaseWriter, READ_ONLY, after_batch_commit
+from geda.models import Category
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'geda.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def writer(engine):
+    writer = DatabaseWriter(engine)
+    yield writer
+    writer.shutdown()
+
+def add_category(name):
+    def work(db):
+        category = Category(name=name)
+        db.add(category)
+        db.commit()
+        return category
+    return work
+
+def test_concurrent_writes_are_batched_and_isolated(engine, writer):
+    """Queued writes share transactions; a failing one doesn't undo the others"""
+    release = threading.Event()
+    # Holds the writer thread so the next writes queue up behind it
+    blocker = threading.Thread(target=writer.run, args=(lambda db: release.wait(),))
+    blocker.start()
+    
+    names = [f"Category {i}" for i in range(10)] + ["Category 0"]  # The last one is a duplicate
+    with ThreadPoolExecutor(len(names)) as executor:
+        futures = [executor.submit(writer.run, add_category(name)) for name in names]
+        release.set()
+        blocker.join()
+        errors = [f.exception() for f in futures]
+    
+    assert sum(e is not None for e in errors) == 1
+    assert all(f.result().id for f, e in zip(futures, errors) if e is None)
+    
+    db = sessionmaker(bind=engine)()
+    assert db.query(Category).count() == 10
+    db.close()
+
+def test_writes_are_visible_once_run_returns(engine, writer):
+    reader = sessionmaker(bind=engine)(info={READ_ONLY: True})
+    committed = []
+    
+    def work(db):
+        db.add(Category(name="Pets"))
+        db.commit()
+        after_batch_commit(db, lambda: committed.append(True))
+    
+    writer.run(work)
+    
+    assert reader.query(Category).filter(Category.name == "Pets").count() == 1
+    reader.close()
+    # Callbacks run after the futures resolve, before the next batch starts
+    writer.run(lambda db: None)
+    assert committed == [True]
+
+def test_failing_callback_does_not_stop_the_writer(engine, writer):
+    def work(db):
+        db.add(Category(name="Pets"))
+        db.commit()
+        after_batch_commit(db, lambda: 1 / 0)
+        return "done"
+    
+    assert writer.run(work) == "done"
+    assert writer.run(add_category("Travel")).name == "Travel"
+
+def test_read_only_sessions_refuse_writes(engine):
+    reader = sessionmaker(bind=engine)(info={READ_ONLY: True})
+    reader.add(Category(name="Pets"))
+    with pytest.raises(InvalidRequestError):
+        reader.flush()
+    reader.rollback()
+    with pytest.raises(InvalidRequestError):
+        reader.query(Category).delete()
+    reader.close()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the column-wise CSV parsers
+"""
+
+from datetime import datetime
+
+import pytest
+
+from geda.parsers.adapters.rbc_parser import RBCParser
+from geda.parsers.adapters.cibc_parser import CIBCParser
+from geda.parsers.adapters.generic_csv_parser import GenericCSVParser
+
+def write_csv(tmp_path, content):
+    """Write CSV content to a temporary file and return its path"""
+    path = tmp_path / "statement.csv"
+    path.write_text(content)
+    return str(path)
+
+def test_rbc_credit_card(tmp_path):
+    """Debits become expenses, credits become income"""
+    path = write_csv(tmp_path, (
+        "Account Type,Card Number,Transaction Date,Description,Debit,Credit\n"
+        "Visa,4500,01/15/2023,STARBUCKS COFFEE,\"$1,025.99\",\n"
+        "Visa,4500,01/16/2023,REFUND,,$10.00\n"
+    ))
+    parser = RBCParser()
+    transactions = parser.parse(path)
+
+    assert [t["amount"] for t in transactions] == [-1025.99, 10.0]
+    assert [t["is_expense"] for t in transactions] == [True, False]
+    assert transactions[0]["date"] == datetime(2023, 1, 15)
+    assert type(transactions[0]["date"]) is datetime
+    assert transactions[0]["source_id"] == "4500_01/15/2023_STARBUCKS COFFEE"
+    assert transactions[0]["hash_id"] == parser.generate_hash(transactions[0])
+
+def test_rbc_bank_account_memo(tmp_path):
+    """The memo is appended to the description only when present"""
+    path = write_csv(tmp_path, (
+        "Date,Transaction,Name,Memo,Amount\n"
+        "02/01/2023,POS,GROCERY STORE,STORE 12,-45.10\n"
+        "02/02/2023,DEP,PAYROLL,,2500\n"
+    ))
+    transactions = RBCParser().parse(path)
+
+    assert transactions[0]["description"] == "GROCERY STORE - STORE 12"
+    assert transactions[1]["description"] == "PAYROLL"
+    assert transactions[1]["source_id"] == "02/02/2023_DEP_PAYROLL"
+    assert all(t["source"] == "RBC" for t in transactions)
+
+def test_cibc_bank_account(tmp_path):
+    """Withdrawals are negated and take precedence over deposits"""
+    path = write_csv(tmp_path, (
+        "Date,Description,Withdrawal,Deposit\n"
+        "2023/03/01,RENT,1500.00,\n"
+        "2023/03/02,SALARY,,3000.00\n"
+        "2023/03/03,NOTHING,,\n"
+    ))
+    transactions = CIBCParser().parse(path)
+
+    assert [t["amount"] for t in transactions] == [-1500.0, 3000.0, 0.0]
+    assert transactions[2]["is_expense"] is False
+
+def test_generic_mixed_date_formats(tmp_path):
+    """Both supported date formats can appear in the same file"""
+    path = write_csv(tmp_path, (
+        "Date,Description,Amount\n"
+        "2023-01-01,STARBUCKS COFFEE,$25.99\n"
+        "01/02/2023,UBER EATS,-32.50\n"
+    ))
+    transactions = GenericCSVParser().parse(path)
+
+    assert [t["date"] for t in transactions] == [datetime(2023, 1, 1), datetime(2023, 1, 2)]
+    assert transactions[0]["source_id"] == "2023-01-01_STARBUCKS COFFEE_$25.99"
+
+def test_generic_unsupported_date(tmp_path):
+    """Unparseable dates are reported instead of silently dropped"""
+    path = write_csv(tmp_path, "Date,Description,Amount\nJan 5,COFFEE,1.00\n")
+
+    with pytest.raises(ValueError, match="Unsupported date format: Jan 5"):
+        GenericCSVParser().parse(path)
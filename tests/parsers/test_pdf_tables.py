@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for page-level PDF table extraction
+"""
+
+import os
+import time
+from datetime import timedelta
+
+import pandas as pd
+import PyPDF2
+
+from geda.parsers import pdf_tables
+from geda.parsers.pdf_tables import PageTableCache, PDFTableExtractor
+
+def write_pdf(path, num_pages):
+    writer = PyPDF2.PdfWriter()
+    for _ in range(num_pages):
+        writer.add_blank_page(width=612, height=792)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return str(path)
+
+def fake_read_pdf(calls):
+    """Stands in for tabula: one table per page, numbered by page"""
+    def read_pdf(file_path, pages, multiple_tables):
+        calls.append(list(pages))
+        return [pd.DataFrame({"Page": [page]}) for page in pages]
+    return read_pdf
+
+def test_tables_are_extracted_in_one_call_and_cached(tmp_path, monkeypatch):
+    """In-process extraction reads every page at once; a second extraction reads the cache"""
+    calls = []
+    monkeypatch.setattr(pdf_tables.tabula, "read_pdf", fake_read_pdf(calls))
+    
+    extractor = PDFTableExtractor(PageTableCache(str(tmp_path / "cache")), max_workers=1)
+    path = write_pdf(tmp_path / "statement.pdf", 3)
+    
+    tables = extractor.extract(path)
+    assert [t["Page"][0] for t in tables] == [1, 2, 3]
+    assert calls == [[1, 2, 3]]
+    
+    # Same content under another name
+    copy = tmp_path / "copy.pdf"
+    copy.write_bytes(open(path, "rb").read())
+    assert [t["Page"][0] for t in extractor.extract(str(copy))] == [1, 2, 3]
+    assert calls == [[1, 2, 3]]
+
+def test_pages_are_split_into_one_range_per_worker():
+    extractor = PDFTableExtractor(PageTableCache(None), max_workers=2, pages_per_task=2)
+    
+    assert extractor._page_ranges(7) == [[1, 2, 3, 4], [5, 6, 7]]
+    assert extractor._page_ranges(3) == [[1, 2], [3]]
+    assert extractor._page_ranges(1) == [[1]]
+
+def test_cache_drops_expired_and_least_recently_used_entries(tmp_path):
+    cache = PageTableCache(str(tmp_path), max_bytes=10 ** 9, ttl=timedelta(days=1))
+    table = [pd.DataFrame({"Amount": range(100)})]
+    for i, digest in enumerate(["old", "stale", "recent"]):
+        cache.put(digest, [1], table)
+        used = time.time() - [3 * 86400, 3600, 60][i]
+        os.utime(tmp_path / digest / "1-1.pkl", (used, used))
+    
+    assert cache.prune() == 1
+    assert cache.get("old", [1]) is None
+    
+    cache.get("stale", [1])  # Now the most recently used
+    cache.max_bytes = os.path.getsize(tmp_path / "stale" / "1-1.pkl")
+    assert cache.prune() == 1
+    assert cache.get("recent", [1]) is None
+    assert cache.get("stale", [1]) is not None
+    assert sorted(os.listdir(tmp_path)) == ["stale"]
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for detecting a statement's format from the start of the file
+"""
+
+import PyPDF2
+
+from geda.parsers import ParserFactory, PDFParser
+from geda.parsers.adapters.generic_csv_parser import GenericCSVParser
+from geda.parsers.sniffing import SNIFF_BYTES, sniff_csv, sniff_pdf
+
+def test_large_csv_is_detected_from_its_first_bytes(tmp_path):
+    """Only whole lines from the first SNIFF_BYTES are used for detection"""
+    lines = ["Date,Description,Amount"]
+    lines += [f"2023-01-{row % 28 + 1:02d},STARBUCKS COFFEE,-{row}.50" for row in range(5000)]
+    path = tmp_path / "statement.csv"
+    path.write_text("\n".join(lines) + "\n")
+
+    sniff = sniff_csv(str(path))
+
+    assert len(sniff.sample.encode()) <= SNIFF_BYTES
+    assert sniff.sample.endswith("\n")
+    assert sniff.signature is None
+    assert isinstance(ParserFactory.get_parser(str(path)), GenericCSVParser)
+
+def test_pdf_source_comes_from_metadata(tmp_path):
+    """A bank named only in the document metadata is still recognized"""
+    writer = PyPDF2.PdfWriter()
+    writer.add_blank_page(width=612, height=792)
+    writer.add_blank_page(width=612, height=792)
+    writer.add_metadata({"/Producer": "Royal Bank of Canada"})
+    path = tmp_path / "statement.pdf"
+    with open(path, "wb") as f:
+        writer.write(f)
+
+    sniff = sniff_pdf(str(path))
+    parser = ParserFactory.get_parser(str(path))
+
+    assert sniff.page_count == 2
+    assert sniff.signature.source_name == "RBC"
+    assert isinstance(parser, PDFParser)
+    assert parser.source_name == "RBC"
+    assert parser.sniff.page_count == 2
+
+def test_csv_signature_comes_from_the_lines_above_the_data(tmp_path):
+    """A bank named in a description doesn't decide the format; RBC wins over CIBC"""
+    path = tmp_path / "statement.csv"
+    path.write_text("Date,Description,Amount\n2023-01-05,RBC VISA PAYMENT,-20.00\n")
+    assert sniff_csv(str(path)).signature is None
+    
+    path.write_text("Royal Bank / CIBC transfer export\nDate,Description,Amount\n2023-01-05,SHOP,-20.00\n")
+    assert sniff_csv(str(path)).signature.source_name == "RBC"